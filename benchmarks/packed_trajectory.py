@@ -0,0 +1,129 @@
+"""
+Benchmark of the packed in-memory trajectory mode against the per-frame object
+mode of `MDAnalysisSession.in_memory()`.
+
+For each mode the script measures the time to import the trajectory, the size
+of the saved .blend file together with the packed coordinates the session
+writes next to its manifest, and the time of each frame change during playback.
+
+Run it with the bpy module, or with the Python of Blender with the add-on
+installed, optionally on a larger trajectory than the test data:
+
+    python benchmarks/packed_trajectory.py
+    blender -b --python benchmarks/packed_trajectory.py -- --topology md.gro --trajectory md.xtc
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import tempfile
+import time
+
+import bpy
+import numpy as np
+import MDAnalysis as mda
+import molecularnodes as mn
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tests", "data", "md_ppr")
+MODES = {"frames": False, "packed": True}
+
+
+def clear_scene(session):
+    """
+    Remove the objects, collections and data of the previous mode, so that it
+    isn't saved with the next one.
+    """
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj)
+    for collection in list(bpy.data.collections):
+        bpy.data.collections.remove(collection)
+    bpy.data.orphans_purge(do_recursive=True)
+    session.universe_reps = {}
+    session.atom_reps = {}
+    session.rep_names = []
+    session.frame_cache.clear()
+
+
+def file_size(files) -> int:
+    return sum(os.path.getsize(file) for file in files)
+
+
+def benchmark(session, universe, packed: bool, selection: str = "all", repeat: int = 3) -> dict:
+    """
+    The import time, saved size and frame change times of one mode.
+
+    Returns
+    -------
+    dict
+        The `import_s` in seconds, the `blend_bytes` of the .blend file and the
+        `sidecar_bytes` of the packed coordinates, and the `frame_ms_p50`,
+        `frame_ms_p95` and `frame_ms_max` of the frame changes in milliseconds.
+    """
+    name = "packed" if packed else "frames"
+    start = time.perf_counter()
+    mol = session.show(universe, selection=selection, name=name, in_memory=True, packed=packed)
+    import_s = time.perf_counter() - start
+
+    # every frame change evaluates the depsgraph, including the node tree
+    # that picks the object of the frame in the per-frame object mode
+    frame_times = []
+    for _ in range(repeat):
+        for frame in range(universe.trajectory.n_frames):
+            start = time.perf_counter()
+            bpy.context.scene.frame_set(frame)
+            frame_times.append(time.perf_counter() - start)
+    frame_ms = np.array(frame_times) * 1000
+
+    with tempfile.TemporaryDirectory() as directory:
+        blend_file = os.path.join(directory, f"{name}.blend")
+        # the session writes the packed coordinates when the file is saved
+        bpy.ops.wm.save_as_mainfile(filepath=blend_file, copy=True)
+        blend_bytes = os.path.getsize(blend_file)
+    sidecars = glob.glob(os.path.join(session.session_tmp_dir, f"{session.uuid}_{mol.name}_packed.*"))
+
+    return {
+        "import_s": import_s,
+        "blend_bytes": blend_bytes,
+        "sidecar_bytes": file_size(sidecars),
+        "frame_ms_p50": float(np.percentile(frame_ms, 50)),
+        "frame_ms_p95": float(np.percentile(frame_ms, 95)),
+        "frame_ms_max": float(frame_ms.max()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--topology", default=os.path.join(DATA_DIR, "box.gro"))
+    parser.add_argument("--trajectory", default=os.path.join(DATA_DIR, "first_5_frames.xtc"))
+    parser.add_argument("--selection", default="all")
+    parser.add_argument("--repeat", type=int, default=3, help="The number of times to play the trajectory.")
+    parser.add_argument("--output", help="A .json file to write the results to.")
+    args = parser.parse_args(argv)
+
+    session = mn.mda.MDAnalysisSession()
+    universe = mda.Universe(args.topology, args.trajectory)
+    results = {}
+    for mode, packed in MODES.items():
+        clear_scene(session)
+        results[mode] = benchmark(session, universe, packed, selection=args.selection, repeat=args.repeat)
+    clear_scene(session)
+
+    print(f"{universe.atoms.select_atoms(args.selection).n_atoms} atoms, {universe.trajectory.n_frames} frames")
+    print(f"{'mode':<8}{'import s':>10}{'.blend MB':>11}{'sidecar MB':>12}{'frame p50 ms':>14}{'p95 ms':>9}{'max ms':>9}")
+    for mode, result in results.items():
+        print(
+            f"{mode:<8}{result['import_s']:>10.3f}{result['blend_bytes'] / 1e6:>11.2f}"
+            f"{result['sidecar_bytes'] / 1e6:>12.2f}{result['frame_ms_p50']:>14.2f}"
+            f"{result['frame_ms_p95']:>9.2f}{result['frame_ms_max']:>9.2f}"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    # Blender passes its own arguments before "--"
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    main(argv)
@@ -26,6 +26,7 @@ bl_info = {
 
 from . import auto_load
 from .mda import _rejuvenate_universe, _sync_universe
+from .density import _update_map_series
 from .ui import MN_add_node_menu
 import bpy
 from . import utils
@@ -42,7 +43,9 @@ def unregister():
     auto_load.unregister()
     bpy.app.handlers.load_post.remove(_rejuvenate_universe)
     bpy.app.handlers.save_pre.remove(_sync_universe)
+    bpy.app.handlers.frame_change_pre.remove(_update_map_series)
 
 # register won't be called when MN is run as a module
 bpy.app.handlers.load_post.append(_rejuvenate_universe)
 bpy.app.handlers.save_pre.append(_sync_universe)
+bpy.app.handlers.frame_change_pre.append(_update_map_series)
@@ -2,8 +2,9 @@ import numpy as np
 import bpy
 from .. import obj
 from .. import coll
+from .. import utils
 
-def create_data_object(transforms_array, name = 'CellPackModel', world_scale = 0.01, fallback=False):
+def create_data_object(transforms_array, name = 'CellPackModel', world_scale = 0.01, fallback=False, rotation_layouts=()):
     obj_data = bpy.data.objects.get(name)
     if obj_data and fallback:
         return obj_data
@@ -17,7 +18,19 @@ def create_data_object(transforms_array, name = 'CellPackModel', world_scale = 0
     locations = transforms_array['translation'] * world_scale
     
     obj_data = obj.create_object(name, coll.mn(), locations)
-    obj.add_attribute(obj_data, 'assembly_rotation', transforms_array['rotation'], 'FLOAT_VECTOR', 'POINT')
+    if rotation_layouts:
+        from scipy.spatial.transform import Rotation
+        # the layouts are converted in one batch from the original matrices, as
+        # the Euler angles lose precision close to gimbal lock
+        if 'matrix' in transforms_array.dtype.names:
+            rotation = Rotation.from_matrix(transforms_array['matrix'])
+        else:
+            rotation = Rotation.from_euler('xyz', transforms_array['rotation'])
+        attributes = utils.rotation_attributes(rotation, 'assembly_rotation', rotation_layouts)
+    else:
+        attributes = {'assembly_rotation': (transforms_array['rotation'], 'FLOAT_VECTOR')}
+    for att_name, (values, att_type) in attributes.items():
+        obj.add_attribute(obj_data, att_name, values, att_type, 'POINT')
     obj.add_attribute(obj_data, 'assembly_id', transforms_array['assembly_id'], 'INT', 'POINT')
     obj.add_attribute(obj_data, 'chain_id', chain_ids, 'INT', 'POINT')
     
@@ -28,6 +41,7 @@ dtype = [
     ('assembly_id', int),
     ('chain_id',    'U10'),
     ('rotation',    float, 3),
+    ('matrix',      float, (3, 3)),
     ('translation', float, 3)
     ]
 
@@ -53,33 +67,37 @@ def transforms_from_assemblies(assembly_list, index = 0):
     
     results = np.zeros((n_transforms), dtype = dtype)
     
+    # convert the rotations of every assembly in one call
+    matrices = np.array([assembly[1] for assembly in assembly_list], dtype = float).reshape((-1, 3, 3))
+    rotations = rotation_from_matrix(matrices)
+    
     current_transform = 0
     for i, assembly in enumerate(assembly_list):
         n_chains = len(assembly[0])
-        
-        mask = np.array(range(n_chains))
-        mask += current_transform
+        results[current_transform:current_transform + n_chains] = transform_chains(
+            assembly, index = index, rotation_euler = rotations[i]
+        )
         current_transform += n_chains
-        transforms = transform_chains(assembly, index = index)
-        results[mask] = transforms
     
     return results
 
-def transform_chains(assembly, index = 0):
+def transform_chains(assembly, index = 0, rotation_euler = None):
     
     chains = assembly[0]
-    rotation_matrix = np.array(assembly[1]).reshape((3, 3))
-    rotation_euler = rotation_from_matrix(rotation_matrix)
+    rotation_matrix = np.array(assembly[1], dtype = float).reshape((3, 3))
+    if rotation_euler is None:
+        rotation_euler = rotation_from_matrix(rotation_matrix)
     translation_matrix = np.array(assembly[2])
     
     n = len(chains)
     result = np.zeros((n), dtype = dtype)
     
-    for i, chain in enumerate(chains):
-        result[i]['assembly_id'] = index
-        result[i]['chain_id'] = chain
-        result[i]['rotation'] = rotation_euler
-        result[i]['translation'] = translation_matrix
+    # every chain of the assembly shares the same transform
+    result['assembly_id'] = index
+    result['chain_id'] = chains
+    result['rotation'] = rotation_euler
+    result['matrix'] = rotation_matrix
+    result['translation'] = translation_matrix
         
     return result
 
@@ -29,6 +29,7 @@ def get_ops_from_bcif(open_bcif):
         ('chain_id',    'U10'),
         ('trans_id', int),
         ('rotation',    float, 3),
+        ('matrix',      float, (3, 3)),
         ('translation', float, 3)
     ]
     ops = cats['pdbx_struct_oper_list']
@@ -55,9 +56,8 @@ def get_ops_from_bcif(open_bcif):
     struct_ops = np.column_stack(list([
         np.array(ops[name]).reshape((ops.row_count, 1)) for name in ok_names
     ]))
-    rotations = np.array(list([
-        rotation_from_matrix(x[0:9].reshape((3, 3))) for x in struct_ops
-    ]))
+    matrices = struct_ops[:, 0:9].astype(float).reshape((-1, 3, 3))
+    rotations = rotation_from_matrix(matrices)
     translations = struct_ops[:, 9:12]
 
     gen_list = []
@@ -89,6 +89,7 @@ def get_ops_from_bcif(open_bcif):
         except IndexError:
             pass
         arr['rotation']    = rotations[mask, :]
+        arr['matrix']      = matrices[mask]
         arr['translation'] = translations[mask, :]
         gen_list.append(arr)
     return np.concatenate(gen_list)
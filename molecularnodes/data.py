@@ -521,6 +521,31 @@ SACCHARIDE_REPRESENTATION = {
     None: ("h", "black")
 }
 
+# Residue and atom names to match against for the `is_*` attributes of MD topologies.
+# These match the `protein`, `nucleic`, `backbone` and `nucleicbackbone` selection
+# keywords of MDAnalysis, so the attributes can be computed without parsing selections.
+protein_res_names = frozenset((
+    'ACE', 'ALA', 'ALAD', 'ARG', 'ARGN', 'ASF', 'ASH', 'ASN', 'ASN1', 'ASP', 'ASPH',
+    'CALA', 'CARG', 'CASF', 'CASN', 'CASP', 'CCYS', 'CCYX', 'CGLN', 'CGLU', 'CGLY',
+    'CHID', 'CHIE', 'CHIP', 'CILE', 'CLEU', 'CLYS', 'CME', 'CMET', 'CPHE', 'CPRO',
+    'CSER', 'CTHR', 'CTRP', 'CTYR', 'CVAL', 'CYM', 'CYS', 'CYS1', 'CYS2', 'CYSH',
+    'CYX', 'DAB', 'GLH', 'GLN', 'GLU', 'GLUH', 'GLY', 'HID', 'HIE', 'HIP', 'HIS',
+    'HIS1', 'HIS2', 'HISA', 'HISB', 'HISD', 'HISE', 'HISH', 'HSD', 'HSE', 'HSP',
+    'HYP', 'ILE', 'LEU', 'LYN', 'LYS', 'LYSH', 'MET', 'MSE', 'NALA', 'NARG', 'NASN',
+    'NASP', 'NCYS', 'NCYX', 'NGLN', 'NGLU', 'NGLY', 'NHID', 'NHIE', 'NHIP', 'NILE',
+    'NLEU', 'NLYS', 'NME', 'NMET', 'NPHE', 'NPRO', 'NSER', 'NTHR', 'NTRP', 'NTYR',
+    'NVAL', 'ORN', 'PGLU', 'PHE', 'PRO', 'QLN', 'SER', 'THR', 'TRP', 'TYR', 'VAL'
+    ))
+nucleic_res_names = frozenset((
+    'A', 'ADE', 'C', 'CYT', 'DA', 'DA3', 'DA5', 'DC', 'DC3', 'DC5', 'DG', 'DG3',
+    'DG5', 'DT', 'DT3', 'DT5', 'G', 'GUA', 'RA', 'RA3', 'RA5', 'RC', 'RC3', 'RC5',
+    'RG', 'RG3', 'RG5', 'RU', 'RU3', 'RU5', 'T', 'THY', 'U', 'URA'
+    ))
+protein_backbone_atom_names = frozenset(('N', 'CA', 'C', 'O'))
+nucleic_backbone_atom_names = frozenset(("P", "C5'", "C3'", "O3'", "O5'"))
+solvent_atom_names = frozenset(('OW', 'HW1', 'HW2'))
+solvent_res_names = frozenset(('W', 'PW'))
+
 # Lipid names to match against for the `is_lipid` attribute
 lipid_names = (
     '23SM', 'CDL1','CDL2', 'ABLIPA', 'ABLIPB', 'ADR', 'ADRP', 'ALIN', 'ALINP',
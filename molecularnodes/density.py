@@ -1,7 +1,21 @@
 import bpy
 import numpy as np
 from . import nodes
+from . import coll
+from . import obj
+from .map_convert import (
+    map_chunks, block_mean, header_range, MapStatistics, map_statistics, statistics_background,
+    auto_background, integer_threshold, mrc_to_grids, mrc_to_grid, map_to_grid, pyramid_path, write_vdb
+)
+from bpy.app.handlers import persistent
 import os
+import re
+import sys
+import glob
+import warnings
+import json
+import time
+import hashlib
 
 bpy.types.Scene.MN_import_map_nodes = bpy.props.BoolProperty(
     name = "MN_import_map_nodes", 
@@ -13,6 +27,98 @@ bpy.types.Scene.MN_import_map_invert = bpy.props.BoolProperty(
     description = "Invert the values in the map. Low becomes high, high becomes low.",
     default = False
     )
+bpy.types.Scene.MN_import_map_auto_threshold = bpy.props.BoolProperty(
+    name = "MN_import_map_auto_threshold", 
+    description = "Estimate the background and tolerance from the histogram of the map, so only voxels that differ from the background are stored.",
+    default = False
+    )
+bpy.types.Scene.MN_import_map_background = bpy.props.FloatProperty(
+    name = "MN_import_map_background", 
+    description = "Value of the voxels that aren't stored in the sparse .vdb grid.",
+    default = 0.0
+    )
+bpy.types.Scene.MN_import_map_tolerance = bpy.props.FloatProperty(
+    name = "MN_import_map_tolerance", 
+    description = "Voxels within this tolerance of the background aren't stored in the .vdb grid. 0 stores every voxel.",
+    default = 0.0,
+    min = 0.0
+    )
+bpy.types.Scene.MN_import_map_pyramid = bpy.props.BoolProperty(
+    name = "MN_import_map_pyramid", 
+    description = "Also create 2x, 4x and 8x binned versions of the map, for faster previews in the viewport.",
+    default = False
+    )
+bpy.types.Scene.MN_import_map_mode = bpy.props.EnumProperty(
+    name = "MN_import_map_mode", 
+    description = "How to import the map.",
+    items = (
+        ('VOLUME', "Volume", "Import as a volume, with a node tree that meshes it at a threshold"),
+        ('ISOSURFACE', "Isosurface", "Import cached isosurface meshes at fixed thresholds"),
+    ),
+    default = 'VOLUME'
+    )
+bpy.types.Scene.MN_import_map_thresholds = bpy.props.StringProperty(
+    name = "MN_import_map_thresholds", 
+    description = "Comma separated thresholds to extract isosurfaces at.",
+    default = "0.8"
+    )
+bpy.types.Scene.MN_import_map_resolution = bpy.props.IntProperty(
+    name = "MN_import_map_resolution", 
+    description = "Factor to bin the map by before extracting isosurfaces. 1 for full resolution.",
+    default = 1,
+    min = 1,
+    max = 8
+    )
+bpy.types.Scene.MN_import_map_threshold_sigma = bpy.props.FloatProperty(
+    name = "MN_import_map_threshold_sigma", 
+    description = "Starting threshold of the node tree, in standard deviations above the mean of the map.",
+    default = 3.0
+    )
+bpy.types.Scene.MN_import_map_enclosed_volume = bpy.props.FloatProperty(
+    name = "MN_import_map_enclosed_volume", 
+    description = "Volume in cubic Angstroms for the starting threshold to enclose, such as 1.21 times the molecular weight in Daltons. 0 to use the standard deviations instead.",
+    default = 0.0,
+    min = 0.0
+    )
+bpy.types.Scene.MN_import_map_cache_dir = bpy.props.StringProperty(
+    name = 'MN_import_map_cache_dir', 
+    description = 'Directory to cache the converted .vdb files in. If empty, they are cached next to the map.', 
+    options = {'TEXTEDIT_UPDATE'}, 
+    default = '', 
+    subtype = 'DIR_PATH', 
+    maxlen = 0
+    )
+bpy.types.Scene.MN_import_map_cache_mb = bpy.props.IntProperty(
+    name = "MN_import_map_cache_mb", 
+    description = "Maximum size of the .vdb cache in megabytes, the least recently used files are removed first. 0 for no limit.",
+    default = 4096,
+    min = 0
+    )
+bpy.types.Scene.MN_import_map_batch = bpy.props.StringProperty(
+    name = 'MN_import_map_batch', 
+    description = 'Directory or glob pattern of the maps to convert, such as /data/maps/*_class*.mrc', 
+    options = {'TEXTEDIT_UPDATE'}, 
+    default = '', 
+    subtype = 'NONE', 
+    maxlen = 0
+    )
+bpy.types.Scene.MN_import_map_batch_workers = bpy.props.IntProperty(
+    name = "MN_import_map_batch_workers", 
+    description = "Number of maps to convert at once, each in its own process. 0 for one per CPU.",
+    default = 0,
+    min = 0
+    )
+bpy.types.Scene.MN_import_map_batch_load = bpy.props.BoolProperty(
+    name = "MN_import_map_batch_load", 
+    description = "Load the maps once they are all converted.",
+    default = True
+    )
+bpy.types.Scene.MN_import_map_series_window = bpy.props.IntProperty(
+    name = "MN_import_map_series_window", 
+    description = "Number of frames of a series to convert ahead of the current frame.",
+    default = 8,
+    min = 1
+    )
 bpy.types.Scene.MN_import_map = bpy.props.StringProperty(
     name = 'path_map', 
     description = 'File path for the map file.', 
@@ -22,83 +128,235 @@ bpy.types.Scene.MN_import_map = bpy.props.StringProperty(
     maxlen = 0
     )
 
-def map_to_grid(file: str, invert: bool = False):
+def path_to_vdb(file: str, cache_dir: str = None, key: str = None):
     """
-    Reads an MRC file and converts it into a pyopenvdb FloatGrid object.
-
-    This function reads a file in MRC format, and converts it into a pyopenvdb FloatGrid object,
-    which can be used to represent volumetric data in Blender.
+    Convert a file path to a corresponding VDB file path.
 
     Parameters
     ----------
     file : str
-        The path to the MRC file.
-    invert : bool, optional
-        Whether to invert the data from the grid, defaulting to False. Some file types
-        such as EM tomograms have inverted values, where a high value == low density.
+        The path of the original file.
+    cache_dir : str, optional
+        The directory of the VDB file. Defaults to the directory of the original file.
+    key : str, optional
+        The cache key of the conversion, which is added to the name of the VDB file.
 
     Returns
     -------
-    pyopenvdb.FloatGrid
-        A pyopenvdb FloatGrid object containing the density data.
+    str
+        The path of the corresponding VDB file.
     """
-    import mrcfile
-    import pyopenvdb as vdb
-
-    volume = mrcfile.read(file)
-    
-    dataType = volume.dtype
-    
-    # enables different grid types
-    
-    if dataType == "float32" or dataType == "float64":
-        grid = vdb.FloatGrid()
-    elif dataType == "int8" or dataType == "int16" or dataType == "int32":
-        volume = volume.astype('int32')
-        grid = vdb.Int32Grid()
-    elif dataType == "int64":
-        grid = vdb.Int64Grid()
-
-    if invert:
-        volume = np.max(volume) - volume
-    
-    try:
-        grid.copyFromArray(volume)
-    except ValueError:
-        print(f"Grid data type '{volume.dtype}' is an unsupported type.")
-    
-    grid.gridClass = vdb.GridClass.FOG_VOLUME
-    grid.name = 'density'
-    return grid
+    # Set up file paths
+    folder_path = cache_dir or os.path.dirname(file)
+    name = os.path.basename(file).split(".")[0]
+    if key:
+        name = f"{name}_{key}"
+    file_name = name + '.vdb'
+    file_path = os.path.join(folder_path, file_name)
+    return file_path
 
 
-def path_to_vdb(file: str):
+def cache_key(file: str, **params) -> str:
     """
-    Convert a file path to a corresponding VDB file path.
+    The key of a converted map in the VDB cache.
+
+    The key changes when the source file is modified, or when any of the
+    conversion parameters change.
 
     Parameters
     ----------
     file : str
         The path of the original file.
+    **params
+        The parameters of the conversion, which must be JSON serialisable.
 
     Returns
     -------
     str
-        The path of the corresponding VDB file.
+        A 12 character hex digest.
     """
-    # Set up file paths
-    folder_path = os.path.dirname(file)
-    name = os.path.basename(file).split(".")[0]
-    file_name = name + '.vdb'
-    file_path = os.path.join(folder_path, file_name)
-    return file_path
+    stat = os.stat(file)
+    source = {
+        "source": os.path.abspath(file),
+        "mtime": stat.st_mtime_ns,
+        "size": stat.st_size,
+    }
+    key = json.dumps({**source, **params}, sort_keys=True)
+    return hashlib.sha1(key.encode()).hexdigest()[:12]
 
-    
 
-def map_to_vdb(file: str, invert: bool = False, world_scale=0.01, overwrite=False) -> str:
+class VDBCache:
+    manifest_name = "MN_vdb_cache.json"
+
+    def __init__(self, directory: str):
+        """
+        The manifest of the maps converted to .vdb files in a directory.
+
+        Each entry records the source file with its modification time and
+        size, the conversion parameters, the files written for it and when it
+        was last used, so that stale entries can be detected and the least
+        recently used entries removed when the cache grows too large.
+
+        Parameters
+        ----------
+        directory : str
+            The directory of the cache, where the manifest is stored.
+        """
+        self.directory = directory
+        self.path = os.path.join(directory, self.manifest_name)
+        self.entries = {}
+        # entries that were used or dropped since the manifest was last written
+        self.modified = False
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                self.entries = json.load(f)
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        # write and then replace, so an interrupted write doesn't corrupt the manifest
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.entries, f, indent=1)
+        os.replace(temp_path, self.path)
+        self.modified = False
+
+    def flush(self):
+        """
+        Write the manifest if entries were used since it was last written.
+        """
+        if self.modified:
+            self.save()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(entry["nbytes"] for entry in self.entries.values())
+
+    def get(self, key: str):
+        """
+        The entry for the key, or None if it isn't cached or any of its files
+        are missing. Marks the entry as used in memory, call `flush()` to
+        write the manifest once after looking up a batch of entries.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if not all(os.path.exists(file) for file in entry["files"]):
+            del self.entries[key]
+            self.modified = True
+            return None
+        entry["last_used"] = time.time()
+        self.modified = True
+        return entry
+
+    def put(self, key: str, files, source: str, params: dict = None, **info):
+        """
+        Add an entry for the files converted from the source file.
+        Extra information about the conversion can be stored as keyword arguments.
+        """
+        stat = os.stat(source)
+        self.entries[key] = {
+            "source": os.path.abspath(source),
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "params": params or {},
+            "files": [os.path.abspath(file) for file in files],
+            "nbytes": sum(os.path.getsize(file) for file in files),
+            "last_used": time.time(),
+            **info,
+        }
+        self.save()
+        return self.entries[key]
+
+    def find(self, file: str):
+        """
+        The entry that the file was written for, or None if it isn't in the cache.
+        """
+        file = os.path.abspath(file)
+        for entry in self.entries.values():
+            if file in entry["files"]:
+                return entry
+        return None
+
+    def is_stale(self, key: str) -> bool:
+        """
+        Whether the source of the entry was deleted or modified since it was converted.
+        """
+        entry = self.entries[key]
+        if not os.path.exists(entry["source"]):
+            return True
+        stat = os.stat(entry["source"])
+        return (stat.st_mtime_ns, stat.st_size) != (entry["mtime"], entry["size"])
+
+    def remove(self, key: str) -> int:
+        """
+        Remove the entry and delete its files, returning the number of bytes freed.
+        """
+        entry = self.entries.pop(key)
+        for file in entry["files"]:
+            if os.path.exists(file):
+                os.remove(file)
+        return entry["nbytes"]
+
+    def prune(self, max_mb: float = None, keep=()) -> int:
+        """
+        Remove stale entries, then the least recently used entries until the
+        cache is no larger than `max_mb`.
+
+        Parameters
+        ----------
+        max_mb : float, optional
+            The maximum size of the cache in megabytes. If None, only stale
+            entries are removed.
+        keep : iterable of str, optional
+            Keys of entries that are never removed, such as the entry that
+            was just converted.
+
+        Returns
+        -------
+        int
+            The number of bytes freed.
+        """
+        freed = 0
+        for key in [key for key in self.entries if key not in keep and self.is_stale(key)]:
+            freed += self.remove(key)
+
+        if max_mb is not None:
+            max_bytes = max_mb * 1024 ** 2
+            by_last_use = sorted(self.entries, key=lambda key: self.entries[key]["last_used"])
+            for key in by_last_use:
+                if self.nbytes <= max_bytes:
+                    break
+                if key not in keep:
+                    freed += self.remove(key)
+
+        self.save()
+        return freed
+
+
+def vdb_params(invert: bool = False, background: float = 0.0, tolerance: float = 0.0,
+               auto_threshold: bool = False, pyramid=()) -> dict:
+    """
+    The conversion parameters of `map_to_vdb()`, as stored in the cache key and
+    entry. The world scale is applied to the object and doesn't change the .vdb file.
+    """
+    return {
+        "invert": invert,
+        "background": background,
+        "tolerance": tolerance,
+        "auto_threshold": auto_threshold,
+        "pyramid": [int(factor) for factor in pyramid],
+    }
+
+
+def map_to_vdb(file: str, invert: bool = False, world_scale=0.01, overwrite=False, chunk_mb: float = 256,
+               cache_dir: str = None, cache_mb: float = None, background: float = 0.0,
+               tolerance: float = 0.0, auto_threshold: bool = False, pyramid=()) -> str:
     """
     Converts an MRC file to a .vdb file using pyopenvdb.
 
+    Converted files are cached, and reused as long as the map and the conversion
+    parameters are unchanged.
+
     Parameters
     ----------
     file : str
@@ -110,39 +368,881 @@ def map_to_vdb(file: str, invert: bool = False, world_scale=0.01, overwrite=Fals
         The scaling factor to apply to the voxel size of the input file. Defaults to 0.01.
     overwrite : bool, optional
         If True, the .vdb file will be overwritten if it already exists. Defaults to False.
+    chunk_mb : float, optional
+        The maximum size in megabytes of the z-slabs the map is read in, defaulting to 256.
+    cache_dir : str, optional
+        The directory to cache the .vdb file in. Defaults to the directory of the map.
+    cache_mb : float, optional
+        The maximum size of the cache in megabytes. If given, the least recently used
+        files are removed once the map is converted. Defaults to None, for no limit.
+    background : float, optional
+        The value of the voxels that aren't stored in the grid, defaulting to 0.
+    tolerance : float, optional
+        Voxels within the tolerance of the background aren't stored, defaulting to 0.
+    auto_threshold : bool, optional
+        Whether to estimate the background and tolerance from the histogram of the map,
+        defaulting to False.
+    pyramid : iterable of int, optional
+        The factors to bin the map by for lower resolution previews, such as (2, 4, 8).
+        Each level is written to a sibling file, see `pyramid_path()`. Defaults to none.
 
     Returns
     -------
     str
-        The path to the converted .vdb file.
+        The path to the converted .vdb file. The voxel counts and file sizes of the
+        conversion are stored in its entry of the `VDBCache`.
     """
-    import mrcfile
-    import pyopenvdb as vdb
-
-    file_path = path_to_vdb(file)
+    cache_dir = cache_dir or os.path.dirname(os.path.abspath(file))
+    params = vdb_params(
+        invert=invert, background=background, tolerance=tolerance,
+        auto_threshold=auto_threshold, pyramid=pyramid
+    )
+    key = cache_key(file, **params)
+    file_path = path_to_vdb(file, cache_dir=cache_dir, key=key)
+    cache = VDBCache(cache_dir)
     
-    # If the map has already been converted to a .vdb and overwrite is False, return that instead
-    if os.path.exists(file_path) and not overwrite:
+    # If the map has already been converted with the same parameters and overwrite is False, return that instead
+    if not overwrite and cache.get(key) is not None:
+        cache.flush()
         return file_path
 
-    # Read in the MRC file and convert it to a pyopenvdb grid
-    grid = map_to_grid(file, invert=invert)
-    
-    # Read the voxel size from the MRC file and convert it to a numpy array
-    with mrcfile.open(file) as mrc:
-        voxel_size = np.array([mrc.voxel_size.x, mrc.voxel_size.y, mrc.voxel_size.z])
-    
-    # Rotate and scale the grid for import into Blender
-    grid.transform.rotate(np.pi / 2, vdb.Axis(1))
-        
-    
-    # Write the grid to a .vdb file
-    vdb.write(file_path, grid)
+    # Convert the map in memory-mapped slabs and write the grids to .vdb files
+    files, info = write_vdb(file, file_path, params, chunk_mb=chunk_mb)
+    cache.put(key, files, source=file, params=params, **info)
+    # files that saved .blend files still use are only removed to keep to a size limit
+    if cache_mb is not None:
+        cache.prune(max_mb=cache_mb, keep=[key])
     
     # Return the path to the output file
     return file_path
 
 
+def conversion_report(entry: dict) -> str:
+    """
+    Summarise the voxel counts and file sizes before and after converting a map.
+
+    Parameters
+    ----------
+    entry : dict
+        The `VDBCache` entry of the conversion.
+
+    Returns
+    -------
+    str
+        The number of active voxels and size of the .vdb file, compared to the
+        dense map.
+    """
+    active, dense = entry["active_voxels"], entry["dense_voxels"]
+    return (
+        f"Stored {active:,} of {dense:,} voxels ({100 * active / max(dense, 1):.1f}%), "
+        f"{entry['nbytes'] / 1024 ** 2:.1f} MB .vdb from a "
+        f"{entry['dense_nbytes'] / 1024 ** 2:.1f} MB map."
+    )
+
+
+map_extensions = (".mrc", ".map", ".rec")
+
+
+def find_maps(files) -> list:
+    """
+    The MRC files of a directory, glob pattern or list of paths.
+
+    Parameters
+    ----------
+    files : str or list of str
+        A directory, in which case every .mrc, .map and .rec file in it is
+        found, a glob pattern such as `"maps/*_class*.mrc"`, or a list of either.
+
+    Returns
+    -------
+    list of str
+        The paths of the maps without duplicates, sorted with the numbers in
+        their names ordered by value, so numbered frames are in order.
+    """
+    if isinstance(files, (str, os.PathLike)):
+        files = [files]
+    found = []
+    for path in files:
+        path = os.fspath(path)
+        if os.path.isdir(path):
+            found.extend(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.lower().endswith(map_extensions)
+            )
+        elif glob.has_magic(path):
+            found.extend(glob.glob(path))
+        else:
+            found.append(path)
+    return sorted(set(found), key=_natural_key)
+
+
+def _natural_key(path: str):
+    """
+    Sort key that orders the numbers in paths by value, so frame_2 comes before frame_10.
+    """
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", path)]
+
+
+def _worker_module():
+    """
+    The `map_convert` module imported on its own, outside of the add-on package.
+
+    Functions are sent to worker processes by the name of their module, and
+    importing `molecularnodes.map_convert` in a worker would import bpy through
+    the add-on's `__init__`, which isn't available to the Python that Blender
+    starts workers with. The top level copy can be imported by workers that
+    have the directory of this file on their path.
+    """
+    path = os.path.join(os.path.dirname(__file__), "map_convert.py")
+    module = sys.modules.get("map_convert")
+    if module is None or getattr(module, "__file__", None) != path:
+        import importlib.util
+        spec = importlib.util.spec_from_file_location("map_convert", path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["map_convert"] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+def _discard_files(future):
+    """
+    Delete the files of a conversion that finished after the batch was cancelled.
+    """
+    if future.cancelled() or future.exception() is not None:
+        return
+    for file in future.result()[0]:
+        if os.path.exists(file):
+            os.remove(file)
+
+
+class MapConversion:
+    def __init__(self, files, max_workers: int = None, chunk_mb: float = 256, cache_dir: str = None,
+                 cache_mb: float = None, overwrite: bool = False, **params):
+        """
+        A batch of maps converted to .vdb files in a pool of worker processes.
+
+        Maps that are already in the cache with the same parameters are reused
+        without being submitted. Each worker converts and writes one map at a
+        time with `map_convert.write_vdb()`, while the cache manifests are only
+        written from this process as the conversions finish, so workers never
+        race on them.
+
+        Parameters
+        ----------
+        files : str or list of str
+            The maps to convert, see `find_maps()`.
+        max_workers : int, optional
+            The number of worker processes. Defaults to the number of CPUs.
+            Each worker holds at most one slab of `chunk_mb` of its map besides
+            its grids, so lower this for very large maps.
+        chunk_mb : float, optional
+            The maximum size in megabytes of the z-slabs the maps are read in, defaulting to 256.
+        cache_dir : str, optional
+            The directory to cache the .vdb files in. Defaults to the directory of each map.
+        cache_mb : float, optional
+            The maximum size of the caches in megabytes, enforced once the batch
+            has finished. Defaults to None, for no limit.
+        overwrite : bool, optional
+            Convert maps even if they are already cached. Defaults to False.
+        **params
+            The conversion parameters of `map_to_vdb()`: `invert`, `background`,
+            `tolerance`, `auto_threshold` and `pyramid`.
+        """
+        self.files = find_maps(files)
+        self.max_workers = max_workers
+        self.chunk_mb = chunk_mb
+        self.cache_dir = cache_dir
+        self.cache_mb = cache_mb
+        self.params = vdb_params(**params)
+        self.results = {}
+        self.errors = {}
+        self.cancelled = False
+        self._caches = {}
+        self._keys = {}
+        self._futures = {}
+        self._executor = None
+
+        for file in self.files:
+            cache = self._cache(file)
+            key = cache_key(file, **self.params)
+            self._keys[file] = key
+            if not overwrite and cache.get(key) is not None:
+                self.results[file] = path_to_vdb(file, cache_dir=cache.directory, key=key)
+        for cache in self._caches.values():
+            cache.flush()
+
+    def _cache(self, file: str) -> VDBCache:
+        directory = self.cache_dir or os.path.dirname(os.path.abspath(file))
+        if directory not in self._caches:
+            self._caches[directory] = VDBCache(directory)
+        return self._caches[directory]
+
+    @property
+    def total(self) -> int:
+        return len(self.files)
+
+    @property
+    def done(self) -> int:
+        """
+        The number of maps that are converted, reused from the cache or failed.
+        """
+        return len(self.results) + len(self.errors)
+
+    @property
+    def finished(self) -> bool:
+        return self.cancelled or self.done == self.total
+
+    def start(self, files=None):
+        """
+        Submit the maps that aren't cached to the worker processes.
+
+        Parameters
+        ----------
+        files : list of str, optional
+            Only submit these maps, in this order. Maps that are converted,
+            failed or already submitted are skipped. Defaults to every map.
+        """
+        import site
+        from concurrent.futures import ProcessPoolExecutor
+
+        submitted = set(self._futures.values())
+        pending = [
+            file for file in (self.files if files is None else files)
+            if file not in self.results and file not in self.errors and file not in submitted
+        ]
+        if not pending:
+            return self
+        worker = _worker_module()
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=site.addsitedir,
+                initargs=(os.path.dirname(worker.__file__),),
+            )
+        for file in pending:
+            file_path = path_to_vdb(file, cache_dir=self._cache(file).directory, key=self._keys[file])
+            future = self._executor.submit(worker.write_vdb, file, file_path, self.params, self.chunk_mb)
+            self._futures[future] = file
+        return self
+
+    def poll(self, timeout: float = 0) -> list:
+        """
+        Collect the conversions that have finished, adding them to the cache.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            How long to wait for a conversion to finish in seconds, defaulting
+            to 0 so that polling never blocks. None waits for the next one.
+
+        Returns
+        -------
+        list of str
+            The maps that finished since the last poll, whether they were
+            converted or failed, in which case the exception is in `errors`.
+        """
+        from concurrent.futures import wait, FIRST_COMPLETED
+
+        if not self._futures:
+            return []
+        finished, _ = wait(self._futures, timeout=timeout, return_when=FIRST_COMPLETED)
+        files = []
+        for future in finished:
+            file = self._futures.pop(future)
+            files.append(file)
+            try:
+                written, info = future.result()
+            except Exception as error:
+                self.errors[file] = error
+                continue
+            cache = self._cache(file)
+            cache.put(self._keys[file], written, source=file, params=self.params, **info)
+            self.results[file] = written[0]
+        if not self._futures and self.done == self.total:
+            self._finish()
+        return files
+
+    def cancel(self, files=None):
+        """
+        Stop the batch. Maps that haven't started are never converted, and the
+        files of maps that are being converted are deleted when they finish.
+        Maps that already finished stay in the cache.
+
+        Parameters
+        ----------
+        files : list of str, optional
+            Only withdraw these maps if they haven't started converting yet,
+            leaving the rest of the batch running. They can be submitted again
+            with `start()`. Defaults to stopping the whole batch.
+        """
+        if files is not None:
+            files = set(files)
+            for future, file in list(self._futures.items()):
+                if file in files and future.cancel():
+                    del self._futures[future]
+            return
+        self.cancelled = True
+        for future in self._futures:
+            if not future.cancel():
+                future.add_done_callback(_discard_files)
+        self._futures = {}
+        self._finish()
+
+    def _finish(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self.prune()
+
+    def prune(self, keep=None) -> int:
+        """
+        Remove the least recently used files from the caches of the batch until
+        they are within `cache_mb`, if it is set. Maps whose files are removed
+        are left out of the results, and converted again if they are started.
+
+        Parameters
+        ----------
+        keep : iterable of str, optional
+            The maps whose files are never removed. Defaults to every map of the batch.
+
+        Returns
+        -------
+        int
+            The number of bytes freed.
+        """
+        if self.cache_mb is None:
+            return 0
+        keep = [self._keys[file] for file in (self.files if keep is None else keep)]
+        freed = sum(cache.prune(max_mb=self.cache_mb, keep=keep) for cache in self._caches.values())
+        for file, vdb_file in list(self.results.items()):
+            if not os.path.exists(vdb_file):
+                del self.results[file]
+        return freed
+
+    def wait(self, progress=None, cancel=None) -> dict:
+        """
+        Start the batch and block until every map is converted.
+
+        Parameters
+        ----------
+        progress : callable, optional
+            Called as `progress(file, done, total)` once for every map, as it
+            is reused from the cache or finishes converting.
+        cancel : callable, optional
+            Called between conversions, the batch is cancelled once it returns True.
+
+        Returns
+        -------
+        dict
+            The path of the .vdb file of each map that was converted.
+        """
+        if progress is not None:
+            for i, file in enumerate(self.results):
+                progress(file, i + 1, self.total)
+        self.start()
+        while not self.finished:
+            if cancel is not None and cancel():
+                self.cancel()
+                break
+            for file in self.poll(timeout=0.1):
+                if progress is not None:
+                    progress(file, self.done, self.total)
+        return dict(self.results)
+
+
+def convert_maps(files, max_workers: int = None, progress=None, cancel=None, chunk_mb: float = 256,
+                 cache_dir: str = None, cache_mb: float = None, overwrite: bool = False, **params) -> dict:
+    """
+    Converts a directory, glob pattern or list of MRC files to .vdb files in parallel.
+
+    Every map is converted in its own worker process with the same parameters
+    as `map_to_vdb()` and added to the same cache, so converted maps can then be
+    loaded with `load()` without being converted again.
+
+    Parameters
+    ----------
+    files : str or list of str
+        The maps to convert, see `find_maps()`.
+    max_workers : int, optional
+        The number of worker processes. Defaults to the number of CPUs.
+    progress : callable, optional
+        Called as `progress(file, done, total)` as each map finishes.
+    cancel : callable, optional
+        Polled between conversions, the batch is cancelled once it returns True.
+    chunk_mb : float, optional
+        The maximum size in megabytes of the z-slabs the maps are read in, defaulting to 256.
+    cache_dir : str, optional
+        The directory to cache the .vdb files in. Defaults to the directory of each map.
+    cache_mb : float, optional
+        The maximum size of the cache in megabytes. Defaults to None, for no limit.
+    overwrite : bool, optional
+        Convert maps even if they are already cached. Defaults to False.
+    **params
+        The conversion parameters of `map_to_vdb()`: `invert`, `background`,
+        `tolerance`, `auto_threshold` and `pyramid`.
+
+    Returns
+    -------
+    dict
+        The path of the .vdb file of each map. Maps that failed to convert
+        are left out, and raise their exception again when loaded.
+    """
+    conversion = MapConversion(
+        files, max_workers=max_workers, chunk_mb=chunk_mb, cache_dir=cache_dir,
+        cache_mb=cache_mb, overwrite=overwrite, **params
+    )
+    return conversion.wait(progress=progress, cancel=cancel)
+
+
+class MapSeries:
+    def __init__(self, files, window: int = 8, max_workers: int = None, chunk_mb: float = 256,
+                 cache_dir: str = None, cache_mb: float = None, **params):
+        """
+        A numbered series of maps, such as the frames of a 3D variability
+        analysis, that are converted to .vdb files as they are needed.
+
+        Asking for a frame converts it first, then the next frames of the window
+        in the background, so playback rarely waits. Conversions that haven't
+        started are withdrawn once they fall outside the window, so scrubbing
+        doesn't queue up the whole series.
+
+        Parameters
+        ----------
+        files : str or list of str
+            The frames of the series, see `find_maps()`.
+        window : int, optional
+            The number of frames, from the current frame on, that are converted
+            ahead of time. Defaults to 8.
+        max_workers : int, optional
+            The number of worker processes. Defaults to the number of CPUs.
+        chunk_mb : float, optional
+            The maximum size in megabytes of the z-slabs the maps are read in, defaulting to 256.
+        cache_dir : str, optional
+            The directory to cache the .vdb files in. Defaults to the directory of each map.
+        cache_mb : float, optional
+            The maximum size of the cache in megabytes. Defaults to None, for no limit.
+        **params
+            The conversion parameters of `map_to_vdb()`, except for `pyramid`.
+        """
+        params["pyramid"] = ()
+        self.conversion = MapConversion(
+            files, max_workers=max_workers, chunk_mb=chunk_mb, cache_dir=cache_dir,
+            cache_mb=cache_mb, **params
+        )
+        self.files = self.conversion.files
+        self.window = max(1, window)
+
+    def __len__(self):
+        return len(self.files)
+
+    def prefetch(self, index: int):
+        """
+        Submit the frames of the window starting at the index, withdrawing the
+        conversions of frames outside of it that haven't started.
+        """
+        window = self.files[index:index + self.window]
+        self.conversion.cancel(set(self.files).difference(window))
+        self.conversion.start(window)
+
+    def frame_file(self, index: int, wait: bool = True) -> str:
+        """
+        The .vdb file of a frame of the series.
+
+        Parameters
+        ----------
+        index : int
+            The index of the frame, clamped to the frames of the series.
+        wait : bool, optional
+            Whether to wait for the frame to be converted, defaulting to True.
+
+        Returns
+        -------
+        str
+            The path of the .vdb file, or None if the frame isn't converted
+            yet and `wait` is False.
+        """
+        index = min(max(index, 0), len(self) - 1)
+        file = self.files[index]
+        self.prefetch(index)
+        finished = self.conversion.poll()
+        while wait and file not in self.conversion.results and file not in self.conversion.errors:
+            finished += self.conversion.poll(timeout=None)
+        if finished:
+            # the batch never finishes while frames are withdrawn from the window,
+            # so the cache is kept within its limit as frames are converted
+            self.conversion.prune(keep=self.files[index:index + self.window])
+        if file in self.conversion.errors:
+            raise self.conversion.errors[file]
+        return self.conversion.results.get(file)
+
+    def close(self):
+        """
+        Stop converting frames, the frames that are already converted stay in the cache.
+        """
+        self.conversion.cancel()
+
+    @classmethod
+    def from_object(cls, vol_object):
+        """
+        The series of a volume object loaded with `load_series()`.
+        """
+        params = json.loads(vol_object["map_series_params"])
+        params["cache_mb"] = vol_object.get("map_series_cache_mb") or None
+        # series saved before the world scale was dropped from the conversion parameters
+        params.pop("world_scale", None)
+        return cls(
+            list(vol_object["map_series"]),
+            window=vol_object["map_series_window"],
+            cache_dir=vol_object["map_series_cache_dir"] or None,
+            **params
+        )
+
+
+# the corners of a cube as (i, j, k) offsets from its origin
+_cube_corners = np.array([
+    [0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+    [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1],
+])
+# the six tetrahedra that split each cube around its 0-6 diagonal, which are the
+# same for every cube so that the surfaces of neighbouring cubes meet without cracks
+_cube_tetrahedra = np.array([
+    [0, 5, 1, 6], [0, 1, 2, 6], [0, 2, 3, 6],
+    [0, 3, 7, 6], [0, 7, 4, 6], [0, 4, 5, 6],
+])
+
+def _tetrahedron_triangles():
+    """
+    The triangles for each of the 16 cases of tetrahedron vertices being inside
+    the surface, as (inside vertex, outside vertex) edges of the tetrahedron.
+    """
+    triangles = []
+    for case in range(16):
+        inside = [v for v in range(4) if case >> v & 1]
+        outside = [v for v in range(4) if not case >> v & 1]
+        if len(inside) == 1:
+            triangles.append([[(inside[0], v) for v in outside]])
+        elif len(inside) == 3:
+            triangles.append([[(v, outside[0]) for v in inside]])
+        elif len(inside) == 2:
+            (a, b), (c, d) = inside, outside
+            triangles.append([
+                [(a, c), (a, d), (b, d)],
+                [(a, c), (b, d), (b, c)],
+            ])
+        else:
+            triangles.append([])
+    return triangles
+
+_tetrahedron_cases = _tetrahedron_triangles()
+
+
+def marching_tetrahedra(volume: np.ndarray, threshold: float, invert: bool = False, chunk_mb: float = 256):
+    """
+    Extract the isosurface of a volume at a threshold, with vectorized marching tetrahedra.
+
+    Each cube of voxels is split into six tetrahedra, which need only 16 cases
+    instead of the 256 of marching cubes. The volume is processed in overlapping
+    z-slabs, and the vertices on shared edges are welded so the surface is connected.
+
+    Parameters
+    ----------
+    volume : np.ndarray
+        The 3D volume, usually the memory-mapped data of an MRC file.
+    threshold : float
+        The value of the isosurface.
+    invert : bool, optional
+        Whether to extract the surface of the inverted volume, defaulting to False.
+    chunk_mb : float, optional
+        The maximum size of the slabs the volume is read in, defaulting to 256.
+
+    Returns
+    -------
+    tuple of (np.ndarray, np.ndarray)
+        The (n, 3) float32 vertices in voxel index coordinates and the (m, 3)
+        triangles, with normals pointing away from the density.
+    """
+    shape = np.array(volume.shape)
+    strides = np.array([shape[1] * shape[2], shape[2], 1])
+    if invert:
+        maximum = max(slab.max() for _, slab in map_chunks(volume, chunk_mb))
+
+    keys, positions, outward = [], [], []
+    for start, slab in map_chunks(volume, chunk_mb):
+        # the cubes of the slab also need the first section of the next slab
+        values = np.array(volume[start:start + len(slab) + 1], dtype=np.float32)
+        if invert:
+            values = maximum - values
+        if len(values) < 2:
+            continue
+        inside = values > threshold
+
+        # only cubes that the surface passes through, found from shifted views of
+        # the corners so that indices are only created for the active cubes
+        n_i, n_j, n_k = np.array(values.shape) - 1
+        any_inside = np.zeros((n_i, n_j, n_k), dtype=bool)
+        all_inside = np.ones((n_i, n_j, n_k), dtype=bool)
+        for i, j, k in _cube_corners:
+            corner = inside[i:i + n_i, j:j + n_j, k:k + n_k]
+            any_inside |= corner
+            all_inside &= corner
+        any_inside &= ~all_inside
+        del all_inside
+        origins = np.argwhere(any_inside)
+        del any_inside
+        corners = origins[:, None, :] + _cube_corners[None, :, :]
+        corner_inside = inside[corners[..., 0], corners[..., 1], corners[..., 2]]
+        origins[:, 0] += start
+
+        for tetrahedron in _cube_tetrahedra:
+            case = (corner_inside[:, tetrahedron] << np.arange(4)).sum(axis=1)
+            for case_id, triangles in enumerate(_tetrahedron_cases):
+                cubes = case == case_id
+                if not triangles or not cubes.any():
+                    continue
+                cube_corners = corners[cubes]
+                cube_origins = origins[cubes]
+                for triangle in triangles:
+                    triangle_keys, triangle_positions = [], []
+                    for vertex_in, vertex_out in triangle:
+                        corner_in = _cube_corners[tetrahedron[vertex_in]]
+                        corner_out = _cube_corners[tetrahedron[vertex_out]]
+                        index_in = cube_corners[:, tetrahedron[vertex_in]]
+                        index_out = cube_corners[:, tetrahedron[vertex_out]]
+                        value_in = values[index_in[:, 0], index_in[:, 1], index_in[:, 2]]
+                        value_out = values[index_out[:, 0], index_out[:, 1], index_out[:, 2]]
+                        t = (threshold - value_in) / (value_out - value_in)
+                        triangle_positions.append(
+                            cube_origins + corner_in + t[:, None] * (corner_out - corner_in)
+                        )
+                        # the corners of every edge are ordered, so an edge is identified
+                        # by its lower corner and the direction to its upper corner
+                        lower = np.minimum(corner_in, corner_out)
+                        direction = np.abs(corner_out - corner_in) @ [4, 2, 1]
+                        triangle_keys.append(((cube_origins + lower) @ strides) * 8 + direction)
+                    keys.append(np.stack(triangle_keys, axis=1))
+                    positions.append(np.stack(triangle_positions, axis=1))
+                    edge = _cube_corners[tetrahedron[triangle[0][1]]] - _cube_corners[tetrahedron[triangle[0][0]]]
+                    outward.append(np.repeat(edge[None, :], len(cube_origins), axis=0))
+
+    if not keys:
+        return np.zeros((0, 3), dtype=np.float32), np.zeros((0, 3), dtype=int)
+
+    keys = np.concatenate(keys)
+    positions = np.concatenate(positions)
+    outward = np.concatenate(outward)
+
+    # wind the triangles so their normals point from the inside to the outside
+    normals = np.cross(positions[:, 1] - positions[:, 0], positions[:, 2] - positions[:, 0])
+    flip = (normals * outward).sum(axis=1) < 0
+    keys[flip] = keys[flip][:, ::-1]
+    positions[flip] = positions[flip][:, ::-1]
+
+    # weld the vertices that triangles share on the same edge
+    unique_keys, first, faces = np.unique(keys.reshape(-1), return_index=True, return_inverse=True)
+    vertices = positions.reshape(-1, 3)[first].astype(np.float32)
+    return vertices, faces.reshape(-1, 3)
+
+
+def index_to_blender(vertices: np.ndarray, factor: int = 1) -> np.ndarray:
+    """
+    Transform voxel index coordinates of a map, or of a binned level of it, to the
+    coordinates of the converted .vdb volume in Blender.
+    """
+    vertices = vertices * factor + (factor - 1) / 2
+    # the same rotation around the y axis that is applied to the grids
+    return np.stack([vertices[:, 2], vertices[:, 1], -vertices[:, 0]], axis=1).astype(np.float32)
+
+
+def map_to_mesh(file: str, threshold: float, invert: bool = False, resolution: int = 1,
+                chunk_mb: float = 256, cache_dir: str = None, cache_mb: float = None,
+                overwrite: bool = False) -> str:
+    """
+    Extracts the isosurface of an MRC file at a threshold, caching the mesh.
+
+    Meshes are cached per map, threshold, inversion and resolution in the same
+    cache as the .vdb files, as .npz files of the vertices and faces.
+
+    Parameters
+    ----------
+    file : str
+        The path to the input MRC file.
+    threshold : float
+        The value of the isosurface.
+    invert : bool, optional
+        Whether to invert the data from the map, defaulting to False.
+    resolution : int, optional
+        The factor to bin the map by before extracting the surface, defaulting to 1.
+    chunk_mb : float, optional
+        The maximum size in megabytes of the z-slabs the map is read in, defaulting to 256.
+    cache_dir : str, optional
+        The directory to cache the mesh in. Defaults to the directory of the map.
+    cache_mb : float, optional
+        The maximum size of the cache in megabytes. Defaults to None, for no limit.
+    overwrite : bool, optional
+        If True, the mesh is extracted again even if it is cached. Defaults to False.
+
+    Returns
+    -------
+    str
+        The path to the cached .npz file, with the `vertices` and `faces` arrays.
+    """
+    import mrcfile
+
+    cache_dir = cache_dir or os.path.dirname(os.path.abspath(file))
+    params = {
+        "isosurface": True,
+        "threshold": float(threshold),
+        "invert": invert,
+        "resolution": int(resolution),
+    }
+    key = cache_key(file, **params)
+    file_path = os.path.splitext(path_to_vdb(file, cache_dir=cache_dir, key=key))[0] + ".npz"
+    cache = VDBCache(cache_dir)
+    if not overwrite and cache.get(key) is not None:
+        cache.flush()
+        return file_path
+
+    with mrcfile.mmap(file, mode='r') as mrc:
+        volume = mrc.data
+        if resolution > 1:
+            volume = np.concatenate([
+                block_mean(slab, resolution)
+                for _, slab in map_chunks(volume, chunk_mb, multiple=resolution)
+            ])
+        vertices, faces = marching_tetrahedra(volume, threshold, invert=invert, chunk_mb=chunk_mb)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    np.savez(file_path, vertices=index_to_blender(vertices, resolution), faces=faces.astype(np.int32))
+    cache.put(key, [file_path], source=file, params=params, n_faces=len(faces))
+    if cache_mb is not None:
+        cache.prune(max_mb=cache_mb, keep=[key])
+    return file_path
+
+
+def map_origin(mrc):
+    """
+    The position of the first voxel of an MRC file and the size of its voxels.
+
+    The origin of the header is used when it is set, otherwise the start
+    indices of the header are scaled by the voxel size.
+
+    Parameters
+    ----------
+    mrc : mrcfile.mrcfile.MrcFile
+        The open MRC file.
+
+    Returns
+    -------
+    tuple of (np.ndarray, np.ndarray)
+        The (x, y, z) position of the centre of voxel (0, 0, 0) and the (x, y, z)
+        size of the voxels, both in Angstroms.
+    """
+    header = mrc.header
+    voxel_size = np.array([mrc.voxel_size.x, mrc.voxel_size.y, mrc.voxel_size.z], dtype=np.float64)
+    origin = np.array([header.origin.x, header.origin.y, header.origin.z], dtype=np.float64)
+    if not origin.any():
+        start = np.array([header.nxstart, header.nystart, header.nzstart], dtype=np.float64)
+        origin = start * voxel_size
+    return origin, voxel_size
+
+
+def sample_map(data: np.ndarray, positions: np.ndarray, origin, voxel_size,
+               fill: float = 0.0, chunk_size: int = 2 ** 20) -> np.ndarray:
+    """
+    Trilinearly interpolate the values of a map at positions.
+
+    Only the eight voxels around each position are read, so the data can be
+    the memory-map of a map that is much larger than the available memory.
+
+    Parameters
+    ----------
+    data : np.ndarray
+        The (z, y, x) map, usually the memory-mapped data of an MRC file.
+    positions : np.ndarray
+        The (x, y, z) positions to sample, in Angstroms.
+    origin : np.ndarray
+        The (x, y, z) position of the centre of voxel (0, 0, 0), see `map_origin()`.
+    voxel_size : np.ndarray
+        The (x, y, z) size of the voxels.
+    fill : float, optional
+        The value of positions outside of the map, defaulting to 0.
+    chunk_size : int, optional
+        The number of positions that are interpolated at once, defaulting to 2 ** 20.
+
+    Returns
+    -------
+    np.ndarray
+        The float32 value of the map at each position.
+    """
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+    values = np.full(len(positions), fill, dtype=np.float32)
+    shape = np.array(data.shape)
+    corners = np.array(list(np.ndindex(2, 2, 2)))
+    for start in range(0, len(positions), chunk_size):
+        # the fractional voxel index of each position, in the (z, y, x) order of the data
+        index = ((positions[start:start + chunk_size] - origin) / voxel_size)[:, ::-1]
+        inside = np.all((index >= 0) & (index <= shape - 1), axis=1)
+        index = index[inside]
+        # the last voxel of each axis is interpolated from the cell before it
+        lower = np.minimum(np.floor(index).astype(np.intp), np.maximum(shape - 2, 0))
+        fraction = index - lower
+        sampled = np.zeros(len(index))
+        for corner in corners:
+            weight = np.prod(np.where(corner, fraction, 1 - fraction), axis=1)
+            z, y, x = np.minimum(lower + corner, shape - 1).T
+            sampled += weight * data[z, y, x]
+        values[start:start + chunk_size][inside] = sampled
+    return values
+
+
+def initial_threshold(statistics: dict, sigma: float = 3.0, enclosed_volume: float = None) -> float:
+    """
+    A starting threshold for the surface of a map, from its `map_statistics()`.
+
+    Parameters
+    ----------
+    statistics : dict
+        The statistics of the map, as stored in its cache entry.
+    sigma : float, optional
+        The threshold in standard deviations above the mean, defaulting to 3.
+    enclosed_volume : float, optional
+        If given, the threshold is instead the value at which the surface
+        encloses this volume, from the histogram.
+
+    Returns
+    -------
+    float
+        The threshold, which is never above the maximum of the map so that there
+        is always a surface to see.
+    """
+    if enclosed_volume:
+        # the enclosed volume falls as the threshold rises, and is flat between
+        # the density and the noise of clean maps, so take the middle of the
+        # thresholds that enclose the volume
+        edges = np.asarray(statistics["edges"])
+        enclosed = np.asarray(statistics["enclosed_volume"])
+        lowest = np.argmax(enclosed <= enclosed_volume)
+        highest = np.nonzero(enclosed >= enclosed_volume)[0]
+        highest = highest[-1] if len(highest) else lowest
+        return float((edges[lowest] + edges[highest]) / 2)
+    threshold = statistics["mean"] + sigma * statistics["std"]
+    return float(min(threshold, statistics["max"]))
+
+
+def add_statistics(vol_object: bpy.types.Object, statistics: dict, sigma: float = 3.0,
+                   enclosed_volume: float = None):
+    """
+    Store the statistics of a map on its volume object, along with the starting
+    threshold of its node tree from `initial_threshold()`.
+    """
+    vol_object["statistics"] = {key: statistics[key] for key in ["min", "max", "mean", "std"]}
+    for key in ["edges", "counts", "enclosed_volume"]:
+        vol_object[f"histogram_{key}"] = [float(value) for value in statistics[key]]
+    vol_object["initial_threshold"] = initial_threshold(
+        statistics, sigma=sigma, enclosed_volume=enclosed_volume
+    )
+
+
 def vdb_to_volume(file: str) -> bpy.types.Object:
     """
     Imports a VDB file as a Blender volume object.
@@ -174,7 +1274,36 @@ def vdb_to_volume(file: str) -> bpy.types.Object:
 
 
 
-def load(file: str, name: str = None, invert: bool = False, world_scale: float = 0.01) -> bpy.types.Object:
+def pyramid_to_volume(vdb_file: str, factor: int, name: str) -> bpy.types.Object:
+    """
+    Create a volume object for a pyramid level of a converted map, in the hidden
+    MN_data collection, to be instanced by the density node tree.
+
+    Parameters
+    ----------
+    vdb_file : str
+        The path of the full resolution VDB file.
+    factor : int
+        The factor the level is binned by.
+    name : str
+        The name of the volume object.
+
+    Returns
+    -------
+    bpy.types.Object
+        The volume object of the pyramid level.
+    """
+    volume = bpy.data.volumes.new(name)
+    volume.filepath = pyramid_path(vdb_file, factor)
+    level = bpy.data.objects.new(name, volume)
+    coll.data().objects.link(level)
+    return level
+
+
+def load(file: str, name: str = None, invert: bool = False, world_scale: float = 0.01,
+         cache_dir: str = None, cache_mb: float = None, background: float = 0.0,
+         tolerance: float = 0.0, auto_threshold: bool = False, pyramid=(),
+         sigma: float = 3.0, enclosed_volume: float = None) -> bpy.types.Object:
     """
     Loads an MRC file into Blender as a volumetric object.
 
@@ -183,31 +1312,352 @@ def load(file: str, name: str = None, invert: bool = False, world_scale: float =
     file : str
         Path to the MRC file.
     name : str, optional
-        If not None, renames the object with the new name.
+        If not None, renames the object with the new name. Defaults to the name of the map.
     invert : bool, optional
         Whether to invert the data from the grid, defaulting to False. Some file types
         such as EM tomograms have inverted values, where a high value == low density.
     world_scale : float, optional
         Scale of the object in the world. Defaults to 0.01.
+    cache_dir : str, optional
+        The directory to cache the intermediate .vdb file in. Defaults to the directory of the map.
+    cache_mb : float, optional
+        The maximum size of the cache in megabytes. Defaults to None, for no limit.
+    background : float, optional
+        The value of the voxels that aren't stored in the .vdb file, defaulting to 0.
+    tolerance : float, optional
+        Voxels within the tolerance of the background aren't stored, defaulting to 0.
+    auto_threshold : bool, optional
+        Whether to estimate the background and tolerance from the histogram of the map,
+        defaulting to False.
+    pyramid : iterable of int, optional
+        The factors to bin the map by for lower resolution previews, such as (2, 4, 8).
+        Each level is loaded as a hidden volume object in the MN_data collection.
+        Defaults to none.
+    sigma : float, optional
+        The starting threshold of the node tree, in standard deviations above
+        the mean of the map. Defaults to 3.
+    enclosed_volume : float, optional
+        If given, the starting threshold encloses this volume in cubic Angstroms instead.
 
     Returns
     -------
     bpy.types.Object
-        The loaded volumetric object.
+        The loaded volumetric object. The voxel counts and file sizes of the
+        conversion are stored as custom properties, along with the statistics
+        of the map, its starting threshold as `initial_threshold` and the names
+        of the pyramid level objects as `pyramid_objects`.
     """
     # Convert MRC file to VDB format
-    vdb_file = map_to_vdb(file, invert=invert, world_scale=world_scale)
+    vdb_file = map_to_vdb(
+        file, invert=invert, world_scale=world_scale, cache_dir=cache_dir, cache_mb=cache_mb,
+        background=background, tolerance=tolerance, auto_threshold=auto_threshold,
+        pyramid=pyramid
+    )
     
     # Import VDB file into Blender
     vol_object = vdb_to_volume(vdb_file)
     
-    if name:
-        # Rename object to specified name
-        vol_object.name = name
+    # Rename object to specified name, the .vdb file name includes the cache key
+    vol_object.name = name or os.path.basename(file).split(".")[0]
+
+    entry = VDBCache(os.path.dirname(vdb_file)).find(vdb_file)
+    if entry is not None and "active_voxels" in entry:
+        for key in ["dense_voxels", "active_voxels", "dense_nbytes", "nbytes"]:
+            vol_object[key] = entry[key]
+        vol_object["conversion_report"] = conversion_report(entry)
+    if entry is not None and "statistics" in entry:
+        add_statistics(vol_object, entry["statistics"], sigma=sigma, enclosed_volume=enclosed_volume)
+
+    levels = [
+        pyramid_to_volume(vdb_file, factor, name=f"{vol_object.name}_{factor}x")
+        for factor in pyramid
+    ]
+    vol_object["pyramid_objects"] = [level.name for level in levels]
     
     return vol_object
 
 
+def load_isosurface(file: str, thresholds, name: str = None, invert: bool = False,
+                    resolution: int = 1, cache_dir: str = None, cache_mb: float = None) -> list:
+    """
+    Loads the isosurfaces of an MRC file at one or more thresholds as mesh objects.
+
+    The surfaces are extracted with `map_to_mesh()` and cached, so loading the
+    same map, threshold and resolution again doesn't touch the voxels.
+
+    Parameters
+    ----------
+    file : str
+        Path to the MRC file.
+    thresholds : float or list of float
+        The values of the isosurfaces.
+    name : str, optional
+        The name of the objects, followed by the threshold. Defaults to the name of the map.
+    invert : bool, optional
+        Whether to invert the data from the map, defaulting to False.
+    resolution : int, optional
+        The factor to bin the map by before extracting the surfaces, defaulting to 1.
+    cache_dir : str, optional
+        The directory to cache the meshes in. Defaults to the directory of the map.
+    cache_mb : float, optional
+        The maximum size of the cache in megabytes. Defaults to None, for no limit.
+
+    Returns
+    -------
+    list of bpy.types.Object
+        The mesh object of each threshold, in the same coordinates as a volume
+        imported with `load()`.
+    """
+    name = name or os.path.basename(file).split(".")[0]
+    objects = []
+    for threshold in np.atleast_1d(thresholds):
+        mesh_file = map_to_mesh(
+            file, threshold, invert=invert, resolution=resolution,
+            cache_dir=cache_dir, cache_mb=cache_mb
+        )
+        with np.load(mesh_file) as mesh:
+            mesh_object = obj.create_mesh_object(
+                f"{name}_{threshold:g}", coll.mn(), mesh["vertices"], mesh["faces"]
+            )
+        mesh_object.data.materials.append(nodes.MN_base_material())
+        mesh_object["threshold"] = float(threshold)
+        objects.append(mesh_object)
+    return objects
+
+
+def density_reader(file: str, fill: float = 0.0, chunk_size: int = 2 ** 20):
+    """
+    A per-frame attribute reader that samples a map at the atoms of the current
+    frame, to register with `mda.register_frame_attribute()`.
+
+    The map is memory-mapped once and stays open for as long as the reader exists.
+
+    Parameters
+    ----------
+    file : str
+        Path to the MRC file.
+    fill : float, optional
+        The value of atoms outside of the map, defaulting to 0.
+    chunk_size : int, optional
+        The number of atoms that are interpolated at once, defaulting to 2 ** 20.
+
+    Returns
+    -------
+    callable
+        Called with an atomgroup, returning the value of the map at each atom.
+    """
+    import mrcfile
+
+    mrc = mrcfile.mmap(file, mode='r')
+    origin, voxel_size = map_origin(mrc)
+
+    def reader(ag):
+        return sample_map(mrc.data, ag.positions, origin, voxel_size, fill=fill, chunk_size=chunk_size)
+
+    return reader
+
+
+def sample_density(mol_object: bpy.types.Object, file: str, name: str = "density",
+                   world_scale: float = 0.01, fill: float = 0.0, chunk_size: int = 2 ** 20) -> np.ndarray:
+    """
+    Store the value of a map at each atom of a molecule as a point attribute.
+
+    Useful to colour a model by how well it fits the map. If the molecule is a
+    streamed representation of the MDAnalysis session, the attribute is also
+    added to its per-frame attributes, so that it is sampled again at the
+    positions of every frame.
+
+    Parameters
+    ----------
+    mol_object : bpy.types.Object
+        The molecule object.
+    file : str
+        Path to the MRC file.
+    name : str, optional
+        The name of the attribute, defaulting to 'density'.
+    world_scale : float, optional
+        The scale of the molecule in the world, to convert its positions back to
+        Angstroms. Defaults to 0.01, streamed representations use the scale of the session.
+    fill : float, optional
+        The value of atoms outside of the map, defaulting to 0.
+    chunk_size : int, optional
+        The number of atoms that are interpolated at once, defaulting to 2 ** 20.
+
+    Returns
+    -------
+    np.ndarray
+        The value of the map at each atom.
+    """
+    import mrcfile
+
+    session = getattr(bpy.types.Scene, "mda_session", None)
+    streamed = session is not None and mol_object.name in session.rep_names
+    if streamed:
+        world_scale = session.world_scale
+
+    positions = obj.get_attribute(mol_object, 'position') / world_scale
+    with mrcfile.mmap(file, mode='r') as mrc:
+        origin, voxel_size = map_origin(mrc)
+        values = sample_map(mrc.data, positions, origin, voxel_size, fill=fill, chunk_size=chunk_size)
+    obj.add_attribute(mol_object, name, values, type="FLOAT", overwrite=True)
+
+    if streamed:
+        from . import mda
+        # the reader is registered per map, so that other representations can
+        # sample other maps into attributes of the same name
+        key = f"{name}:{os.path.abspath(file)}"
+        mda.register_frame_attribute(key, density_reader(file, fill=fill, chunk_size=chunk_size), attribute=name)
+        frame_attributes = session.universe_reps[mol_object.name]["frame_attributes"]
+        # a map sampled before into the same attribute is replaced
+        frame_attributes[:] = [
+            other for other in frame_attributes
+            if other == key or mda.frame_attribute_name(other) != name
+        ]
+        if key not in frame_attributes:
+            frame_attributes.append(key)
+        bake = session.universe_reps[mol_object.name].get("bake")
+        if bake is not None and not bake.has_attributes(frame_attributes):
+            warnings.warn(f"'{mol_object.name}' was baked without '{name}', so its frames are "
+                          "read from the trajectory again until it is baked again.")
+    return values
+
+
+def load_series(files, name: str = None, frame_start: int = 1, window: int = 8,
+                invert: bool = False, world_scale: float = 0.01, max_workers: int = None,
+                cache_dir: str = None, cache_mb: float = None, background: float = 0.0,
+                tolerance: float = 0.0, auto_threshold: bool = False, sigma: float = 3.0,
+                enclosed_volume: float = None) -> bpy.types.Object:
+    """
+    Loads a numbered series of MRC files as a single animated volume object.
+
+    Only the first frame is converted before returning. The rest are converted
+    in worker processes as the scene plays, and on each frame change the file
+    path of the volume is swapped to the .vdb file of that frame, so only one
+    frame of the series is loaded in Blender at a time.
+
+    Parameters
+    ----------
+    files : str or list of str
+        A directory, glob pattern or list of the frames, see `find_maps()`.
+    name : str, optional
+        The name of the object. Defaults to the name of the first frame,
+        without its frame number.
+    frame_start : int, optional
+        The scene frame of the first map of the series, defaulting to 1. The
+        first and last maps are held before and after the series.
+    window : int, optional
+        The number of frames that are converted ahead of the current frame, defaulting to 8.
+    invert : bool, optional
+        Whether to invert the data from the maps, defaulting to False.
+    world_scale : float, optional
+        Scale of the object in the world. Defaults to 0.01.
+    max_workers : int, optional
+        The number of worker processes. Defaults to the number of CPUs.
+    cache_dir : str, optional
+        The directory to cache the .vdb files in. Defaults to the directory of the maps.
+    cache_mb : float, optional
+        The maximum size of the cache in megabytes. Defaults to None, for no limit.
+    background : float, optional
+        The value of the voxels that aren't stored in the .vdb files, defaulting to 0.
+    tolerance : float, optional
+        Voxels within the tolerance of the background aren't stored, defaulting to 0.
+    auto_threshold : bool, optional
+        Whether to estimate the background and tolerance of each frame from its
+        histogram, defaulting to False.
+    sigma : float, optional
+        The starting threshold of the node tree, in standard deviations above
+        the mean of the first frame. Defaults to 3.
+    enclosed_volume : float, optional
+        If given, the starting threshold encloses this volume in cubic Angstroms
+        in the first frame instead.
+
+    Returns
+    -------
+    bpy.types.Object
+        The volume object, which stores the frames and conversion parameters of
+        the series as custom properties so the series resumes when the .blend
+        file is opened again.
+    """
+    series = MapSeries(
+        files, window=window, max_workers=max_workers, cache_dir=cache_dir, cache_mb=cache_mb,
+        invert=invert, background=background, tolerance=tolerance,
+        auto_threshold=auto_threshold
+    )
+    if not len(series):
+        raise FileNotFoundError(f"No maps found for '{files}'.")
+    first_file = series.frame_file(0)
+    vol_object = vdb_to_volume(first_file)
+    stem = os.path.basename(series.files[0]).split(".")[0]
+    vol_object.name = name or re.sub(r"[_\-.]*\d+$", "", stem) or stem
+    entry = VDBCache(os.path.dirname(first_file)).find(first_file)
+    if entry is not None and "statistics" in entry:
+        add_statistics(vol_object, entry["statistics"], sigma=sigma, enclosed_volume=enclosed_volume)
+
+    vol_object["map_series"] = series.files
+    vol_object["map_series_params"] = json.dumps(series.conversion.params)
+    vol_object["map_series_frame_start"] = frame_start
+    vol_object["map_series_window"] = series.window
+    vol_object["map_series_cache_dir"] = cache_dir or ""
+    vol_object["map_series_cache_mb"] = cache_mb or 0.0
+    _map_series[vol_object.name] = series
+    return vol_object
+
+
+# the series of the volume objects loaded with load_series(), by object name
+_map_series = {}
+
+def _swap_map_series(scene, wait: bool = False) -> bool:
+    """
+    Swap the .vdb file of every map series in the scene to the current frame.
+
+    Frames that aren't converted yet keep showing the previous file, unless
+    `wait` is True. Returns whether every series shows the current frame.
+    """
+    for object_name in [name for name in _map_series if name not in bpy.data.objects]:
+        _map_series.pop(object_name).close()
+
+    current = True
+    for vol_object in scene.objects:
+        if vol_object.type != 'VOLUME' or "map_series" not in vol_object:
+            continue
+        series = _map_series.get(vol_object.name)
+        if series is None:
+            series = MapSeries.from_object(vol_object)
+            _map_series[vol_object.name] = series
+        try:
+            file = series.frame_file(scene.frame_current - vol_object["map_series_frame_start"], wait=wait)
+        except Exception as error:
+            warnings.warn(f"Unable to convert the current frame of '{vol_object.name}': {error}")
+            continue
+        if file is None:
+            current = False
+        elif vol_object.data.filepath != file:
+            vol_object.data.filepath = file
+    return current
+
+
+def _poll_map_series():
+    # timer that shows the frames that weren't converted yet when the frame changed
+    if _swap_map_series(bpy.context.scene):
+        return None
+    return 0.25
+
+
+@persistent
+def _update_map_series(scene):
+    """
+    Swap the .vdb file of every map series in the scene to the current frame.
+    Series are created again from their objects when a .blend file is opened.
+
+    Only renders wait for frames that aren't converted yet. During playback
+    and scrubbing the previous frame stays until a timer finds the frame converted.
+    """
+    if _swap_map_series(scene, wait=bpy.app.is_job_running('RENDER')):
+        return
+    if not bpy.app.timers.is_registered(_poll_map_series):
+        bpy.app.timers.register(_poll_map_series, first_interval=0.25)
+
+
 class MN_OT_Import_Map(bpy.types.Operator):
     bl_idname = "mn.import_map"
     bl_label = "ImportMap"
@@ -223,15 +1673,218 @@ class MN_OT_Import_Map(bpy.types.Operator):
         invert = bpy.context.scene.MN_import_map_invert
         setup_node_tree = bpy.context.scene.MN_import_map_nodes
         
+        if bpy.context.scene.MN_import_map_mode == 'ISOSURFACE':
+            try:
+                thresholds = [float(value) for value in bpy.context.scene.MN_import_map_thresholds.split(",")]
+            except ValueError:
+                self.report({'ERROR'}, message = "Thresholds must be comma separated numbers.")
+                return {'CANCELLED'}
+            load_isosurface(
+                file = map_file, 
+                thresholds = thresholds, 
+                invert = invert,
+                resolution = bpy.context.scene.MN_import_map_resolution,
+                cache_dir = bpy.path.abspath(bpy.context.scene.MN_import_map_cache_dir) or None,
+                cache_mb = bpy.context.scene.MN_import_map_cache_mb or None
+                )
+            return {"FINISHED"}
+        
         vol = load(
             file = map_file, 
-            invert = invert
+            invert = invert,
+            cache_dir = bpy.path.abspath(bpy.context.scene.MN_import_map_cache_dir) or None,
+            cache_mb = bpy.context.scene.MN_import_map_cache_mb or None,
+            background = bpy.context.scene.MN_import_map_background,
+            tolerance = bpy.context.scene.MN_import_map_tolerance,
+            auto_threshold = bpy.context.scene.MN_import_map_auto_threshold,
+            pyramid = (2, 4, 8) if bpy.context.scene.MN_import_map_pyramid else (),
+            sigma = bpy.context.scene.MN_import_map_threshold_sigma,
+            enclosed_volume = bpy.context.scene.MN_import_map_enclosed_volume or None
             )
+        if "conversion_report" in vol:
+            self.report({'INFO'}, message = vol["conversion_report"])
         if setup_node_tree:
             nodes.create_starting_nodes_density(vol)
         
         return {"FINISHED"}
 
+class MN_OT_Prune_Map_Cache(bpy.types.Operator):
+    bl_idname = "mn.prune_map_cache"
+    bl_label = "Prune Cache"
+    bl_description = "Remove stale and least recently used .vdb files from the map cache"
+    bl_options = {"REGISTER"}
+
+    @classmethod
+    def poll(cls, context):
+        return True
+
+    def execute(self, context):
+        cache_dir = bpy.path.abspath(bpy.context.scene.MN_import_map_cache_dir)
+        if not cache_dir:
+            cache_dir = os.path.dirname(bpy.path.abspath(bpy.context.scene.MN_import_map))
+        cache = VDBCache(cache_dir)
+        freed = cache.prune(max_mb = bpy.context.scene.MN_import_map_cache_mb or None)
+        self.report(
+            {'INFO'}, 
+            message=f"Freed {freed / 1024 ** 2:.1f} MB, {cache.nbytes / 1024 ** 2:.1f} MB "
+                    f"in {len(cache.entries)} cached files remaining in '{cache_dir}'."
+        )
+        return {"FINISHED"}
+
+
+class MN_OT_Batch_Convert_Maps(bpy.types.Operator):
+    bl_idname = "mn.batch_convert_maps"
+    bl_label = "Convert Maps"
+    bl_description = "Convert a directory or glob of maps to .vdb files in parallel, press Esc to cancel"
+    bl_options = {"REGISTER"}
+
+    _timer = None
+    _conversion = None
+
+    @classmethod
+    def poll(cls, context):
+        return bool(context.scene.MN_import_map_batch)
+
+    def invoke(self, context, event):
+        scene = context.scene
+        pattern = scene.MN_import_map_batch
+        if not glob.has_magic(pattern):
+            pattern = bpy.path.abspath(pattern)
+        self._conversion = MapConversion(
+            pattern,
+            max_workers = scene.MN_import_map_batch_workers or None,
+            cache_dir = bpy.path.abspath(scene.MN_import_map_cache_dir) or None,
+            cache_mb = scene.MN_import_map_cache_mb or None,
+            **self._params(scene)
+            )
+        if not self._conversion.files:
+            self.report({'WARNING'}, message = f"No maps found for '{pattern}'.")
+            return {'CANCELLED'}
+        self._conversion.start()
+        
+        context.window_manager.progress_begin(0, self._conversion.total)
+        context.window_manager.progress_update(self._conversion.done)
+        self._timer = context.window_manager.event_timer_add(0.25, window = context.window)
+        context.window_manager.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    @staticmethod
+    def _params(scene):
+        return {
+            "invert": scene.MN_import_map_invert,
+            "background": scene.MN_import_map_background,
+            "tolerance": scene.MN_import_map_tolerance,
+            "auto_threshold": scene.MN_import_map_auto_threshold,
+            "pyramid": (2, 4, 8) if scene.MN_import_map_pyramid else (),
+        }
+
+    def modal(self, context, event):
+        conversion = self._conversion
+        if event.type == 'ESC':
+            conversion.cancel()
+            self._end(context)
+            self.report(
+                {'WARNING'}, 
+                message = f"Cancelled after converting {len(conversion.results)} of {conversion.total} maps."
+                )
+            return {'CANCELLED'}
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+        
+        for file in conversion.poll():
+            if file in conversion.errors:
+                self.report({'ERROR'}, message = f"Failed to convert '{file}': {conversion.errors[file]}")
+        context.window_manager.progress_update(conversion.done)
+        if not conversion.finished:
+            return {'PASS_THROUGH'}
+        
+        self._end(context)
+        # bpy is only safe to use from the main thread, so the maps are loaded
+        # one after another, reusing the files that were just cached
+        if context.scene.MN_import_map_batch_load:
+            for file in conversion.results:
+                vol = load(
+                    file, 
+                    cache_dir = conversion.cache_dir, 
+                    sigma = context.scene.MN_import_map_threshold_sigma,
+                    enclosed_volume = context.scene.MN_import_map_enclosed_volume or None,
+                    **self._params(context.scene)
+                    )
+                if context.scene.MN_import_map_nodes:
+                    nodes.create_starting_nodes_density(vol)
+        self.report(
+            {'INFO'}, 
+            message = f"Converted {len(conversion.results)} of {conversion.total} maps."
+            )
+        return {'FINISHED'}
+
+    def _end(self, context):
+        context.window_manager.event_timer_remove(self._timer)
+        context.window_manager.progress_end()
+
+class MN_OT_Import_Map_Series(bpy.types.Operator):
+    bl_idname = "mn.import_map_series"
+    bl_label = "Load Series"
+    bl_description = "Load a directory or glob of numbered maps as one animated volume, converting frames as they play"
+    bl_options = {"REGISTER"}
+
+    @classmethod
+    def poll(cls, context):
+        return bool(context.scene.MN_import_map_batch)
+
+    def execute(self, context):
+        scene = context.scene
+        pattern = scene.MN_import_map_batch
+        if not glob.has_magic(pattern):
+            pattern = bpy.path.abspath(pattern)
+        try:
+            vol = load_series(
+                pattern, 
+                frame_start = scene.frame_start,
+                window = scene.MN_import_map_series_window,
+                max_workers = scene.MN_import_map_batch_workers or None,
+                cache_dir = bpy.path.abspath(scene.MN_import_map_cache_dir) or None,
+                cache_mb = scene.MN_import_map_cache_mb or None,
+                invert = scene.MN_import_map_invert,
+                background = scene.MN_import_map_background,
+                tolerance = scene.MN_import_map_tolerance,
+                auto_threshold = scene.MN_import_map_auto_threshold,
+                sigma = scene.MN_import_map_threshold_sigma,
+                enclosed_volume = scene.MN_import_map_enclosed_volume or None
+                )
+        except FileNotFoundError as error:
+            self.report({'WARNING'}, message = str(error))
+            return {'CANCELLED'}
+        if scene.MN_import_map_nodes:
+            nodes.create_starting_nodes_density(vol)
+        self.report(
+            {'INFO'}, 
+            message = f"Loaded {len(vol['map_series'])} frames from frame {scene.frame_start}."
+            )
+        return {"FINISHED"}
+
+
+class MN_OT_Sample_Map_Density(bpy.types.Operator):
+    bl_idname = "mn.sample_map_density"
+    bl_label = "Sample Map"
+    bl_description = "Store the value of the map at each atom of the active molecule as the 'density' attribute"
+    bl_options = {"REGISTER", "UNDO"}
+
+    @classmethod
+    def poll(cls, context):
+        return context.active_object is not None and context.active_object.type == 'MESH'
+
+    def execute(self, context):
+        mol_object = context.active_object
+        values = sample_density(mol_object, bpy.path.abspath(context.scene.MN_import_map))
+        self.report(
+            {'INFO'}, 
+            message = f"Sampled {len(values):,} atoms of '{mol_object.name}', "
+                      f"density from {values.min():.3g} to {values.max():.3g}."
+            )
+        return {"FINISHED"}
+
+
 def panel(layout_function, scene):
     col_main = layout_function.column(heading = '', align = False)
     col_main.label(text = 'Import EM Maps as Volumes')
@@ -245,21 +1898,82 @@ def panel(layout_function, scene):
             )
     
     row.operator('mn.import_map', text = 'Load Map', icon = 'FILE_TICK')
+    row.operator('mn.sample_map_density', text = '', icon = 'EYEDROPPER')
     
     col_main.prop(bpy.context.scene, 'MN_import_map', 
              text = 'EM Map', 
              emboss = True
             )
+    col_main.prop(bpy.context.scene, 'MN_import_map_mode', expand = True)
+    if bpy.context.scene.MN_import_map_mode == 'ISOSURFACE':
+        row_surface = col_main.row()
+        row_surface.prop(bpy.context.scene, 'MN_import_map_thresholds', 
+                 text = 'Thresholds'
+                )
+        row_surface.prop(bpy.context.scene, 'MN_import_map_resolution', 
+                 text = 'Binning'
+                )
+    row_sparse = col_main.row()
+    row_sparse.prop(bpy.context.scene, 'MN_import_map_auto_threshold', 
+             text = 'Auto Threshold'
+            )
+    row_values = row_sparse.row(align = True)
+    row_values.prop(bpy.context.scene, 'MN_import_map_background', 
+             text = 'Background'
+            )
+    row_values.prop(bpy.context.scene, 'MN_import_map_tolerance', 
+             text = 'Tolerance'
+            )
+    row_values.enabled = not bpy.context.scene.MN_import_map_auto_threshold
+    row_threshold = col_main.row()
+    row_threshold.prop(bpy.context.scene, 'MN_import_map_threshold_sigma', 
+             text = 'Threshold (σ)'
+            )
+    row_threshold.prop(bpy.context.scene, 'MN_import_map_enclosed_volume', 
+             text = 'Enclosed Å³'
+            )
+    row_threshold.enabled = bpy.context.scene.MN_import_map_mode == 'VOLUME'
+    col_main.prop(bpy.context.scene, 'MN_import_map_pyramid', 
+             text = 'Preview Pyramid (2x, 4x, 8x)'
+            )
+    row_batch = col_main.row()
+    row_batch.prop(bpy.context.scene, 'MN_import_map_batch', 
+             text = 'Batch', 
+             emboss = True
+            )
+    row_batch.prop(bpy.context.scene, 'MN_import_map_batch_workers', 
+             text = 'Workers'
+            )
+    row_batch.prop(bpy.context.scene, 'MN_import_map_batch_load', 
+             text = 'Load'
+            )
+    row_batch.operator('mn.batch_convert_maps', text = '', icon = 'FILE_REFRESH')
+    row_series = col_main.row()
+    row_series.prop(bpy.context.scene, 'MN_import_map_series_window', 
+             text = 'Frames Ahead'
+            )
+    row_series.operator('mn.import_map_series', icon = 'SEQUENCE')
+    row_cache = col_main.row()
+    row_cache.prop(bpy.context.scene, 'MN_import_map_cache_dir', 
+             text = 'Cache', 
+             emboss = True
+            )
+    row_cache.prop(bpy.context.scene, 'MN_import_map_cache_mb', 
+             text = 'Max MB', 
+             emboss = True
+            )
+    row_cache.operator('mn.prune_map_cache', text = '', icon = 'TRASH')
+    cache_dir = bpy.context.scene.MN_import_map_cache_dir or os.path.dirname(bpy.context.scene.MN_import_map)
     col_main.label(text = "Intermediate file will be created:")
     box = col_main.box()
     box.alignment = "LEFT"
     box.scale_y = 0.4
     box.label(
-        text = f"Intermediate file: {path_to_vdb(bpy.context.scene.MN_import_map)}."
+        text = f"Intermediate file in: {cache_dir}."
         )
     box.label(
         text = "Please do not delete this file or the volume will not render."
     )
     box.label(
-        text = "Move the original .map file to change this location."
+        text = "Set the cache directory to change this location."
     )
\ No newline at end of file
@@ -65,6 +65,17 @@ bpy.types.Scene.MN_import_build_assembly = bpy.props.BoolProperty(
     default = False
 )
 
+bpy.types.Scene.MN_import_assembly_rotations = bpy.props.EnumProperty(
+    name = 'Assembly Rotations', 
+    description = 'Rotation attributes of the assembly data object to add next to the Euler angles of assembly_rotation', 
+    items = (
+        ('quaternion', 'Quaternion', 'Add assembly_rotationQuaternion as a (w, x, y, z) color attribute'),
+        ('matrix', 'Matrix', 'Add the rotated axes as assembly_rotationAxisX, assembly_rotationAxisY and assembly_rotationAxisZ'),
+    ),
+    options = {'ENUM_FLAG'},
+    default = set()
+)
+
 
 bpy.types.Scene.MN_import_local_name = bpy.props.StringProperty(
     name = 'MN_name', 
@@ -97,7 +108,8 @@ def molecule_rcsb(
     starting_style = 'atoms',               
     setup_nodes = True,
     cache_dir = None,
-    build_assembly = False
+    build_assembly = False,
+    rotation_layouts = ()
     ):
     from biotite import InvalidFileError
     start = time.process_time()
@@ -142,7 +154,8 @@ def molecule_rcsb(
         transforms_array = assembly.mesh.get_transforms_from_dict(obj['biological_assemblies'])
         data_object = assembly.mesh.create_data_object(
             transforms_array = transforms_array, 
-            name = f"data_assembly_{obj.name}"
+            name = f"data_assembly_{obj.name}",
+            rotation_layouts = rotation_layouts
         )
         
         node_assembly = nodes.create_assembly_node_tree(
@@ -697,7 +710,8 @@ class MN_OT_Import_Protein_RCSB(bpy.types.Operator):
             include_bonds=context.scene.MN_import_include_bonds,
             starting_style=context.scene.MN_import_default_style,
             cache_dir=context.scene.MN_cache_dir, 
-            build_assembly = bpy.context.scene.MN_import_build_assembly
+            build_assembly = bpy.context.scene.MN_import_build_assembly,
+            rotation_layouts = bpy.context.scene.MN_import_assembly_rotations
         )
         
         bpy.context.view_layer.objects.active = MN_object
@@ -0,0 +1,528 @@
+"""
+Conversion of MRC maps to pyopenvdb grids and .vdb files.
+
+This module only depends on numpy, mrcfile and pyopenvdb, and doesn't import
+bpy or the rest of the add-on, so that it can also be imported on its own by
+the worker processes of `density.convert_maps()`.
+"""
+
+import os
+import numpy as np
+
+def map_chunks(data: np.ndarray, chunk_mb: float = 256, multiple: int = 1):
+    """
+    Iterate over a volume in slabs along its first (z) axis.
+
+    Parameters
+    ----------
+    data : np.ndarray
+        The volume, usually the memory-mapped data of an MRC file.
+    chunk_mb : float, optional
+        The maximum size of each slab in megabytes, defaulting to 256.
+        Slabs are always at least one section thick.
+    multiple : int, optional
+        The number of sections of each slab is rounded to a multiple of this,
+        so that slabs can be binned without crossing bins. Defaults to 1.
+
+    Yields
+    ------
+    tuple of (int, np.ndarray)
+        The index of the first section of the slab and the slab itself, as a
+        view into `data`.
+    """
+    section_bytes = max(1, data[:1].nbytes)
+    n_sections = max(1, int(chunk_mb * 1024 ** 2 // section_bytes))
+    n_sections = max(multiple, n_sections // multiple * multiple)
+    for start in range(0, data.shape[0], n_sections):
+        yield start, data[start:start + n_sections]
+
+
+def block_mean(volume: np.ndarray, factor: int) -> np.ndarray:
+    """
+    Downsample a volume by averaging blocks of factor x factor x factor voxels.
+
+    Blocks at the edges of volumes that aren't a multiple of the factor are
+    averaged over the voxels they contain.
+
+    Parameters
+    ----------
+    volume : np.ndarray
+        The 3D volume to downsample.
+    factor : int
+        The width of the blocks in voxels.
+
+    Returns
+    -------
+    np.ndarray
+        The float32 volume with each dimension divided by the factor, rounded up.
+    """
+    binned = volume
+    counts = []
+    for axis, n in enumerate(volume.shape):
+        starts = np.arange(0, n, factor)
+        binned = np.add.reduceat(binned, starts, axis=axis, dtype=np.float64)
+        counts.append(np.diff(np.append(starts, n)))
+    binned /= counts[0][:, None, None] * counts[1][None, :, None] * counts[2][None, None, :]
+    return binned.astype(np.float32)
+
+
+def _grid_type(dtype: np.dtype):
+    """
+    The pyopenvdb grid class and numpy dtype to copy into it for an MRC dtype.
+    """
+    import pyopenvdb as vdb
+
+    dtype = np.dtype(dtype)
+    if dtype.kind == 'f':
+        return vdb.FloatGrid, np.float32
+    if dtype == np.int64:
+        return vdb.Int64Grid, np.int64
+    if dtype.kind in 'iu':
+        return vdb.Int32Grid, np.int32
+    raise ValueError(f"Grid data type '{dtype}' is an unsupported type.")
+
+
+def integer_threshold(background: float, tolerance: float):
+    """
+    The integer background and tolerance of an integer grid that leave the same
+    integer values inactive as a fractional background and tolerance.
+
+    The inactive values are the integers within [background - tolerance, background + tolerance].
+    When that is an even number of values the range is widened by one value below it,
+    as an integer background can only be centred on an odd number of values.
+
+    Returns
+    -------
+    tuple of int
+        The background value and the tolerance.
+    """
+    lowest = int(np.ceil(background - tolerance))
+    highest = int(np.floor(background + tolerance))
+    if highest < lowest:
+        # no integer is within the tolerance, only the background itself is inactive
+        return int(np.round(background)), 0
+    background = (lowest + highest) // 2
+    return background, highest - background
+
+
+def header_range(mrc):
+    """
+    The (minimum, maximum) of an MRC file from its header, or None if the header
+    doesn't record them, which is signalled by a maximum below the minimum.
+    """
+    dmin, dmax = float(mrc.header.dmin), float(mrc.header.dmax)
+    if not np.isfinite([dmin, dmax]).all() or dmax <= dmin:
+        return None
+    return dmin, dmax
+
+
+class MapStatistics:
+    def __init__(self, bins: int = 256, value_range=None, voxel_volume: float = 1.0):
+        """
+        Accumulates the statistics and histogram of a map one slab at a time,
+        so they can be gathered in the same pass that converts the map.
+
+        The mean and variance of the slabs are combined pairwise, so they stay
+        accurate for maps with billions of voxels. The bins of the histogram span
+        the value range, which usually comes from the header with `header_range()`.
+        Without a range, the bins start at the range of the first slab and are
+        merged in pairs to double their width whenever a later slab falls outside
+        of them, so the histogram is at worst half as fine as with a known range.
+        Values outside of a given range are counted in the first and last bins.
+
+        Parameters
+        ----------
+        bins : int, optional
+            The number of bins of the histogram, defaulting to 256. Must be even
+            if there is no value range.
+        value_range : tuple of (float, float), optional
+            The minimum and maximum of the histogram. Defaults to the range of the map.
+        voxel_volume : float, optional
+            The volume of each voxel, such as the product of the voxel size in
+            Angstroms, defaulting to 1 to measure the enclosed volume in voxels.
+        """
+        self.bins = bins
+        self.fixed = value_range is not None
+        self.low, self.high = value_range if self.fixed else (None, None)
+        self.voxel_volume = voxel_volume
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.minimum, self.maximum = np.inf, -np.inf
+        self.n, self.mean, self.m2 = 0, 0.0, 0.0
+
+    def _widen(self, minimum: float, maximum: float):
+        if self.low is None:
+            self.low, self.high = minimum, maximum if maximum > minimum else minimum + 1.0
+            return
+        # double the width of the bins until they cover the slab, merging pairs of bins
+        while minimum < self.low or maximum > self.high:
+            merged = self.counts.reshape(-1, 2).sum(axis=1)
+            self.counts = np.zeros_like(self.counts)
+            width = self.high - self.low
+            if maximum > self.high:
+                self.counts[:len(merged)] = merged
+                self.high += width
+            else:
+                self.counts[len(merged):] = merged
+                self.low -= width
+
+    def add(self, slab: np.ndarray):
+        """
+        Add the values of a slab of the map.
+        """
+        if not slab.size:
+            return
+        slab_min, slab_max = float(slab.min()), float(slab.max())
+        self.minimum = min(self.minimum, slab_min)
+        self.maximum = max(self.maximum, slab_max)
+        if not self.fixed:
+            self._widen(slab_min, slab_max)
+        edges = np.linspace(self.low, self.high, self.bins + 1)
+        self.counts += np.histogram(np.clip(slab, edges[0], edges[-1]), bins=edges)[0]
+        # combine the mean and sum of squared deviations of the slab with the previous slabs
+        slab_n = slab.size
+        slab_mean = float(slab.mean(dtype=np.float64))
+        slab_m2 = float(np.square(slab - slab_mean, dtype=np.float64).sum())
+        delta = slab_mean - self.mean
+        total = self.n + slab_n
+        self.mean += delta * slab_n / total
+        self.m2 += slab_m2 + delta ** 2 * self.n * slab_n / total
+        self.n = total
+
+    def result(self, invert: bool = False) -> dict:
+        """
+        The statistics of the slabs that were added, see `map_statistics()`.
+        """
+        low, high = (self.low, self.high) if self.low is not None else (0.0, 1.0)
+        edges = np.linspace(low, high, self.bins + 1)
+        counts = self.counts
+        minimum, maximum, mean = self.minimum, self.maximum, self.mean
+        if invert:
+            # the data is inverted as the maximum minus each value
+            edges = maximum - edges[::-1]
+            counts = counts[::-1]
+            minimum, maximum, mean = 0.0, maximum - minimum, maximum - mean
+
+        enclosed = np.append(np.cumsum(counts[::-1])[::-1], 0) * self.voxel_volume
+        return {
+            "min": float(minimum),
+            "max": float(maximum),
+            "mean": float(mean),
+            "std": float(np.sqrt(self.m2 / max(self.n, 1))),
+            "edges": edges.tolist(),
+            "counts": counts.tolist(),
+            "enclosed_volume": enclosed.tolist(),
+        }
+
+
+def map_statistics(data: np.ndarray, invert: bool = False, chunk_mb: float = 256, bins: int = 256,
+                   value_range=None, voxel_volume: float = 1.0) -> dict:
+    """
+    The statistics and histogram of a map, in a single streaming pass over its
+    slabs with `MapStatistics`.
+
+    Parameters
+    ----------
+    data : np.ndarray
+        The volume, usually the memory-mapped data of an MRC file.
+    invert : bool, optional
+        Whether to return the statistics of the inverted data, as it is converted
+        by `mrc_to_grids()`. Defaults to False.
+    chunk_mb : float, optional
+        The maximum size of the slabs the map is read in, defaulting to 256.
+    bins : int, optional
+        The number of bins of the histogram, defaulting to 256.
+    value_range : tuple of (float, float), optional
+        The minimum and maximum of the histogram. Defaults to the range of the map.
+    voxel_volume : float, optional
+        The volume of each voxel, such as the product of the voxel size in
+        Angstroms, defaulting to 1 to measure the enclosed volume in voxels.
+
+    Returns
+    -------
+    dict
+        The `min`, `max`, `mean` and `std` of the map, the `bins + 1` histogram
+        `edges` and its `counts`, and the `enclosed_volume` of the voxels at or
+        above each edge, which is the volume inside the surface at that threshold.
+    """
+    statistics = MapStatistics(bins=bins, value_range=value_range, voxel_volume=voxel_volume)
+    for _, slab in map_chunks(data, chunk_mb):
+        statistics.add(slab)
+    return statistics.result(invert=invert)
+
+
+def statistics_background(statistics: dict):
+    """
+    Estimate the background value and tolerance of a map from its statistics.
+
+    Most voxels of an EM map or tomogram are solvent, so the background is the
+    most common value, the centre of the largest histogram bin. The tolerance is
+    the standard deviation of the map, so voxels within one standard deviation
+    of the background are treated as background.
+
+    Returns
+    -------
+    tuple of (float, float)
+        The background value and the tolerance.
+    """
+    edges = statistics["edges"]
+    mode = int(np.argmax(statistics["counts"]))
+    return float((edges[mode] + edges[mode + 1]) / 2), float(statistics["std"])
+
+
+def auto_background(data: np.ndarray, invert: bool = False, chunk_mb: float = 256, bins: int = 256):
+    """
+    Estimate the background value and tolerance of a map from its histogram,
+    see `statistics_background()`.
+
+    Parameters
+    ----------
+    data : np.ndarray
+        The volume, usually the memory-mapped data of an MRC file.
+    invert : bool, optional
+        Whether the data will be inverted, defaulting to False.
+    chunk_mb : float, optional
+        The maximum size of the slabs the map is read in, defaulting to 256.
+    bins : int, optional
+        The number of bins of the histogram, defaulting to 256.
+
+    Returns
+    -------
+    tuple of (float, float)
+        The background value and the tolerance.
+    """
+    return statistics_background(map_statistics(data, invert=invert, chunk_mb=chunk_mb, bins=bins))
+
+
+def mrc_to_grids(mrc, invert: bool = False, chunk_mb: float = 256, background: float = 0.0,
+                 tolerance: float = 0.0, auto_threshold: bool = False, pyramid=(),
+                 statistics: MapStatistics = None, maximum: float = None):
+    """
+    Converts the data of an open MRC file into a pyopenvdb grid, one z-slab at a time,
+    along with binned grids for each of the pyramid factors.
+
+    Only one slab is held in memory at a time besides the grid, so memory-mapped
+    maps that are larger than the available memory can be converted.
+    Voxels within the tolerance of the background are left inactive, so the
+    grid only stores the voxels near the density of interest.
+
+    Parameters
+    ----------
+    mrc : mrcfile.mrcfile.MrcFile
+        The open MRC file, ideally opened with `mrcfile.mmap`.
+    invert : bool, optional
+        Whether to invert the data from the grid, defaulting to False.
+    chunk_mb : float, optional
+        The maximum size of each slab in megabytes, defaulting to 256.
+    background : float, optional
+        The value of inactive voxels, defaulting to 0.
+    tolerance : float, optional
+        Voxels within the tolerance of the background are inactive, defaulting to 0.
+    auto_threshold : bool, optional
+        Whether to estimate the background and tolerance with `auto_background()`
+        instead, defaulting to False.
+    pyramid : iterable of int, optional
+        The factors to bin the map by with `block_mean()`, such as (2, 4, 8).
+        The binned grids are built from the same slabs as the full grid.
+        Defaults to no binned grids.
+    statistics : MapStatistics, optional
+        Adds the slabs of the map to these statistics as they are converted, before
+        they are inverted, so the statistics don't need another pass over the map.
+    maximum : float, optional
+        The maximum of the map, which the data is inverted from. Defaults to the
+        maximum of the pass that estimates the background, then to the maximum
+        in the header, and only reads the map for it if neither is known.
+
+    Returns
+    -------
+    dict
+        The grid for each factor, with the full resolution grid as factor 1.
+        The full grid is a pyopenvdb.FloatGrid, Int32Grid or Int64Grid depending
+        on the data type of the map, and the binned grids are FloatGrids that are
+        transformed to overlay the full grid.
+    """
+    import pyopenvdb as vdb
+
+    data = mrc.data
+    grid_class, dtype = _grid_type(data.dtype)
+    if auto_threshold:
+        map_pass = MapStatistics()
+        for _, slab in map_chunks(data, chunk_mb):
+            map_pass.add(slab)
+        background, tolerance = statistics_background(map_pass.result(invert=invert))
+        if maximum is None:
+            maximum = map_pass.maximum
+    # the grid only accepts python numbers of its own type
+    if dtype is np.float32:
+        background, tolerance = float(background), float(tolerance)
+    else:
+        background, tolerance = integer_threshold(background, tolerance)
+    grids = {1: grid_class(background)}
+    for factor in pyramid:
+        grid = vdb.FloatGrid(float(background))
+        # each binned voxel is centred on the block of voxels it averages
+        offset = (factor - 1) / 2
+        grid.transform = vdb.createLinearTransform([
+            [factor, 0, 0, 0],
+            [0, factor, 0, 0],
+            [0, 0, factor, 0],
+            [offset, offset, offset, 1],
+        ])
+        grids[factor] = grid
+
+    if invert and maximum is None:
+        # the maximum of the whole map is needed before any slab can be inverted
+        value_range = header_range(mrc)
+        if value_range is not None:
+            maximum = value_range[1]
+        else:
+            maximum = max(slab.max() for _, slab in map_chunks(data, chunk_mb))
+
+    # slabs are a multiple of every factor so that no block is split between slabs
+    multiple = int(np.lcm.reduce([1, *pyramid]))
+    for start, slab in map_chunks(data, chunk_mb, multiple=multiple):
+        slab = np.array(slab, dtype=dtype)
+        if statistics is not None:
+            statistics.add(slab)
+        if invert:
+            np.subtract(maximum, slab, out=slab, casting='unsafe')
+        grids[1].copyFromArray(slab, ijk=(start, 0, 0), tolerance=tolerance)
+        for factor in pyramid:
+            grids[factor].copyFromArray(
+                block_mean(slab, factor), ijk=(start // factor, 0, 0), tolerance=float(tolerance)
+            )
+
+    for grid in grids.values():
+        grid.gridClass = vdb.GridClass.FOG_VOLUME
+        grid.name = 'density'
+    return grids
+
+
+def mrc_to_grid(mrc, invert: bool = False, chunk_mb: float = 256,
+                background: float = 0.0, tolerance: float = 0.0, auto_threshold: bool = False):
+    """
+    Converts the data of an open MRC file into a pyopenvdb grid, one z-slab at a time.
+
+    See `mrc_to_grids()` for the parameters.
+
+    Returns
+    -------
+    pyopenvdb.FloatGrid, pyopenvdb.Int32Grid or pyopenvdb.Int64Grid
+        The grid containing the density data.
+    """
+    return mrc_to_grids(
+        mrc, invert=invert, chunk_mb=chunk_mb, background=background,
+        tolerance=tolerance, auto_threshold=auto_threshold
+    )[1]
+
+
+def map_to_grid(file: str, invert: bool = False, chunk_mb: float = 256,
+                background: float = 0.0, tolerance: float = 0.0, auto_threshold: bool = False):
+    """
+    Reads an MRC file and converts it into a pyopenvdb FloatGrid object.
+
+    This function memory-maps a file in MRC format, and converts it into a pyopenvdb FloatGrid object,
+    which can be used to represent volumetric data in Blender.
+
+    Parameters
+    ----------
+    file : str
+        The path to the MRC file.
+    invert : bool, optional
+        Whether to invert the data from the grid, defaulting to False. Some file types
+        such as EM tomograms have inverted values, where a high value == low density.
+    chunk_mb : float, optional
+        The maximum size in megabytes of the z-slabs the map is read in, defaulting to 256.
+    background : float, optional
+        The value of the voxels that aren't stored in the grid, defaulting to 0.
+    tolerance : float, optional
+        Voxels within the tolerance of the background aren't stored, defaulting to 0.
+    auto_threshold : bool, optional
+        Whether to estimate the background and tolerance from the histogram of the map,
+        defaulting to False.
+
+    Returns
+    -------
+    pyopenvdb.FloatGrid
+        A pyopenvdb FloatGrid object containing the density data.
+    """
+    import mrcfile
+
+    with mrcfile.mmap(file, mode='r') as mrc:
+        return mrc_to_grid(
+            mrc, invert=invert, chunk_mb=chunk_mb, background=background,
+            tolerance=tolerance, auto_threshold=auto_threshold
+        )
+
+
+def pyramid_path(vdb_file: str, factor: int) -> str:
+    """
+    The path of the VDB file of a pyramid level, binned by the factor.
+    """
+    return f"{os.path.splitext(vdb_file)[0]}_{factor}x.vdb"
+
+
+def write_vdb(file: str, file_path: str, params: dict, chunk_mb: float = 256):
+    """
+    Converts an MRC file and writes the grids to .vdb files, without touching the cache.
+
+    Parameters
+    ----------
+    file : str
+        The path to the input MRC file.
+    file_path : str
+        The path of the .vdb file of the full resolution grid.
+    params : dict
+        The conversion parameters, the `invert`, `background`, `tolerance`,
+        `auto_threshold` and `pyramid` arguments of `mrc_to_grids()`.
+    chunk_mb : float, optional
+        The maximum size in megabytes of the z-slabs the map is read in, defaulting to 256.
+
+    Returns
+    -------
+    tuple of (list of str, dict)
+        The files that were written, with the pyramid levels after the full grid,
+        and the voxel counts, sizes and `map_statistics()` of the conversion for
+        the cache entry.
+    """
+    import mrcfile
+    import pyopenvdb as vdb
+
+    # Memory-map the MRC file, reading the header once, and convert it to pyopenvdb grids
+    with mrcfile.mmap(file, mode='r') as mrc:
+        voxel_size = np.array([mrc.voxel_size.x, mrc.voxel_size.y, mrc.voxel_size.z])
+        statistics = MapStatistics(
+            value_range=header_range(mrc), voxel_volume=float(np.prod(voxel_size)) or 1.0
+        )
+        background, tolerance = params["background"], params["tolerance"]
+        if params["auto_threshold"]:
+            # the background has to be known before the conversion, which needs
+            # its own pass over the map, otherwise the statistics are gathered
+            # from the slabs as they are converted
+            for _, slab in map_chunks(mrc.data, chunk_mb):
+                statistics.add(slab)
+            background, tolerance = statistics_background(statistics.result(invert=params["invert"]))
+        grids = mrc_to_grids(
+            mrc, invert=params["invert"], chunk_mb=chunk_mb, background=background,
+            tolerance=tolerance, pyramid=params["pyramid"],
+            statistics=None if params["auto_threshold"] else statistics,
+            maximum=statistics.maximum if params["auto_threshold"] else None
+        )
+        info = {
+            "dense_voxels": int(mrc.data.size),
+            "dense_nbytes": int(mrc.data.nbytes),
+            "statistics": statistics.result(invert=params["invert"]),
+            "active_voxels": int(grids[1].activeVoxelCount()),
+        }
+
+    # Rotate the grids for import into Blender
+    for level in grids.values():
+        level.transform.rotate(np.pi / 2, vdb.Axis(1))
+
+    # Write the grids to .vdb files
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    vdb.write(file_path, grids[1])
+    files = [file_path]
+    for factor in params["pyramid"]:
+        files.append(pyramid_path(file_path, factor))
+        vdb.write(files[-1], grids[factor])
+    return files, info
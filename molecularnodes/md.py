@@ -80,6 +80,26 @@ bpy.types.Scene.MN_md_in_memory = bpy.props.BoolProperty(
     default = False,
     subtype = 'NONE'
     )
+bpy.types.Scene.MN_md_packed = bpy.props.BoolProperty(
+    name = 'Packed',
+    description = 'When in memory, store all frames in a single array instead of one object per frame.',
+    default = False,
+    subtype = 'NONE'
+    )
+bpy.types.Scene.MN_md_frame_window = bpy.props.BoolProperty(
+    name = 'Frame Window',
+    description = 'When streaming, only play back the frames from start to end with the step, without loading them into memory.',
+    default = False,
+    subtype = 'NONE'
+    )
+bpy.types.Scene.MN_md_point_cache_directory = bpy.props.StringProperty(
+    name = 'MN_md_point_cache_directory', 
+    description = 'Directory to write point caches to, the session directory if empty', 
+    options = {'TEXTEDIT_UPDATE'}, 
+    default = '',
+    subtype = 'DIR_PATH', 
+    maxlen = 0
+    )
 bpy.types.Scene.list_index = bpy.props.IntProperty(
     name = "Index for trajectory selection list.", 
     default = 0
@@ -112,28 +132,55 @@ class MN_OT_Import_Protein_MD(bpy.types.Operator):
         include_bonds = bpy.context.scene.MN_import_include_bonds
         custom_selections = bpy.context.scene.trajectory_selection_list
         MN_md_in_memory = bpy.context.scene.MN_md_in_memory
+        MN_md_packed = MN_md_in_memory and bpy.context.scene.MN_md_packed
+        MN_md_frame_window = bpy.context.scene.MN_md_frame_window
 
         universe = mda.Universe(file_top, file_traj)
 
-        if MN_md_in_memory:
+        if MN_md_in_memory and not MN_md_packed:
             universe.transfer_to_memory(start=md_start,
                                         step=md_step,
                                         stop=md_end)
 
-        mda_session = MDAnalysisSession(memory=MN_md_in_memory)
+        # packed frames are updated by the session's frame change handler
+        mda_session = MDAnalysisSession(memory=MN_md_in_memory and not MN_md_packed)
 
         extra_selections = {}
         for sel in custom_selections:
             extra_selections[sel.name] = sel.selection
 
-        mda_session.show(atoms = universe,
-                        name = name,
-                        style = bpy.context.scene.MN_import_default_style,
-                        selection = selection,
-                        include_bonds = include_bonds,
-                        custom_selections = extra_selections,
-                        in_memory=MN_md_in_memory
-        )
+        if MN_md_packed:
+            mda_session.in_memory(atoms = universe,
+                            name = name,
+                            style = bpy.context.scene.MN_import_default_style,
+                            selection = selection,
+                            include_bonds = include_bonds,
+                            custom_selections = extra_selections,
+                            packed = True,
+                            start = md_start,
+                            stop = md_end,
+                            step = md_step
+            )
+        elif MN_md_frame_window and not MN_md_in_memory:
+            mda_session.show(atoms = universe,
+                            name = name,
+                            style = bpy.context.scene.MN_import_default_style,
+                            selection = selection,
+                            include_bonds = include_bonds,
+                            custom_selections = extra_selections,
+                            start = md_start,
+                            stop = md_end,
+                            step = md_step
+            )
+        else:
+            mda_session.show(atoms = universe,
+                            name = name,
+                            style = bpy.context.scene.MN_import_default_style,
+                            selection = selection,
+                            include_bonds = include_bonds,
+                            custom_selections = extra_selections,
+                            in_memory=MN_md_in_memory
+            )
 
         self.report(
             {'INFO'}, 
@@ -145,6 +192,38 @@ class MN_OT_Import_Protein_MD(bpy.types.Operator):
         return {"FINISHED"}
 
 
+class MN_OT_MD_Bake_Point_Cache(bpy.types.Operator):
+    bl_idname = "mn.md_bake_point_cache"
+    bl_label = "Bake Point Cache"
+    bl_description = "Bake the trajectory to point caches that render without the frame change handler"
+    bl_options = {"REGISTER", "UNDO"}
+
+    free: bpy.props.BoolProperty(
+        name = "Free",
+        description = "Remove the point caches so the trajectory is streamed again",
+        default = False
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return getattr(bpy.types.Scene, "mda_session", None) is not None
+
+    def execute(self, context):
+        session = bpy.types.Scene.mda_session
+        # only bake the active object if it is one of the session's representations
+        active = context.active_object
+        rep_names = [active.name] if active is not None and active.name in session.rep_names else None
+
+        if self.free:
+            session.free_point_cache(rep_names)
+            return {"FINISHED"}
+
+        directory = bpy.path.abspath(context.scene.MN_md_point_cache_directory) or None
+        paths = session.bake_point_cache(rep_names, directory=directory)
+        self.report({'INFO'}, message=f"Baked point caches for {', '.join(paths)}.")
+        return {"FINISHED"}
+
+
 #### UI
 
 class TrajectorySelectionItem(bpy.types.PropertyGroup):
@@ -240,7 +319,13 @@ def panel(layout_function, scene):
     )
     row_old_import = col_main.row()
     row_old_import.prop(bpy.context.scene, 'MN_md_in_memory')
-    # only show the frame options if the old import is used           
+    row_packed = row_old_import.row()
+    row_packed.prop(bpy.context.scene, 'MN_md_packed')
+    row_packed.enabled = bpy.context.scene.MN_md_in_memory
+    row_window = row_old_import.row()
+    row_window.prop(bpy.context.scene, 'MN_md_frame_window')
+    row_window.enabled = not bpy.context.scene.MN_md_in_memory
+    # only enable the frame options if the old import or a frame window is used
     row_frame = col_main.row(heading = "Frames", align = True)
     row_frame.prop(
         bpy.context.scene, 'MN_import_md_frame_start', 
@@ -257,7 +342,7 @@ def panel(layout_function, scene):
         text = 'End',
         emboss = True
     )
-    row_frame.enabled = bpy.context.scene.MN_md_in_memory
+    row_frame.enabled = bpy.context.scene.MN_md_in_memory or bpy.context.scene.MN_md_frame_window
         
     col_main.prop(
         bpy.context.scene, 'MN_md_selection', 
@@ -282,3 +367,35 @@ def panel(layout_function, scene):
         
         col.prop(item, "name")
         col.prop(item, "selection")
+
+    col_main.separator()
+    col_main.label(text = "Point Cache")
+    col_main.prop(
+        bpy.context.scene, 'MN_md_point_cache_directory', 
+        text = 'Directory',
+        emboss = True
+    )
+    row_cache = col_main.row(align = True)
+    row_cache.operator('mn.md_bake_point_cache', text = "Bake", icon = 'FILE_CACHE')
+    row_cache.operator('mn.md_bake_point_cache', text = "Free", icon = 'TRASH').free = True
+
+    panel_timings(col_main)
+
+def panel_timings(layout_function):
+    session = getattr(bpy.types.Scene, "mda_session", None)
+    if session is None or not hasattr(session, "timings"):
+        return
+    summary = session.timings.summary()
+    if not summary:
+        return
+    layout_function.separator()
+    layout_function.label(text = "Frame Update Timings (ms, p50 / p95 / max)")
+    box = layout_function.box()
+    box.alignment = "LEFT"
+    box.scale_y = 0.6
+    for rep_name, stages in summary.items():
+        box.label(text = rep_name)
+        for stage, timing in stages.items():
+            box.label(
+                text = f"    {stage}: {timing['p50']:.2f} / {timing['p95']:.2f} / {timing['max']:.2f}"
+            )
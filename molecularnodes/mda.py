@@ -24,8 +24,14 @@ else:
 import numpy as np
 import warnings
 import pickle
+import json
 import uuid
 import os
+import csv
+import time
+import weakref
+import zlib
+from collections import OrderedDict, deque
 from typing import Union, List, Dict
 
 from . import data
@@ -34,6 +40,758 @@ from . import obj
 from . import nodes
 from .utils import lerp
 
+
+class FrameCache:
+    def __init__(self, max_mb: float = 256):
+        """
+        Least-recently-used cache of decoded trajectory frames.
+
+        Positions are stored already scaled by the world_scale, keyed by the
+        representation name and the trajectory frame index. When interpolating
+        between subframes each source frame is only decoded once, and the same
+        entries are reused by the non-interpolated path.
+
+        Parameters:
+        ----------
+        max_mb : float, optional
+            The maximum memory used by the cached positions in megabytes
+            (default: 256). A value of 0 disables the cache.
+
+        Attributes:
+        ----------
+        max_bytes : int
+            The maximum memory used by the cached positions in bytes.
+        nbytes : int
+            The memory currently used by the cached positions in bytes.
+        """
+        self.max_bytes = int(max_mb * 1024 ** 2)
+        self.nbytes = 0
+        self._frames = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def __contains__(self, key) -> bool:
+        return key in self._frames
+
+    def get(self, key):
+        """
+        Return the cached positions for the key, or None if they aren't cached.
+        """
+        try:
+            positions = self._frames[key]
+        except KeyError:
+            return None
+        self._frames.move_to_end(key)
+        return positions
+
+    def put(self, key, positions: np.ndarray):
+        """
+        Add the positions to the cache, evicting the least recently used frames
+        until the cache fits inside of `max_bytes`.
+        """
+        if positions.nbytes > self.max_bytes:
+            return
+        if key in self._frames:
+            self.nbytes -= self._frames.pop(key).nbytes
+        self._frames[key] = positions
+        self.nbytes += positions.nbytes
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._frames.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+    def discard(self, rep_name: str):
+        """
+        Remove all of the cached frames for a representation.
+        """
+        for key in [key for key in self._frames if key[0] == rep_name]:
+            self.nbytes -= self._frames.pop(key).nbytes
+
+    def clear(self):
+        self._frames.clear()
+        self.nbytes = 0
+
+    def __getstate__(self):
+        # the cached frames can always be decoded again, so don't save them
+        state = self.__dict__.copy()
+        state["_frames"] = OrderedDict()
+        state["nbytes"] = 0
+        return state
+
+
+class UpdateTimings:
+    stages = ("seek", "read", "interpolate", "write")
+
+    def __init__(self, history: int = 500):
+        """
+        Timings of the trajectory frame change handler.
+
+        For each representation the time spent seeking the trajectory, reading
+        the positions, interpolating between frames and writing to the Blender
+        object is kept for the last `history` frames. A trace of every frame
+        can also be recorded to be profiled offline.
+
+        Parameters:
+        ----------
+        history : int, optional
+            The number of frames to keep the timings of (default: 500).
+
+        Attributes:
+        ----------
+        trace_path : str
+            The .csv or .json file the trace is written to when it is
+            stopped, or None if no trace is being recorded.
+        """
+        self.history = history
+        self.trace_path = None
+        self._timings = {}
+        self._trace = []
+
+    def record(self, frame: int, rep_name: str, timings: Dict[str, float]):
+        """
+        Record the time in seconds of each stage of updating a representation.
+        """
+        rep_timings = self._timings.setdefault(
+            rep_name,
+            {stage: deque(maxlen=self.history) for stage in self.stages}
+        )
+        for stage in self.stages:
+            rep_timings[stage].append(timings[stage])
+        if self.trace_path is not None:
+            self._trace.append({"frame": frame, "rep_name": rep_name, **timings})
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        The p50, p95 and max time in milliseconds of each stage, for each representation.
+        """
+        summary = {}
+        for rep_name, rep_timings in self._timings.items():
+            summary[rep_name] = {}
+            for stage, timings in rep_timings.items():
+                timings = np.array(timings) * 1000
+                if len(timings) == 0:
+                    continue
+                summary[rep_name][stage] = {
+                    "p50": float(np.percentile(timings, 50)),
+                    "p95": float(np.percentile(timings, 95)),
+                    "max": float(timings.max()),
+                }
+        return summary
+
+    def clear(self):
+        self._timings = {}
+
+    def start_trace(self, path: str):
+        """
+        Start recording the timings of every frame, to be written to `path`
+        as .csv or .json when `stop_trace()` is called.
+        """
+        if not path.endswith((".csv", ".json")):
+            raise ValueError("The trace must be written to a .csv or .json file.")
+        self.trace_path = path
+        self._trace = []
+
+    def stop_trace(self) -> str:
+        """
+        Stop recording and write the trace, returning the path it was written to.
+        """
+        path = self.trace_path
+        if path is None:
+            return None
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump(self._trace, f)
+        else:
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=["frame", "rep_name", *self.stages])
+                writer.writeheader()
+                writer.writerows(self._trace)
+        self.trace_path = None
+        self._trace = []
+        return path
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_timings"] = {}
+        state["_trace"] = []
+        state["trace_path"] = None
+        return state
+
+
+# rules for guessing elements of coarse-grained Martini beads from their names,
+# as (name, element, prefix) where prefix matches any name starting with `name`
+martini_element_rules = [
+    ("BB", "BB", False),
+    ("SC", "SC", True),
+    ("GL", "GL", True),
+    ("D", "CD", True),
+]
+
+# extra rules registered with `register_element_rule()`, checked before the Martini rules
+element_rules = []
+
+def register_element_rule(name: str, element: str, prefix: bool = False):
+    """
+    Register a rule for guessing the element from an atom name, for topologies
+    from custom force fields that don't include elements.
+
+    Parameters:
+    ----------
+    name : str
+        The atom name to match.
+    element : str
+        The element to assign to the matching atoms.
+    prefix : bool, optional
+        Whether to match all atom names starting with `name`, rather than
+        only the exact name (default: False).
+    """
+    element_rules.append((name, element, prefix))
+
+def _guess_element(name: str) -> str:
+    for rule_name, element, prefix in element_rules + martini_element_rules:
+        if name == rule_name or (prefix and name.startswith(rule_name)):
+            return element
+    return mda.topology.guessers.guess_atom_element(name)
+
+def guess_elements(names) -> np.ndarray:
+    """
+    Guess the elements from atom names.
+
+    Each unique name is only guessed once, using the registered rules, then the
+    Martini rules and finally MDAnalysis' guesser, and the results are broadcast
+    back to all of the atoms.
+
+    Parameters:
+    ----------
+    names : array-like
+        The names of the atoms.
+
+    Returns:
+    -------
+    np.ndarray
+        The guessed element of each atom.
+    """
+    unique_names, inverse = np.unique(np.asarray(names), return_inverse=True)
+    unique_elements = np.array([_guess_element(name) for name in unique_names], dtype=object)
+    return unique_elements[inverse]
+
+def _element_values(elements, key) -> np.ndarray:
+    """
+    Look up a value in `data.elements` for each element, once per unique element.
+    """
+    unique_elements, inverse = np.unique(np.asarray(elements), return_inverse=True)
+    values = np.array([
+        data.elements.get(element, data.elements.get('X')).get(key)
+        for element in unique_elements
+    ])
+    return values[inverse]
+
+# data types for the np.array that maps Blender frames to trajectory frames
+frame_index_dtype = [
+    ('frame_a',  int),
+    ('frame_b',  int),
+    ('fraction', float)
+    ]
+
+def frame_index_table(n_frames: int, frame_mapping=None, subframes: int = 0,
+                      start: int = None, stop: int = None, step: int = None) -> np.ndarray:
+    """
+    Create the lookup table from Blender frames to trajectory frames.
+
+    Each entry of the table holds the trajectory frame to display (`frame_a`),
+    the frame to interpolate towards (`frame_b`) and the interpolation
+    `fraction` between them, so that the frame change handler only has to
+    index into the table.
+
+    Parameters:
+    ----------
+    n_frames : int
+        The number of frames in the trajectory.
+    frame_mapping : np.ndarray, optional
+        A mapping from the Blender frames to the trajectory frames
+        (default: None). Repeating values in the mapping slows the playback
+        down, for example around events of interest.
+    subframes : int, optional
+        The number of subframes to interpolate between each frame
+        (default: 0).
+    start, stop, step : int, optional
+        The window of trajectory frames to play back (default: all frames).
+        A frame mapping indexes into the frames of the window.
+
+    Returns:
+    -------
+    np.ndarray
+        Structured array with `frame_a`, `frame_b` and `fraction` for every
+        Blender frame. Entries with a `frame_a` of -1 are outside of the
+        trajectory and aren't displayed.
+    """
+    window = np.arange(n_frames)[start:stop:step]
+    if frame_mapping is None:
+        frame_a = window.repeat(subframes + 1)
+        frame_b = np.append(window[1:], n_frames).repeat(subframes + 1)
+    else:
+        # mapping values past the end of the window are past the end of the trajectory
+        frame_mapping = np.minimum(np.asarray(frame_mapping, dtype=int), len(window))
+        frame_mapping = np.append(window, n_frames)[frame_mapping]
+        # add the subframes to the frame mapping
+        frame_a = np.repeat(frame_mapping, subframes + 1)
+        # the next frame is the next value of the mapping, and the
+        # last frame of the mapping has nothing to interpolate towards
+        frame_b = np.append(frame_mapping[1:], frame_mapping[-1]).repeat(subframes + 1)
+
+    table = np.zeros(len(frame_a), dtype=frame_index_dtype)
+    table['frame_a'] = np.where(frame_a < n_frames, frame_a, -1)
+    # stay on frame_a if the next frame is past the end of the trajectory
+    table['frame_b'] = np.where(frame_b < n_frames, frame_b, table['frame_a'])
+    table['fraction'] = np.arange(len(frame_a)) % (subframes + 1) / (subframes + 1)
+
+    return table
+
+
+def _frame_velocities(ag):
+    if not ag.universe.trajectory.ts.has_velocities:
+        return None
+    return ag.velocities
+
+def _frame_forces(ag):
+    if not ag.universe.trajectory.ts.has_forces:
+        return None
+    return ag.forces
+
+def _frame_occupancy(ag):
+    # neither biotite nor MDAnalysis give frame-specific access to the b_factor,
+    # but MDAnalysis stores the occupancy of each model of a PDB on the timestep
+    # for more details: https://github.com/BradyAJohnston/MolecularNodes/issues/128
+    occupancy = ag.universe.trajectory.ts.data.get("occupancy")
+    if occupancy is None:
+        return None
+    return np.asarray(occupancy)[ag.ix]
+
+# functions returning the per-frame values of the atomgroup at the current
+# frame, or None if the trajectory doesn't have them
+frame_attribute_readers = {
+    "velocities": _frame_velocities,
+    "forces": _frame_forces,
+    "occupancy": _frame_occupancy,
+}
+
+# the names of the attributes on the Blender object of readers that are
+# registered under a different name, such as one per sampled map
+frame_attribute_names = {}
+
+def register_frame_attribute(name: str, reader, attribute: str = None):
+    """
+    Register a per-frame attribute, which can then be requested by name with
+    the `frame_attributes` of `MDAnalysisSession.show()`.
+
+    Parameters:
+    ----------
+    name : str
+        The name the reader is registered and requested under.
+    reader : callable
+        Called with the atomgroup at the current frame, returning an array
+        with one value or 3D vector for each atom, or None if the values
+        aren't available for the trajectory.
+    attribute : str, optional
+        The name of the attribute on the Blender object, if it isn't `name`.
+        Different readers can write the same attribute on different objects.
+    """
+    frame_attribute_readers[name] = reader
+    if attribute is not None and attribute != name:
+        frame_attribute_names[name] = attribute
+    else:
+        frame_attribute_names.pop(name, None)
+
+def frame_attribute_name(name: str) -> str:
+    """
+    The name of the attribute on the Blender object of a registered per-frame attribute.
+    """
+    return frame_attribute_names.get(name, name)
+
+def read_frame_attributes(ag, names) -> Dict[str, np.ndarray]:
+    """
+    Read the per-frame attributes of the atomgroup at the current frame.
+
+    Attributes that aren't available for the trajectory are left out.
+    """
+    attributes = {}
+    for name in names:
+        value = frame_attribute_readers[name](ag)
+        if value is None:
+            continue
+        value = np.asarray(value, dtype=np.float32)
+        if len(value) != ag.n_atoms:
+            raise ValueError(f"The per-frame attribute {name} has {len(value)} "
+                             f"values for {ag.n_atoms} atoms.")
+        attributes[name] = value
+    return attributes
+
+def add_frame_attributes(mol_object, attributes: Dict[str, np.ndarray], overwrite: bool = True):
+    for name, value in attributes.items():
+        obj.add_attribute(
+            mol_object, frame_attribute_name(name), value,
+            type="FLOAT_VECTOR" if value.ndim == 2 else "FLOAT",
+            overwrite=overwrite
+        )
+
+
+def quantize_positions(positions: np.ndarray):
+    """
+    Quantize positions to 16 bit integers relative to their bounding box.
+
+    Parameters:
+    ----------
+    positions : np.ndarray
+        The (n, 3) positions to quantize.
+
+    Returns:
+    -------
+    quantized : np.ndarray
+        The (n, 3) quantized positions as int16.
+    lower : np.ndarray
+        The lower corner of the bounding box.
+    step : np.ndarray
+        The size of one quantization step along each axis. The error of the
+        quantized positions is at most half of a step.
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    lower = positions.min(axis=0)
+    step = (positions.max(axis=0) - lower) / 65535
+    # avoid dividing by zero when all of the positions are in a plane
+    step[step == 0] = 1
+    quantized = np.round((positions - lower) / step) - 32768
+    return quantized.astype(np.int16), lower, step
+
+def dequantize_positions(quantized: np.ndarray, lower: np.ndarray, step: np.ndarray) -> np.ndarray:
+    """
+    Convert positions that were quantized with `quantize_positions` back to floats.
+    """
+    return ((quantized.astype(np.float64) + 32768) * step + lower).astype(np.float32)
+
+
+class TrajectoryBake:
+    def __init__(self, path: str):
+        """
+        Coordinates of an atomgroup baked from a trajectory to a sidecar file.
+
+        The coordinates are memory-mapped from `<path>.coords.npy`, so any baked
+        frame can be read without seeking or decompressing the trajectory. The
+        per-frame attributes baked alongside them are memory-mapped from
+        `<path>.attribute_<i>.npy`. The frame range, quantization and attribute
+        names are stored in `<path>.meta.npz`.
+        Use `TrajectoryBake.write()` to create a bake.
+
+        Parameters:
+        ----------
+        path : str
+            The path of the bake, without the file extensions.
+
+        Attributes:
+        ----------
+        path : str
+            The path of the bake, without the file extensions.
+        start, stop, step : int
+            The range of trajectory frames that are baked.
+        quantized : bool
+            Whether the coordinates are stored as int16 relative to the
+            bounding box of each frame.
+        max_error : float
+            The largest possible error of the baked coordinates in Angstrom.
+        attribute_names : list of str
+            The per-frame attributes that were baked, including those the
+            trajectory doesn't have.
+        attributes : dict
+            The values of the baked per-frame attributes of every frame, by name.
+        """
+        self.path = path
+        with np.load(f"{path}.meta.npz") as meta:
+            self.start, self.stop, self.step = meta["frames"].tolist()
+            self.quantized = bool(meta["quantized"])
+            self.lower = meta["lower"]
+            self.quantization_step = meta["quantization_step"]
+            # bakes written before attributes were baked only have coordinates
+            self.attribute_names = meta["attributes"].tolist() if "attributes" in meta else []
+        self.coordinates = np.load(f"{path}.coords.npy", mmap_mode="r")
+        self.attributes = {}
+        for i, name in enumerate(self.attribute_names):
+            if os.path.exists(f"{path}.attribute_{i}.npy"):
+                self.attributes[name] = np.load(f"{path}.attribute_{i}.npy", mmap_mode="r")
+
+    @property
+    def n_frames(self) -> int:
+        return len(self.coordinates)
+
+    @property
+    def max_error(self) -> float:
+        if not self.quantized:
+            return 0.0
+        return float(self.quantization_step.max() / 2)
+
+    def __contains__(self, frame) -> bool:
+        return (
+            self.start <= frame < self.stop
+            and (frame - self.start) % self.step == 0
+        )
+
+    def positions(self, frame: int) -> np.ndarray:
+        """
+        The baked positions in Angstrom at the given trajectory frame.
+        """
+        index = (frame - self.start) // self.step
+        if self.quantized:
+            return dequantize_positions(
+                self.coordinates[index],
+                self.lower[index],
+                self.quantization_step[index]
+            )
+        return np.array(self.coordinates[index])
+
+    def has_attributes(self, names) -> bool:
+        """
+        Whether all of the per-frame attributes were baked.
+        """
+        return set(names).issubset(self.attribute_names)
+
+    def frame_attributes(self, frame: int, names=None) -> Dict[str, np.ndarray]:
+        """
+        The baked per-frame attributes at the given trajectory frame, leaving
+        out those the trajectory doesn't have, like `read_frame_attributes()`.
+        """
+        index = (frame - self.start) // self.step
+        if names is None:
+            names = self.attribute_names
+        return {
+            name: np.array(self.attributes[name][index])
+            for name in names if name in self.attributes
+        }
+
+    @classmethod
+    def pack(cls, ag, start: int = None, stop: int = None, step: int = None,
+             frame_attributes=()):
+        """
+        Read the coordinates of the atomgroup for a range of frames into a
+        single contiguous float32 array in memory, instead of a file.
+
+        The packed coordinates are only written to a file when `save()`
+        is called, for example when the session is saved.
+
+        Parameters:
+        ----------
+        ag : MDAnalysis.AtomGroup
+            The atomgroup to pack the coordinates of.
+        start, stop, step : int, optional
+            The range of trajectory frames to pack (default: all frames).
+        frame_attributes : list of str, optional
+            The registered per-frame attributes to pack alongside the
+            coordinates, read in the same pass (default: none).
+
+        Returns:
+        -------
+        TrajectoryBake
+            The bake holding the packed coordinates, with a `path` of None.
+        """
+        start, stop, step = slice(start, stop, step).indices(ag.universe.trajectory.n_frames)
+        n_frames = len(range(start, stop, step))
+
+        bake = cls.__new__(cls)
+        bake.path = None
+        bake.start, bake.stop, bake.step = start, stop, step
+        bake.quantized = False
+        bake.lower = np.zeros((n_frames, 3))
+        bake.quantization_step = np.zeros((n_frames, 3))
+        bake.coordinates = np.empty((n_frames, ag.n_atoms, 3), dtype=np.float32)
+        bake.attribute_names = list(frame_attributes)
+        bake.attributes = {}
+        for i, ts in enumerate(ag.universe.trajectory[start:stop:step]):
+            bake.coordinates[i] = ag.positions
+            for name, value in read_frame_attributes(ag, bake.attribute_names).items():
+                if name not in bake.attributes:
+                    bake.attributes[name] = np.zeros((n_frames, *value.shape), dtype=np.float32)
+                bake.attributes[name][i] = value
+        return bake
+
+    def save(self, path: str):
+        """
+        Write bake to `path`, which is then memory-mapped instead of being
+        held in memory.
+        """
+        np.save(f"{path}.coords.npy", self.coordinates)
+        for i, name in enumerate(self.attribute_names):
+            if name in self.attributes:
+                np.save(f"{path}.attribute_{i}.npy", self.attributes[name])
+        np.savez(
+            f"{path}.meta.npz",
+            frames=np.array([self.start, self.stop, self.step]),
+            quantized=self.quantized,
+            lower=self.lower,
+            quantization_step=self.quantization_step,
+            attributes=np.array(self.attribute_names, dtype=str)
+        )
+        self.path = path
+        self.coordinates = np.load(f"{path}.coords.npy", mmap_mode="r")
+        self.attributes = {
+            name: np.load(f"{path}.attribute_{self.attribute_names.index(name)}.npy", mmap_mode="r")
+            for name in self.attributes
+        }
+
+    @classmethod
+    def write(cls, ag, path: str, start: int = None, stop: int = None,
+              step: int = None, quantize: bool = True, frame_attributes=()):
+        """
+        Bake the coordinates of the atomgroup for a range of frames.
+
+        Frames are written one at a time into the memory-mapped file, so the
+        memory used doesn't depend on the number of frames.
+
+        Parameters:
+        ----------
+        ag : MDAnalysis.AtomGroup
+            The atomgroup to bake the coordinates of.
+        path : str
+            The path of the bake, without the file extensions.
+        start, stop, step : int, optional
+            The range of trajectory frames to bake (default: all frames).
+        quantize : bool, optional
+            Whether to store the coordinates as int16 relative to the
+            bounding box of each frame, instead of float32 (default: True).
+        frame_attributes : list of str, optional
+            The registered per-frame attributes to bake alongside the
+            coordinates as float32, read in the same pass (default: none).
+
+        Returns:
+        -------
+        TrajectoryBake
+            The bake that was written.
+        """
+        start, stop, step = slice(start, stop, step).indices(ag.universe.trajectory.n_frames)
+        n_frames = len(range(start, stop, step))
+
+        coordinates = np.lib.format.open_memmap(
+            f"{path}.coords.npy",
+            mode="w+",
+            dtype=np.int16 if quantize else np.float32,
+            shape=(n_frames, ag.n_atoms, 3)
+        )
+        lower = np.zeros((n_frames, 3))
+        quantization_step = np.zeros((n_frames, 3))
+        attribute_names = list(frame_attributes)
+        attributes = {}
+        # attributes the trajectory doesn't have are recognised by their missing file
+        for i in range(len(attribute_names)):
+            if os.path.exists(f"{path}.attribute_{i}.npy"):
+                os.remove(f"{path}.attribute_{i}.npy")
+
+        for i, ts in enumerate(ag.universe.trajectory[start:stop:step]):
+            if quantize:
+                coordinates[i], lower[i], quantization_step[i] = quantize_positions(ag.positions)
+            else:
+                coordinates[i] = ag.positions
+            for name, value in read_frame_attributes(ag, attribute_names).items():
+                if name not in attributes:
+                    attributes[name] = np.lib.format.open_memmap(
+                        f"{path}.attribute_{attribute_names.index(name)}.npy",
+                        mode="w+",
+                        dtype=np.float32,
+                        shape=(n_frames, *value.shape)
+                    )
+                attributes[name][i] = value
+        coordinates.flush()
+        del coordinates
+        for values in attributes.values():
+            values.flush()
+        del attributes
+
+        np.savez(
+            f"{path}.meta.npz",
+            frames=np.array([start, stop, step]),
+            quantized=quantize,
+            lower=lower,
+            quantization_step=quantization_step,
+            attributes=np.array(attribute_names, dtype=str)
+        )
+        return cls(path)
+
+
+# the header of a .pc2 point cache, which is read by Blender's Mesh Cache modifier
+pc2_header_dtype = np.dtype([
+    ("signature", "S12"),
+    ("version", "<i4"),
+    ("n_points", "<i4"),
+    ("start_frame", "<f4"),
+    ("sample_rate", "<f4"),
+    ("n_samples", "<i4"),
+])
+
+
+def write_point_cache(path: str, frames, n_points: int, n_samples: int,
+                      start_frame: float = 0, chunk_size: int = 64) -> str:
+    """
+    Write the positions of each frame to a .pc2 point cache.
+
+    Frames are buffered and written `chunk_size` frames at a time, so the
+    memory used doesn't depend on the number of frames.
+
+    Parameters:
+    ----------
+    path : str
+        The path of the point cache.
+    frames : iterable of np.ndarray
+        The (n_points, 3) positions of each frame.
+    n_points : int
+        The number of points in each frame.
+    n_samples : int
+        The number of frames that will be written.
+    start_frame : float, optional
+        The scene frame of the first sample (default: 0).
+    chunk_size : int, optional
+        The number of frames to buffer before writing (default: 64).
+
+    Returns:
+    -------
+    str
+        The path of the point cache.
+    """
+    header = np.array(
+        (b"POINTCACHE2\0", 1, n_points, start_frame, 1.0, n_samples),
+        dtype=pc2_header_dtype
+    )
+    buffer = np.zeros((max(1, chunk_size), n_points, 3), dtype="<f4")
+    n_written = 0
+    n_buffered = 0
+    with open(path, "wb") as f:
+        f.write(header.tobytes())
+        for positions in frames:
+            buffer[n_buffered] = positions
+            n_buffered += 1
+            if n_buffered == len(buffer):
+                f.write(buffer.tobytes())
+                n_written += n_buffered
+                n_buffered = 0
+        f.write(buffer[:n_buffered].tobytes())
+        n_written += n_buffered
+
+    if n_written != n_samples:
+        raise ValueError(f"Expected {n_samples} frames for the point cache, got {n_written}.")
+    return path
+
+
+def read_point_cache(path: str) -> np.ndarray:
+    """
+    Memory-map the positions of a .pc2 point cache, with the shape
+    (n_samples, n_points, 3).
+    """
+    header = np.fromfile(path, dtype=pc2_header_dtype, count=1)[0]
+    if header["signature"] != b"POINTCACHE2":
+        raise ValueError(f"{path} is not a .pc2 point cache.")
+    return np.memmap(
+        path,
+        dtype="<f4",
+        mode="r",
+        offset=pc2_header_dtype.itemsize,
+        shape=(int(header["n_samples"]), int(header["n_points"]), 3)
+    )
+
+
 class AtomGroupInBlender:
     def __init__(self,
                  ag: mda.AtomGroup,
@@ -117,6 +875,9 @@ class AtomGroupInBlender:
             Whether the atoms in the atomgroup are alpha carbon.
         is_solvent : np.ndarray
             Whether the atoms in the atomgroup are solvent.
+        is_updating : bool
+            Whether the atomgroup is an UpdatingAtomGroup, which changes
+            the atoms it contains as the frame changes.
         """
         if not HAS_mda:
             raise ImportError("MDAnalysis is not installed.")
@@ -124,10 +885,16 @@ class AtomGroupInBlender:
         self.include_bonds = include_bonds
         self.world_scale = world_scale
         self.style = style
+        self._universe_table = None
+        self._previous_ix = None
 
     @property
     def n_atoms(self) -> int:
         return self.ag.n_atoms
+
+    @property
+    def is_updating(self) -> bool:
+        return isinstance(self.ag, mda.core.groups.UpdatingAtomGroup)
     
     @property
     def style(self) -> str:
@@ -166,34 +933,23 @@ class AtomGroupInBlender:
             elements = self.ag.elements.tolist()
         except:
             try:
-                elements = [
-                    "BB" if x == "BB" else 
-                    "SC" if x.startswith("SC") else 
-                    "GL" if x.startswith("GL") else
-                    "CD" if x.startswith("D") else
-                    mda.topology.guessers.guess_atom_element(x) for x in self.ag.atoms.names
-                ]
-
-                
+                elements = guess_elements(self.ag.atoms.names).tolist()
             except:
                 elements = ['X'] * self.ag.n_atoms
         return elements
 
     @property
     def atomic_number(self) -> np.ndarray:
-        return np.array(
-            [data.elements.get(element,
-                              data.elements.get('X'))
-                            .get('atomic_number') for element in self.elements]
-        )
+        if self.ag.n_atoms == 0:
+            return np.array([], dtype=int)
+        return _element_values(self.elements, 'atomic_number')
 
     @property
     def vdw_radii(self) -> np.ndarray:
+        if self.ag.n_atoms == 0:
+            return np.array([], dtype=float)
         # pm to Angstrom
-        return np.array(
-            [data.elements.get(element,
-                              data.elements.get('X'))
-                        .get('vdw_radii') for element in self.elements]) * 0.01 * self.world_scale
+        return _element_values(self.elements, 'vdw_radii') * 0.01 * self.world_scale
 
     @property
     def res_id(self) -> np.ndarray:
@@ -261,35 +1017,83 @@ class AtomGroupInBlender:
         else:
             return np.repeat(-1, self.ag.n_atoms)
     
+    @staticmethod
+    def _name_masks(names, name_sets) -> List[np.ndarray]:
+        """
+        Whether each name is in each of the name sets, testing each
+        unique name only once.
+        """
+        unique_names, inverse = np.unique(np.asarray(names), return_inverse=True)
+        return [
+            np.array([name in name_set for name in unique_names], dtype=bool)[inverse]
+            for name_set in name_sets
+        ]
+
+    def _flags(self) -> Dict[str, np.ndarray]:
+        """
+        Compute all of the `is_*` flags in one pass over the factorized residue and
+        atom names, matching the equivalent MDAnalysis selection strings:
+
+        - is_nucleic: "nucleic"
+        - is_peptide: "protein or (name BB SC*)"
+        - is_lipid: resnames in data.lipid_names
+        - is_backbone: "backbone or nucleicbackbone or name BB"
+        - is_alpha_carbon: "name CA or name BB"
+        - is_solvent: "name OW or name HW1 or name HW2 or resname W or resname PW"
+        """
+        is_protein, is_nucleic, is_lipid, is_solvent_res = self._name_masks(
+            self.ag.resnames,
+            [data.protein_res_names, data.nucleic_res_names,
+             frozenset(data.lipid_names), data.solvent_res_names]
+        )
+        names = np.asarray(self.ag.names)
+        is_protein_bb, is_nucleic_bb, is_solvent_atom, is_alpha = self._name_masks(
+            names,
+            [data.protein_backbone_atom_names, data.nucleic_backbone_atom_names,
+             data.solvent_atom_names, frozenset(('CA', 'BB'))]
+        )
+        is_bb_bead = names == 'BB'
+        is_sc_bead = np.char.startswith(names.astype(str), 'SC')
+
+        return {
+            "is_nucleic": is_nucleic,
+            "is_peptide": is_protein | is_bb_bead | is_sc_bead,
+            "is_lipid": is_lipid,
+            "is_backbone": (is_protein_bb & is_protein) | (is_nucleic_bb & is_nucleic) | is_bb_bead,
+            "is_alpha_carbon": is_alpha,
+            "is_solvent": is_solvent_atom | is_solvent_res,
+        }
+
     @property
     def is_nucleic(self) -> np.ndarray:
-        return self.bool_selection(self.ag, "nucleic")
+        return self._flags()["is_nucleic"]
     
     @property
     def is_peptide(self) -> np.ndarray:
-        return self.bool_selection(self.ag, "protein or (name BB SC*)")
+        return self._flags()["is_peptide"]
     
     @property
     def is_lipid(self) -> np.ndarray:
-        return np.isin(self.ag.resnames, data.lipid_names)
+        return self._flags()["is_lipid"]
     
     @property
     def is_backbone(self) -> np.ndarray:
-        return self.bool_selection(self.ag, "backbone or nucleicbackbone or name BB")
+        return self._flags()["is_backbone"]
 
     @property
     def is_alpha_carbon(self) -> np.ndarray:
-        return self.bool_selection(self.ag, "name CA or name BB")
+        return self._flags()["is_alpha_carbon"]
 
     @property
     def is_solvent(self) -> np.ndarray:
-        return self.bool_selection(self.ag, "name OW or name HW1 or name HW2 or resname W or resname PW")
+        return self._flags()["is_solvent"]
     
     @property
     def _attributes_2_blender(self):
         """
         The attributes that will be added to the Blender object.
         """
+        flags = self._flags()
         return {
             "atomic_number": {
                 "value": self.atomic_number,
@@ -332,36 +1136,67 @@ class AtomGroupInBlender:
                 "domain": "POINT"
             },
             "is_backbone": {
-                "value": self.is_backbone,
+                "value": flags["is_backbone"],
                 "type": "BOOLEAN",
                 "domain": "POINT",
             },
             "is_alpha_carbon": {
-                "value": self.is_alpha_carbon,
+                "value": flags["is_alpha_carbon"],
                 "type": "BOOLEAN",
                 "domain": "POINT",
             },
             "is_solvent": {
-                "value": self.is_solvent,
+                "value": flags["is_solvent"],
                 "type": "BOOLEAN",
                 "domain": "POINT",
             },
             "is_nucleic": {
-                "value": self.is_nucleic,
+                "value": flags["is_nucleic"],
                 "type": "BOOLEAN",
                 "domain": "POINT",
             },
             "is_lipid": {
-                "value": self.is_lipid,
+                "value": flags["is_lipid"],
                 "type": "BOOLEAN",
                 "domain": "POINT",
             },
             "is_peptide": {
-                "value": self.is_peptide,
+                "value": flags["is_peptide"],
                 "type": "BOOLEAN",
                 "domain": "POINT",
             },
         }
+
+    @property
+    def _universe_attributes(self) -> dict:
+        """
+        The attributes of every atom in the universe, computed once so that
+        the attributes of an UpdatingAtomGroup can be gathered by index
+        instead of being recomputed each time its atoms change.
+        """
+        if getattr(self, "_universe_table", None) is None:
+            universe_rep = AtomGroupInBlender(
+                ag=self.ag.universe.atoms,
+                include_bonds=False,
+                style=self.style,
+                world_scale=self.world_scale
+            )
+            self._universe_table = {
+                "attributes": universe_rep._attributes_2_blender,
+                "chain_id_unique": universe_rep.chain_id_unique,
+                "atom_type_unique": universe_rep.atom_type_unique,
+            }
+        return self._universe_table
+
+    def _gather_attributes(self, ix: np.ndarray) -> dict:
+        """
+        The attributes for the atoms with the given universe indices,
+        gathered from the universe-level table.
+        """
+        return {
+            att_name: {**att, "value": att["value"][ix]}
+            for att_name, att in self._universe_attributes["attributes"].items()
+        }
     
 
 class MDAnalysisSession:
@@ -375,8 +1210,10 @@ class MDAnalysisSession:
     The MDAnalysis session is loaded when Blender is restarted.
     The MDAnalysis session is updated when the frame changes.
     The MDAnalysis session is dumped when a Blender file is saved.
-    The MDAnalysis session is saved as a pickle file in the
-    default location (`~/.blender_mda_session/`).
+    The MDAnalysis session is saved as a small JSON manifest of the
+    file paths, selections and frame mappings in the
+    default location (`~/.blender_mda_session/`), and the universes
+    are only opened again when a frame is first accessed.
 
     Parameters:
     ----------
@@ -397,28 +1234,39 @@ class MDAnalysisSession:
         A list of the names of the styles in the session.
     session_tmp_dir : str
         The default location to store the session files.
+    frame_cache : FrameCache
+        The cache of decoded frames shared by all of the representations.
+    timings : UpdateTimings
+        The timings of each stage of the frame change handler.
+    save_memory : bool
+        Whether trajectories that were transferred to memory are saved
+        alongside the manifest, instead of being read from their original
+        files when the session is loaded again (default: True).
 
     Methods:
     -------
     show(atoms, style, selection, name, include_bonds, custom_selections, frame_offset)
         Display an `MDAnalysis.Universe` or `MDAnalysis.Atomgroup` in Blender.
-    in_memory(atoms, style, selection, name, include_bonds, custom_selections)
+    in_memory(atoms, style, selection, name, include_bonds, custom_selections, packed)
         Display an `MDAnalysis.Universe` or `MDAnalysis.Atomgroup` in Blender by loading all the
         frames as individual objects. Animation depends on the machinery inside geometric node.
+        With `packed`, the frames are stored in a single contiguous array instead.
     transfer_to_memory(start, stop, step, verbose, **kwargs)
         Transfer the trajectories in the session to memory.
+    bake(rep_names, start, stop, step, quantize)
+        Bake the coordinates of representations to memory-mapped sidecar files.
     """
 
     # default location to store the session files
     session_tmp_dir = f"{os.path.expanduser('~')}/.blender_mda_session/"
 
-    def __init__(self, world_scale: float = 0.01, memory: bool = False):
+    def __init__(self, world_scale: float = 0.01, memory: bool = False, cache_mb: float = 256):
         """
         Initialize a MDAnalysisSession.
 
         A unique uuid is generated for each session.
         During saving, the session is saved in the
-        default location (`~/.blender_mda_session/` as a pickle file.
+        default location (`~/.blender_mda_session/` as a JSON manifest.
 
         #TODO: Is it possible to start blender only when
         #a session is initialized? (Probably not for now)
@@ -429,6 +1277,9 @@ class MDAnalysisSession:
             The scaling factor for the world coordinates (default: 0.01).
         memory : bool, optional
             Whether the old import is used (default: False).
+        cache_mb : float, optional
+            The maximum memory in megabytes used to cache decoded frames
+            during playback (default: 256).
         """
         if not HAS_mda:
             raise ImportError("MDAnalysis is not installed.")
@@ -445,6 +1296,11 @@ class MDAnalysisSession:
         self.atom_reps = {}
         self.rep_names = []
         self.uuid = str(uuid.uuid4().hex)
+        self.frame_cache = FrameCache(max_mb=cache_mb)
+        self.timings = UpdateTimings()
+        self.save_memory = True
+        self._memory_files = weakref.WeakKeyDictionary()
+        self._opened_universes = {}
 
         if memory:
             return
@@ -465,10 +1321,10 @@ class MDAnalysisSession:
         then the first atom style is used.
         """
         name = bpy.context.view_layer.objects.active.name
-        try:
-            return self.universe_reps[name]["universe"]
-        except KeyError:
-            return self.universe_reps[self.rep_names[0]]["universe"]
+        if name not in self.universe_reps:
+            name = self.rep_names[0]
+        self._load_rep(name)
+        return self.universe_reps[name]["universe"]
 
     def show(
         self,
@@ -480,7 +1336,12 @@ class MDAnalysisSession:
         custom_selections : Dict[str, str] = {},
         frame_mapping : np.ndarray = None,
         subframes : int = 0,
-        in_memory : bool = False
+        in_memory : bool = False,
+        packed : bool = False,
+        frame_attributes : Union[List[str], Dict[str, callable]] = None,
+        start : int = None,
+        stop : int = None,
+        step : int = None
     ):
         """
         Display an `MDAnalysis.Universe` or
@@ -524,40 +1385,76 @@ class MDAnalysisSession:
             Whether load the display in Blender by loading all the
             frames as individual objects.
             (default: False)
+        packed : bool, optional
+            When in_memory is on, whether to store all of the frames in a single
+            contiguous array instead of as individual objects.
+            (default: False)
+        frame_attributes : list of str or dict, optional
+            Attributes that are updated with the positions on every frame
+            change, such as "velocities", "forces" or "occupancy", or
+            other attributes registered with `register_frame_attribute()`.
+            A dictionary of {'name' : function} registers the functions,
+            which are called with the atomgroup at the current frame.
+            They are read together with the positions, in the same read
+            of the frame, and are baked with them when packed or by `bake()`.
+            (default: None)
+        start, stop, step : int, optional
+            The window of trajectory frames to play back, without copying
+            the trajectory into memory. A frame_mapping indexes into the
+            frames of the window.
+            (default: None) which plays back all of the frames.
         """
         if in_memory:
-            self.in_memory(
+            mol_object = self.in_memory(
                 atoms=atoms,
                 style=style,
                 selection=selection,
                 name=name,
                 include_bonds=include_bonds,
-                custom_selections=custom_selections
+                custom_selections=custom_selections,
+                packed=packed,
+                subframes=subframes,
+                frame_attributes=frame_attributes,
+                start=start,
+                stop=stop,
+                step=step
             )
             if frame_mapping is not None:
                 warnings.warn("Custom frame_mapping not supported"
                               "when in_memory is on.")
-            if subframes != 0:
+            if subframes != 0 and not packed:
                 warnings.warn("Custom subframes not supported"
                               "when in_memory is on.")
-            return
+            return mol_object
         if isinstance(atoms, mda.Universe):
             atoms = atoms.select_atoms(selection)
+        else:
+            # the selection string is only known when selecting from a universe
+            selection = None
             
         universe = atoms.universe
 
         # if any frame_mapping is out of range, then raise an error
-        if frame_mapping and (len(frame_mapping) > universe.trajectory.n_frames):
+        if frame_mapping is not None and (len(frame_mapping) > universe.trajectory.n_frames):
             raise ValueError("one or more mapping values are"
                               "out of range for the trajectory")
 
+        frame_attributes = self._frame_attribute_names(frame_attributes)
+        frame_window = None
+        if (start, stop, step) != (None, None, None):
+            # numpy integers can't be written to the session manifest
+            frame_window = [None if value is None else int(value) for value in (start, stop, step)]
+
         mol_object = self._process_atomgroup(
                     ag=atoms,
                     frame_mapping=frame_mapping,
+                    frame_window=frame_window,
                     subframes=subframes,
                     name=name,
                     style=style,
                     include_bonds=include_bonds,
+                    selection=selection,
+                    frame_attributes=frame_attributes,
                     return_object=True)
         
         # add the custom selections if they exist
@@ -569,10 +1466,13 @@ class MDAnalysisSession:
                 self._process_atomgroup(
                     ag=ag,
                     frame_mapping=frame_mapping,
+                    frame_window=frame_window,
                     subframes=subframes,
                     name=sel_name,
                     style=style,
                     include_bonds=include_bonds,
+                    selection=sel,
+                    frame_attributes=frame_attributes,
                     return_object=False
                     )
             except ValueError:
@@ -589,12 +1489,23 @@ class MDAnalysisSession:
         name: str = "atoms",
         include_bonds: bool = True,
         custom_selections: Dict[str, str] = {},
+        packed: bool = False,
+        start: int = None,
+        stop: int = None,
+        step: int = None,
+        subframes: int = 0,
+        frame_attributes: Union[List[str], Dict[str, callable]] = None,
     ):
         """
         Display an `MDAnalysis.Universe` or
         `MDAnalysis.Atomgroup` in Blender by loading all the
         frames as individual objects. Animation depends on the machinery inside geometric node.
 
+        With `packed`, all of the frames are instead stored in a single
+        contiguous array owned by the session, and the positions are updated
+        and interpolated on frame change like a streamed trajectory. This
+        avoids creating a datablock for every frame.
+
         Parameters:
         ----------
         atoms : MDAnalysis.Universe or MDAnalysis.Atomgroup
@@ -617,20 +1528,56 @@ class MDAnalysisSession:
             {'name' : 'selection string'}
             (default: {}).
             Uses MDAnalysis selection syntax.
+        packed : bool, optional
+            Whether to store all of the frames in a single contiguous array
+            instead of individual objects (default: False).
+        start, stop, step : int, optional
+            The range of trajectory frames to load (default: all frames).
+        subframes : int, optional
+            When packed, the number of subframes to interpolate between
+            each frame (default: 0).
+        frame_attributes : list of str or dict, optional
+            The per-frame attributes to add, see `show()`. They are read in
+            the same pass over the trajectory as the positions.
+            (default: None) which adds the occupancy to each frame object
+            when the trajectory has it, and nothing when packed.
         """
         if isinstance(atoms, mda.Universe):
             atoms = atoms.select_atoms(selection)
+        else:
+            selection = None
 
         universe = atoms.universe
+        if frame_attributes is None and not packed:
+            frame_attributes = ["occupancy"]
+        frame_attributes = self._frame_attribute_names(frame_attributes)
 
-        mol_object = self._process_atomgroup(
-            ag=atoms,
-            name=name,
-            style=style,
-            include_bonds=include_bonds,
-            add_node_tree=False,
-            return_object=True,
-        )
+        if packed:
+            bake = TrajectoryBake.pack(
+                atoms, start=start, stop=stop, step=step, frame_attributes=frame_attributes
+            )
+            mol_object = self._process_atomgroup(
+                ag=atoms,
+                frame_window=[int(bake.start), int(bake.stop), int(bake.step)],
+                subframes=subframes,
+                name=name,
+                style=style,
+                include_bonds=include_bonds,
+                selection=selection,
+                frame_attributes=frame_attributes,
+                return_object=True,
+            )
+            self.universe_reps[mol_object.name]["bake"] = bake
+            self.frame_cache.discard(mol_object.name)
+        else:
+            mol_object = self._process_atomgroup(
+                ag=atoms,
+                name=name,
+                style=style,
+                include_bonds=include_bonds,
+                add_node_tree=False,
+                return_object=True,
+            )
 
         for sel_name, sel in custom_selections.items():
             obj.add_attribute(
@@ -641,28 +1588,19 @@ class MDAnalysisSession:
                 domain="POINT",
             )
 
-        coll_frames = coll.frames(name)
+        if packed:
+            bpy.context.view_layer.objects.active = mol_object
+            return mol_object
 
+        coll_frames = coll.frames(name)
 
-        #TODO: refractor it as a general feature
-        add_occupancy = True
-        for ts in universe.trajectory:
+        for ts in universe.trajectory[start:stop:step]:
             frame = obj.create_object(
                 name=name + "_frame_" + str(ts.frame),
                 collection=coll_frames,
                 locations=atoms.positions * self.world_scale,
             )
-            # adds occupancy data to each frame if it exists
-            # This is mostly for people who want to store frame-specific information in the
-            # b_factor but currently neither biotite nor MDAnalysis give access to frame-specific
-            # b_factor information. MDAnalysis gives frame-specific access to the `occupancy`
-            # so currently this is the only method to get frame-specific data into MN
-            # for more details: https://github.com/BradyAJohnston/MolecularNodes/issues/128
-            if add_occupancy:
-                try:
-                    obj.add_attribute(frame, "occupancy", ts.data["occupancy"])
-                except:
-                    add_occupancy = False
+            add_frame_attributes(frame, read_frame_attributes(atoms, frame_attributes))
 
         # disable the frames collection from the viewer
         bpy.context.view_layer.layer_collection.children[coll.mn().name].children[
@@ -676,6 +1614,7 @@ class MDAnalysisSession:
         )
 
         bpy.context.view_layer.objects.active = mol_object
+        return mol_object
 
     def transfer_to_memory(
         self, start=None, stop=None, step=None, verbose=False, **kwargs
@@ -704,25 +1643,190 @@ class MDAnalysisSession:
             "The trajectories in this session \n"
             "is transferred to memory. \n"
             "All the frame information will be saved in \n"
-            "the tmp file ~/.blender_mda_session/ \n"
-            f"{self.uuid}.pkl when the blend file \n"
+            "the tmp folder ~/.blender_mda_session/ \n"
+            f"next to {self.uuid}.json when the blend file \n"
             "is saved."
         )
 
         for rep_name in self.rep_names:
+            self._load_rep(rep_name)
             universe = self.universe_reps[rep_name]["universe"]
             universe.transfer_to_memory(
                 start=start, stop=stop, step=step, verbose=verbose, **kwargs
             )
+            # the coordinates have changed and have to be saved again
+            self._memory_files.pop(universe, None)
+        # the frame indices now refer to the transferred frames
+        self.frame_cache.clear()
+
+    def bake(self, rep_names=None, start=None, stop=None, step=None, quantize=True):
+        """
+        Bake the coordinates of representations to sidecar files, which are
+        memory-mapped during playback for fast random access when scrubbing.
+
+        The per-frame attributes of each representation are baked alongside
+        the coordinates. Frames outside of the baked range, and attributes
+        that are added after the bake, are still read from the trajectory.
+
+        Parameters:
+        ----------
+        rep_names : list of str, optional
+            The representations to bake (default: None).
+            If None, then all representations that aren't an
+            UpdatingAtomGroup are baked.
+        start : int, optional
+            The first frame to bake (default: None).
+            If None, then the first frame of the trajectory is used.
+        stop : int, optional
+            The frame to stop the bake at (default: None).
+            If None, then the last frame of the trajectory is used.
+        step : int, optional
+            The step between baked frames (default: None).
+            If None, then the step is 1.
+        quantize : bool, optional
+            Whether to store the coordinates as 16 bit integers relative to the
+            bounding box of each frame, halving the size of the bake
+            (default: True).
+
+        Returns:
+        -------
+        dict
+            The `TrajectoryBake` for each baked representation. The largest
+            error introduced by quantization is their `max_error` in Angstrom.
+        """
+        if rep_names is None:
+            rep_names = self.rep_names
+        bakes = {}
+        for rep_name in rep_names:
+            self._load_rep(rep_name)
+            ag_rep = self.atom_reps[rep_name]
+            if ag_rep.is_updating:
+                warnings.warn(f"Unable to bake {rep_name}, the atoms of an "
+                              "UpdatingAtomGroup change between frames.")
+                continue
+            bakes[rep_name] = TrajectoryBake.write(
+                ag=ag_rep.ag,
+                path=os.path.join(self.session_tmp_dir, f"{self.uuid}_{rep_name}_bake"),
+                start=start,
+                stop=stop,
+                step=step,
+                quantize=quantize,
+                frame_attributes=self.universe_reps[rep_name]["frame_attributes"]
+            )
+            self.universe_reps[rep_name]["bake"] = bakes[rep_name]
+            self.frame_cache.discard(rep_name)
+        return bakes
+
+    def bake_point_cache(self, rep_names=None, directory=None, chunk_size=64):
+        """
+        Bake the positions of representations at every Blender frame to .pc2
+        point caches, played back by a Mesh Cache modifier on each object.
+
+        Baked representations are skipped by the frame change handler, so they
+        render without Python and without access to the trajectory files.
+        Subframes and frame mappings are baked in, so they can't be changed
+        until the point cache is freed with `free_point_cache`.
+
+        Parameters:
+        ----------
+        rep_names : list of str, optional
+            The representations to bake (default: None).
+            If None, then all representations that aren't an
+            UpdatingAtomGroup are baked.
+        directory : str, optional
+            The directory to write the point caches to (default: None).
+            If None, then the session's temporary directory is used.
+        chunk_size : int, optional
+            The number of frames to buffer before writing (default: 64).
+
+        Returns:
+        -------
+        dict
+            The path of the point cache for each baked representation.
+        """
+        if rep_names is None:
+            rep_names = self.rep_names
+        if directory is None:
+            directory = self.session_tmp_dir
+        os.makedirs(directory, exist_ok=True)
+
+        paths = {}
+        for rep_name in rep_names:
+            self._load_rep(rep_name)
+            ag_rep = self.atom_reps[rep_name]
+            if ag_rep.is_updating:
+                warnings.warn(f"Unable to bake {rep_name}, the atoms of an "
+                              "UpdatingAtomGroup change between frames.")
+                continue
+            mol_object = bpy.data.objects[rep_name]
+            frame_index = self._frame_index(rep_name, mol_object['subframes'])
+
+            def frames(rep_name=rep_name, mol_object=mol_object, frame_index=frame_index):
+                # frames past the end of the trajectory keep the last positions
+                locations = obj.get_attribute(mol_object, 'position')
+                for frame_a, frame_b, fraction in frame_index.tolist():
+                    if frame_a >= 0:
+                        locations = self._positions_at(rep_name, frame_a)
+                        if fraction > 0 and frame_b != frame_a:
+                            locations = lerp(
+                                locations, self._positions_at(rep_name, frame_b), t=fraction
+                            )
+                    yield locations
+
+            paths[rep_name] = write_point_cache(
+                path=os.path.join(directory, f"{self.uuid}_{rep_name}.pc2"),
+                frames=frames(),
+                n_points=ag_rep.n_atoms,
+                n_samples=len(frame_index),
+                chunk_size=chunk_size
+            )
+            self._add_point_cache_modifier(mol_object, paths[rep_name])
+        return paths
+
+    def free_point_cache(self, rep_names=None):
+        """
+        Remove the point cache modifiers of representations, so that they are
+        updated by the frame change handler again. The .pc2 files are kept.
+        """
+        if rep_names is None:
+            rep_names = self.rep_names
+        for rep_name in rep_names:
+            mol_object = bpy.data.objects[rep_name]
+            modifier = mol_object.modifiers.get("MN_point_cache")
+            if modifier is not None:
+                mol_object.modifiers.remove(modifier)
+
+    @staticmethod
+    def _add_point_cache_modifier(mol_object, path):
+        """
+        Add a Mesh Cache modifier that plays the point cache back, before the
+        geometry nodes so that they are evaluated on the cached positions.
+        """
+        modifier = mol_object.modifiers.get("MN_point_cache")
+        if modifier is None:
+            modifier = mol_object.modifiers.new("MN_point_cache", "MESH_CACHE")
+        modifier.cache_format = "PC2"
+        modifier.filepath = path
+        modifier.play_mode = "SCENE"
+        modifier.time_mode = "FRAME"
+        modifier.frame_start = 0
+        modifier.frame_scale = 1
+        modifier.interpolation = "NONE"
+        if mol_object.modifiers[0].name != modifier.name:
+            with bpy.context.temp_override(object=mol_object):
+                bpy.ops.object.modifier_move_to_index(modifier=modifier.name, index=0)
 
     def _process_atomgroup(
         self,
         ag,
         frame_mapping=None,
+        frame_window=None,
         subframes = 0,
         name="atoms",
         style="vdw",
         include_bonds=True,
+        selection=None,
+        frame_attributes=None,
         add_node_tree=True,
         return_object=False,
     ):
@@ -735,6 +1839,8 @@ class MDAnalysisSession:
             The atomgroup to add in the scene.
         frame_mapping : np.ndarray
             The frame mapping for the trajectory in Blender frame indices. Default: None
+        frame_window : list of int
+            The [start, stop, step] window of trajectory frames. Default: None
         subframes : int
             The number of subframes to interpolate between each frame.
         name : str
@@ -743,6 +1849,11 @@ class MDAnalysisSession:
             The style of the atoms. Default: 'vdw'
         include_bonds : bool
             Whether to include bond information if available. Default: True
+        selection : str
+            The selection string the atomgroup was created from, used to
+            recreate the atomgroup when the session is loaded. Default: None
+        frame_attributes : list of str
+            The names of the attributes to update on every frame change. Default: None
         add_node_tree : bool
             Whether to add the node tree for the atomgroup. Default: True
         return_object : bool
@@ -765,12 +1876,22 @@ class MDAnalysisSession:
         mol_object["session"] = self.uuid
 
         # add the attributes for the model in blender
-        for att_name, att in ag_blender._attributes_2_blender.items():
+        if ag_blender.is_updating:
+            # use the universe-level numbering for chains and atom types, so
+            # they stay the same as the atoms in the selection change
+            ag_blender._previous_ix = ag.ix.copy()
+            attributes = ag_blender._gather_attributes(ag_blender._previous_ix)
+            mol_object['chain_id_unique'] = ag_blender._universe_attributes["chain_id_unique"]
+            mol_object['atom_type_unique'] = ag_blender._universe_attributes["atom_type_unique"]
+        else:
+            attributes = ag_blender._attributes_2_blender
+            mol_object['chain_id_unique'] = ag_blender.chain_id_unique
+            mol_object['atom_type_unique'] = ag_blender.atom_type_unique
+
+        for att_name, att in attributes.items():
             obj.add_attribute(
                 mol_object, att_name, att["value"], att["type"], att["domain"]
             )
-        mol_object['chain_id_unique'] = ag_blender.chain_id_unique
-        mol_object['atom_type_unique'] = ag_blender.atom_type_unique
         mol_object['subframes'] = subframes
 
         # add the atomgroup to the session
@@ -785,12 +1906,19 @@ class MDAnalysisSession:
                 )
             )
 
+        # drop any frames cached for a previous object of the same name
+        self.frame_cache.discard(mol_object.name)
         self.atom_reps[mol_object.name] = ag_blender
         self.universe_reps[mol_object.name] = {
             "universe": ag.universe,
             "frame_mapping": frame_mapping,
+            "frame_window": frame_window,
+            "selection": selection,
+            "frame_attributes": frame_attributes or [],
         }
         self.rep_names.append(mol_object.name)
+        add_frame_attributes(mol_object, read_frame_attributes(ag, frame_attributes or []))
+        self._frame_index(mol_object.name, subframes)
 
         # for old import, the node tree is added all at once
         # in the end of in_memory
@@ -809,73 +1937,228 @@ class MDAnalysisSession:
         The function that will be called when the frame changes.
         It will update the positions and selections of the atoms in the scene.
         """
+        if frame < 0:
+            return
+
         for rep_name in self.rep_names:
+            # point cached representations are played back by their modifier
+            if "MN_point_cache" in bpy.data.objects[rep_name].modifiers:
+                continue
+            # universes are only opened again on the first frame change
+            self._load_rep(rep_name)
             universe = self.universe_reps[rep_name]["universe"]
-            frame_mapping = self.universe_reps[rep_name]["frame_mapping"]
             subframes = bpy.data.objects[rep_name]['subframes']
-            
-            if frame < 0: 
+            frame_index = self._frame_index(rep_name, subframes)
+
+            if frame >= len(frame_index):
+                continue
+
+            frame_a, frame_b, fraction = frame_index[frame].item()
+
+            if frame_a < 0:
                 continue
-            
-            if frame_mapping:
-                # add the subframes to the frame mapping
-                frame_map = np.repeat(frame_mapping, subframes + 1)
-                # get the current and next frames
-                frame_a = frame_map[frame]
-                frame_b = frame_map[frame + 1]
-                
-            else:
-                # get the initial frame
-                if subframes == 0:
-                    frame_a = frame
-                else:
-                    frame_a = int(frame / (subframes + 1))
-                
-                # get the next frame
-                frame_b = frame_a + 1
-            
-            if frame_a >= universe.trajectory.n_frames:
-                    continue
             
             ag_rep = self.atom_reps[rep_name]
             mol_object = bpy.data.objects[rep_name]
-            
-            # set the trajectory at frame_a
-            universe.trajectory[frame_a]
-            
-            if subframes > 0:
-                fraction = frame % (subframes + 1) / (subframes + 1)
-                
-                # get the positions for the next frame
-                locations_a = ag_rep.positions
-                
-                if frame_b < universe.trajectory.n_frames:
-                    universe.trajectory[frame_b]
-                locations_b = ag_rep.positions
-                
-                # interpolate between the two sets of positions    
-                locations = lerp(locations_a, locations_b, t=fraction)
-            else:
-                locations = ag_rep.positions
+            frame_attributes = self.universe_reps[rep_name].get("frame_attributes")
+            timings = dict.fromkeys(UpdateTimings.stages, 0.0)
 
             # if the class of AtomGroup is UpdatingAtomGroup
-            # then update as a new mol_object
-            if isinstance(ag_rep.ag, mda.core.groups.UpdatingAtomGroup):
-                mol_object.data.clear_geometry()
-                mol_object.data.from_pydata(
-                                    ag_rep.positions,
-                                    ag_rep.bonds,
-                                    faces=[])
-                for att_name, att in ag_rep._attributes_2_blender.items():
-                    obj.add_attribute(
-                        mol_object, att_name, att["value"], att["type"], att["domain"]
-                    )
-                mol_object['chain_id_unique'] = ag_rep.chain_id_unique
-                mol_object['atom_type_unique'] = ag_rep.atom_type_unique
-                mol_object['subframes'] = subframes
-            else:
-                # update the positions of the underlying vertices
-                obj.set_position(mol_object, locations)
+            # then the atoms in the mol_object may have changed
+            if ag_rep.is_updating:
+                # the selection is evaluated at frame_a, so it can't be cached
+                start = time.perf_counter()
+                self._seek(universe, frame_a)
+                timings["seek"] = time.perf_counter() - start
+                start = time.perf_counter()
+                attributes = read_frame_attributes(ag_rep.ag, frame_attributes or [])
+                timings["read"] = time.perf_counter() - start
+                start = time.perf_counter()
+                self._update_atomgroup_mesh(mol_object, ag_rep)
+                add_frame_attributes(mol_object, attributes)
+                timings["write"] = time.perf_counter() - start
+                self.timings.record(frame, rep_name, timings)
+                continue
+
+            locations = self._positions_at(rep_name, frame_a, timings)
+            attributes = {}
+            if frame_attributes:
+                attributes = self._attributes_at(rep_name, frame_a, timings)
+            
+            if fraction > 0 and frame_b != frame_a:
+                # interpolate between the positions of the two frames
+                locations_b = self._positions_at(rep_name, frame_b, timings)
+                attributes_b = {}
+                if frame_attributes:
+                    attributes_b = self._attributes_at(rep_name, frame_b, timings)
+                start = time.perf_counter()
+                locations = lerp(locations, locations_b, t=fraction)
+                for name in attributes.keys() & attributes_b.keys():
+                    attributes[name] = lerp(attributes[name], attributes_b[name], t=fraction)
+                timings["interpolate"] = time.perf_counter() - start
+
+            # update the positions of the underlying vertices
+            start = time.perf_counter()
+            obj.set_position(mol_object, locations)
+            add_frame_attributes(mol_object, attributes)
+            timings["write"] = time.perf_counter() - start
+            self.timings.record(frame, rep_name, timings)
+
+    def _update_atomgroup_mesh(self, mol_object, ag_rep):
+        """
+        Update the mesh of an UpdatingAtomGroup representation.
+
+        If the atoms in the selection are unchanged, only the positions are
+        written. Otherwise the attributes are gathered from the universe-level
+        table, and the mesh is only rebuilt if the number of atoms changed or
+        there are bonds to update.
+        """
+        ix = ag_rep.ag.ix
+        positions = ag_rep.positions
+        previous_ix = getattr(ag_rep, "_previous_ix", None)
+        if previous_ix is not None and np.array_equal(ix, previous_ix):
+            obj.set_position(mol_object, positions)
+            return
+
+        bonds = ag_rep.bonds
+        mesh = mol_object.data
+        if len(mesh.vertices) != len(ix) or bonds or len(mesh.edges) > 0:
+            mesh.clear_geometry()
+            mesh.from_pydata(positions, bonds, faces=[])
+        else:
+            obj.set_position(mol_object, positions)
+
+        for att_name, att in ag_rep._gather_attributes(ix).items():
+            obj.add_attribute(
+                mol_object, att_name, att["value"], att["type"], att["domain"],
+                overwrite=True
+            )
+        ag_rep._previous_ix = ix.copy()
+
+    def _frame_index(self, rep_name, subframes):
+        """
+        The lookup table from Blender frames to trajectory frames for the
+        representation. The table is only recomputed when the subframes,
+        the frame mapping, the frame window or the length of the trajectory
+        change.
+        """
+        rep = self.universe_reps[rep_name]
+        n_frames = rep["universe"].trajectory.n_frames
+        start, stop, step = rep.get("frame_window") or (None, None, None)
+        key = (subframes, n_frames, start, stop, step)
+        if rep.get("frame_index_key") != key or rep.get("frame_index_mapping") is not rep["frame_mapping"]:
+            rep["frame_index"] = frame_index_table(
+                n_frames=n_frames,
+                frame_mapping=rep["frame_mapping"],
+                subframes=subframes,
+                start=start,
+                stop=stop,
+                step=step
+            )
+            rep["frame_index_key"] = key
+            rep["frame_index_mapping"] = rep["frame_mapping"]
+        return rep["frame_index"]
+
+    def _positions_at(self, rep_name, frame, timings=None):
+        """
+        The positions of the representation at the given trajectory frame.
+        Baked frames are read from the bake instead of the trajectory.
+        Decoded frames are stored in the session's frame cache, so that each
+        frame is only read from the trajectory once while it stays cached.
+        The time spent seeking and reading is added to `timings` if given.
+        """
+        key = (rep_name, frame)
+        start = time.perf_counter()
+        positions = self.frame_cache.get(key)
+        if positions is None:
+            bake = self.universe_reps[rep_name].get("bake")
+            if bake is None or frame not in bake:
+                return self._read_frame(rep_name, frame, timings)["position"]
+            positions = bake.positions(frame) * self.world_scale
+            self.frame_cache.put(key, positions)
+        if timings is not None:
+            timings["read"] += time.perf_counter() - start
+        return positions
+
+    def _attributes_at(self, rep_name, frame, timings=None):
+        """
+        The per-frame attributes of the representation at the given trajectory
+        frame, from the bake, the frame cache or read together with the positions.
+        """
+        start = time.perf_counter()
+        names = self.universe_reps[rep_name]["frame_attributes"]
+        bake = self.universe_reps[rep_name].get("bake")
+        if bake is not None and frame in bake and bake.has_attributes(names):
+            attributes = bake.frame_attributes(frame, names)
+            if timings is not None:
+                timings["read"] += time.perf_counter() - start
+            return attributes
+        attributes = {}
+        for name in names:
+            value = self.frame_cache.get((rep_name, frame, name))
+            if value is None:
+                frame_data = self._read_frame(rep_name, frame, timings)
+                frame_data.pop("position")
+                return frame_data
+            # attributes the trajectory doesn't have are cached as empty
+            if len(value) > 0:
+                attributes[name] = value
+        if timings is not None:
+            timings["read"] += time.perf_counter() - start
+        return attributes
+
+    def _read_frame(self, rep_name, frame, timings=None):
+        """
+        Read the positions and per-frame attributes of the representation
+        from the trajectory in a single seek, adding them to the frame cache.
+        """
+        rep = self.universe_reps[rep_name]
+        start = time.perf_counter()
+        self._seek(rep["universe"], frame)
+        seek_end = time.perf_counter()
+
+        ag_rep = self.atom_reps[rep_name]
+        frame_data = read_frame_attributes(ag_rep.ag, rep.get("frame_attributes") or [])
+        for name in rep.get("frame_attributes") or []:
+            self.frame_cache.put(
+                (rep_name, frame, name), frame_data.get(name, np.empty(0, dtype=np.float32))
+            )
+        frame_data["position"] = ag_rep.positions
+        self.frame_cache.put((rep_name, frame), frame_data["position"])
+
+        if timings is not None:
+            timings["seek"] += seek_end - start
+            timings["read"] += time.perf_counter() - seek_end
+        return frame_data
+
+    @staticmethod
+    def _seek(universe, frame):
+        """
+        Move the trajectory to the frame, unless it is already there, so that
+        representations of the same universe share a single read of each frame.
+        """
+        if universe.trajectory.ts.frame != frame:
+            universe.trajectory[frame]
+
+    @staticmethod
+    def _frame_attribute_names(frame_attributes):
+        """
+        The names of the requested per-frame attributes, registering the
+        functions if they are given as a dictionary.
+        """
+        if frame_attributes is None:
+            return []
+        if isinstance(frame_attributes, str):
+            frame_attributes = [frame_attributes]
+        if isinstance(frame_attributes, dict):
+            for name, reader in frame_attributes.items():
+                register_frame_attribute(name, reader)
+        names = list(frame_attributes)
+        unknown = [name for name in names if name not in frame_attribute_readers]
+        if unknown:
+            raise ValueError(f"Unknown per-frame attributes {unknown}, "
+                             "register them with register_frame_attribute().")
+        return names
 
     @persistent
     def _update_trajectory_handler_wrapper(self):
@@ -913,33 +2196,285 @@ class MDAnalysisSession:
                 self.rep_names.remove(rep_name)
                 del self.atom_reps[rep_name]
                 del self.universe_reps[rep_name]
+                self.frame_cache.discard(rep_name)
+
+    def _manifest_path(self, session_name=None):
+        return os.path.join(self.session_tmp_dir, f"{session_name or self.uuid}.json")
+
+    def _rep_manifest(self, rep_name, universes, indices):
+        """
+        The manifest entry needed to recreate a representation, adding the
+        universe of the representation to `universes` if it isn't already
+        and the atom indices to `indices` if there is no selection string.
+        """
+        rep = self.universe_reps[rep_name]
+        if rep["universe"] is None:
+            # never loaded since the session was opened, so save it unchanged
+            entry = dict(rep["manifest"])
+            universe_entry = entry.pop("universe_entry")
+            if entry["indices"] is not None:
+                indices[rep_name] = rep["indices"]
+                entry["indices"] = rep_name
+            entry["universe"] = self._add_universe_entry(universes, universe_entry)
+            return entry
+
+        ag_rep = self.atom_reps[rep_name]
+        universe = rep["universe"]
+        frame_mapping = rep["frame_mapping"]
+        entry = {
+            "style": ag_rep.style,
+            "include_bonds": ag_rep.include_bonds,
+            "selection": rep.get("selection"),
+            "updating": None,
+            "indices": None,
+            "frame_mapping": None if frame_mapping is None else np.asarray(frame_mapping).tolist(),
+            "frame_window": rep.get("frame_window"),
+            "subframes": int(bpy.data.objects[rep_name]["subframes"]),
+            "bake": None,
+            "frame_attributes": list(rep.get("frame_attributes") or []),
+        }
+        if rep.get("bake") is not None:
+            if rep["bake"].path is None:
+                # packed frames are only written the first time they are saved
+                rep["bake"].save(os.path.join(self.session_tmp_dir, f"{self.uuid}_{rep_name}_packed"))
+            entry["bake"] = rep["bake"].path
+        if ag_rep.is_updating:
+            entry["updating"] = list(ag_rep.ag._selection_strings)
+            # the selection is made from the atoms it was selected from
+            base_group = ag_rep.ag._base_group
+            if base_group.n_atoms != universe.atoms.n_atoms:
+                indices[rep_name] = base_group.ix
+                entry["indices"] = rep_name
+        elif entry["selection"] is None:
+            indices[rep_name] = ag_rep.ag.ix
+            entry["indices"] = rep_name
+
+        entry["universe"] = self._add_universe_entry(
+            universes, self._universe_manifest(universe)
+        )
+        return entry
+
+    @staticmethod
+    def _add_universe_entry(universes, universe_entry):
+        """
+        Add the universe entry to the manifest's universes if an identical
+        entry isn't already there, returning the index of the entry.
+        """
+        key = json.dumps(universe_entry, sort_keys=True)
+        if key not in universes:
+            universes[key] = (len(universes), universe_entry)
+        return universes[key][0]
+
+    def _universe_manifest(self, universe):
+        """
+        The file paths needed to open the universe again. Trajectories that
+        are in memory are saved to a .npy file next to the manifest, which is
+        only written again if the checksum of the coordinates has changed.
+        """
+        from MDAnalysis.coordinates.memory import MemoryReader
+
+        trajectory = getattr(universe.trajectory, "filenames", None)
+        if trajectory is None:
+            trajectory = getattr(universe.trajectory, "filename", None)
+        if isinstance(trajectory, str):
+            trajectory = os.path.abspath(trajectory)
+        elif trajectory is not None:
+            trajectory = [os.path.abspath(file) for file in trajectory]
+
+        memory, checksum = None, None
+        if isinstance(universe.trajectory, MemoryReader) and self.save_memory:
+            coordinates = universe.trajectory.get_array()
+            checksum = zlib.crc32(np.ascontiguousarray(coordinates))
+            memory, saved_checksum = self._memory_files.get(universe, (None, None))
+            if memory is None or checksum != saved_checksum or not os.path.exists(memory):
+                # the previous file may still be memory-mapped by the universe, or
+                # referenced by representations that weren't opened, so changed
+                # coordinates are written to a new file
+                memory = os.path.join(
+                    self.session_tmp_dir,
+                    f"{self.uuid}_{uuid.uuid4().hex[:8]}.npy"
+                )
+                np.save(memory, coordinates)
+                self._memory_files[universe] = (memory, checksum)
+
+        # universes built in memory have no topology file to open again
+        topology = universe.filename
+        if topology is not None:
+            topology = os.path.abspath(topology)
+
+        return {
+            "topology": topology,
+            "trajectory": trajectory,
+            "memory": memory,
+            "checksum": checksum,
+        }
 
     def _dump(self):
         """
-        Dump the session as a pickle file in the default location
+        Dump the session as a JSON manifest in the default location
         (`~/.blender_mda_session/`).
         """
-        with open(f"{self.session_tmp_dir}/{self.uuid}.pkl", "wb") as f:
-            pickle.dump(self, f)
+        universes = {}
+        indices = {}
+        reps = {
+            rep_name: self._rep_manifest(rep_name, universes, indices)
+            for rep_name in self.rep_names
+        }
+        manifest = {
+            "uuid": self.uuid,
+            "world_scale": self.world_scale,
+            "universes": [entry for _, entry in sorted(universes.values(), key=lambda x: x[0])],
+            "reps": reps,
+        }
+        if indices:
+            np.savez(os.path.join(self.session_tmp_dir, f"{self.uuid}_indices.npz"), **indices)
+
+        with open(self._manifest_path(), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    def _load_rep(self, rep_name):
+        """
+        Open the universe and create the atomgroup of a representation that
+        was loaded from a manifest and hasn't been accessed yet.
+        """
+        rep = self.universe_reps[rep_name]
+        if rep["universe"] is not None:
+            return
+
+        entry = rep["manifest"]
+        universe_entry = entry["universe_entry"]
+        key = json.dumps(universe_entry, sort_keys=True)
+        universe = self._opened_universes.get(key)
+        if universe is None:
+            if universe_entry["memory"] is not None:
+                from MDAnalysis.coordinates.memory import MemoryReader
+                coordinates = np.load(universe_entry["memory"], mmap_mode="r")
+                universe = mda.Universe(
+                    universe_entry["topology"], coordinates, format=MemoryReader
+                )
+                # manifests saved before checksums were stored are written again
+                self._memory_files[universe] = (
+                    universe_entry["memory"], universe_entry.get("checksum")
+                )
+            elif universe_entry["trajectory"] is not None:
+                universe = mda.Universe(universe_entry["topology"], universe_entry["trajectory"])
+            else:
+                universe = mda.Universe(universe_entry["topology"])
+            self._opened_universes[key] = universe
+
+        if entry["updating"] is not None:
+            base_group = universe.atoms if rep["indices"] is None else universe.atoms[rep["indices"]]
+            ag = base_group.select_atoms(*entry["updating"], updating=True)
+        elif entry["selection"] is not None:
+            ag = universe.select_atoms(entry["selection"])
+        else:
+            ag = universe.atoms[rep["indices"]]
+
+        ag_rep = AtomGroupInBlender(
+            ag=ag,
+            include_bonds=entry["include_bonds"],
+            style=entry["style"],
+            world_scale=self.world_scale
+        )
+        if ag_rep.is_updating:
+            ag_rep._previous_ix = ag.ix.copy()
+        self.atom_reps[rep_name] = ag_rep
+        rep["universe"] = universe
+        if entry.get("bake") is not None and os.path.exists(f"{entry['bake']}.meta.npz"):
+            rep["bake"] = TrajectoryBake(entry["bake"])
 
     @classmethod
     def _rejuvenate(cls, mol_objects):
         """
-        Rejuvenate the session from a pickle file in the default location
+        Rejuvenate the session from a JSON manifest in the default location
         (`~/.blender_mda_session/`).
+        The universes are only opened when the frame first changes.
         """
 
         # get session name from mol_objects dictionary
-        session_name = mol_objects[list(mol_objects.keys())[0]]['session']
-        with open(f"{cls.session_tmp_dir}/{session_name}.pkl", "rb") as f:
-            cls = pickle.load(f)
+        session_names = [mol["session"] for mol in mol_objects.values() if "session" in mol]
+        if not session_names:
+            return None
+        session_name = session_names[0]
+
+        manifest_path = os.path.join(cls.session_tmp_dir, f"{session_name}.json")
+        if os.path.exists(manifest_path):
+            session = cls._from_manifest(manifest_path)
+        else:
+            # sessions saved before the manifest was introduced were pickled
+            with open(f"{cls.session_tmp_dir}/{session_name}.pkl", "rb") as f:
+                session = pickle.load(f)
+            # sessions saved before the frame cache was added
+            if not hasattr(session, "frame_cache"):
+                session.frame_cache = FrameCache()
+            if not hasattr(session, "_memory_files"):
+                session.save_memory = True
+                session._memory_files = weakref.WeakKeyDictionary()
+                session._opened_universes = {}
+            if not hasattr(session, "timings"):
+                session.timings = UpdateTimings()
         bpy.app.handlers.frame_change_post.append(
-            cls._update_trajectory_handler_wrapper()
+            session._update_trajectory_handler_wrapper()
         )
         bpy.app.handlers.depsgraph_update_pre.append(
-            cls._update_style_handler_wrapper()
+            session._update_style_handler_wrapper()
         )
-        return cls
+        return session
+
+    @classmethod
+    def _from_manifest(cls, manifest_path):
+        """
+        Create a session from a JSON manifest, without opening any universes.
+        """
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+
+        session = cls.__new__(cls)
+        session.world_scale = manifest["world_scale"]
+        session.uuid = manifest["uuid"]
+        session.universe_reps = {}
+        session.atom_reps = {}
+        session.rep_names = []
+        session.frame_cache = FrameCache()
+        session.timings = UpdateTimings()
+        session.save_memory = True
+        session._memory_files = weakref.WeakKeyDictionary()
+        session._opened_universes = {}
+
+        indices_path = os.path.join(cls.session_tmp_dir, f"{session.uuid}_indices.npz")
+        indices = {}
+        if os.path.exists(indices_path):
+            with np.load(indices_path) as f:
+                indices = dict(f)
+
+        for rep_name, entry in manifest["reps"].items():
+            if rep_name not in bpy.data.objects:
+                continue
+            entry = dict(entry)
+            entry["universe_entry"] = manifest["universes"][entry.pop("universe")]
+            if entry["universe_entry"]["topology"] is None:
+                warnings.warn(f"The universe of {rep_name} has no topology file and "
+                              "can't be opened again, it won't be updated.")
+                continue
+            frame_mapping = entry["frame_mapping"]
+            frame_attributes = entry.get("frame_attributes", [])
+            missing = [name for name in frame_attributes if name not in frame_attribute_readers]
+            if missing:
+                warnings.warn(f"The per-frame attributes {missing} of {rep_name} aren't "
+                              "registered and won't be updated.")
+            session.universe_reps[rep_name] = {
+                "universe": None,
+                "frame_mapping": None if frame_mapping is None else np.array(frame_mapping),
+                "frame_window": entry.get("frame_window"),
+                "selection": entry["selection"],
+                "frame_attributes": [name for name in frame_attributes if name not in missing],
+                "indices": indices[entry["indices"]] if entry["indices"] is not None else None,
+                "manifest": entry,
+            }
+            session.atom_reps[rep_name] = None
+            session.rep_names.append(rep_name)
+
+        return session
 
 
 @persistent
@@ -948,8 +2483,8 @@ def _rejuvenate_universe(scene):
     Rejuvenate the session when the old Blend file is loaded.
     It will search through all the objects in the scene and
     find the ones that are molecules.
-    It requires the pkl file to be in the default location and
-    still exist.
+    It requires the manifest and the files it refers to,
+    to be in the same location and still exist.
 
     Warning:
     -------
@@ -968,15 +2503,18 @@ def _rejuvenate_universe(scene):
             pass
 
     if len(mol_objects) > 0:
-        bpy.types.Scene.mda_session = MDAnalysisSession._rejuvenate(mol_objects)
+        session = MDAnalysisSession._rejuvenate(mol_objects)
+        if session is not None:
+            bpy.types.Scene.mda_session = session
 
 
 @persistent
 def _sync_universe(scene):
     """
     Sync the universe when the Blend file is saved.
-    It will dump the session as a pickle file in the default location
+    It will dump the session as a JSON manifest in the default location
     (`~/.blender_mda_session/`).
     """
-    if bpy.types.Scene.mda_session is not None:
-        bpy.types.Scene.mda_session._dump()
\ No newline at end of file
+    session = getattr(bpy.types.Scene, "mda_session", None)
+    if session is not None:
+        session._dump()
\ No newline at end of file
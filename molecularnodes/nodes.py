@@ -176,7 +176,43 @@ def add_custom_node_group_to_node(parent_group,
     
     return node
 
+def _enabled_socket(sockets, name):
+    """
+    The socket with the name that is enabled for the current data type of its node.
+    """
+    return next(socket for socket in sockets if socket.name == name and socket.enabled)
+
+
+def _starfile_attributes(obj):
+    """
+    The names and data types of the columns of the particles that the node tree
+    samples, converting the data types that can't be sampled to the closest one.
+    """
+    sampled_types = {'INT8': 'INT', 'BYTE_COLOR': 'FLOAT_COLOR', 'FLOAT2': 'FLOAT_VECTOR'}
+    # the ranges of the images only apply to the points they are stored on
+    skipped = {'position', 'MOLImageStart', 'MOLImageCount'}
+    return [
+        (attribute.name, sampled_types.get(attribute.data_type, attribute.data_type))
+        for attribute in obj.data.attributes
+        if attribute.domain == 'POINT'
+        and attribute.name not in skipped
+        and not attribute.name.startswith('.')
+    ]
+
+
 def create_starting_nodes_starfile(obj):
+    """
+    Create the starting node tree for the particles of a STAR file, which
+    instances the 'Molecule' input on the particles of the 'Image' input.
+
+    The range of the particles of the image is looked up from the `MOLImageStart`
+    and `MOLImageCount` attributes, and a point is created for each of them, which
+    samples its position and columns from the particle at start + index, so only
+    the particles of the image are evaluated. If the particles were split into
+    objects with `images_per_object`, the object of the image is picked from the
+    `image_collection` of obj first. The particles are indexed with float math, so
+    `star.load_star_file()` keeps objects within `star.max_points_per_object`.
+    """
     # ensure there is a geometry nodes modifier called 'MolecularNodes' that is created and applied to the object
     node_mod = obj.modifiers.get('MolecularNodes')
     if not node_mod:
@@ -191,10 +227,6 @@ def create_starting_nodes_starfile(obj):
         node_mod.node_group = node_group
         return node_group
     
-    
-    # create a new GN node group, specific to this particular molecule
-    node_group = gn_new_group_empty(node_name)
-    
     # create a new GN node group, specific to this particular molecule
     node_group = gn_new_group_empty(node_name)
     node_mod.node_group = node_group
@@ -202,77 +234,189 @@ def create_starting_nodes_starfile(obj):
     node_group.inputs.new("NodeSocketInt", "Image")
     node_group.inputs["Image"].default_value = 1
     node_group.inputs["Image"].min_value = 1
+    node_group.inputs["Image"].max_value = max(len(obj.get('image_offsets', [0, 0])) - 1, 1)
     node_group.inputs.new("NodeSocketBool", "Simplify")
     # move the input and output nodes for the group
     node_input = node_mod.node_group.nodes[bpy.app.translations.pgettext_data("Group Input",)]
     node_input.location = [0, 0]
     node_output = node_mod.node_group.nodes[bpy.app.translations.pgettext_data("Group Output",)]
-    node_output.location = [900, 0]
-
-    node_delete = node_group.nodes.new("GeometryNodeDeleteGeometry")
-    node_delete.location = [500, 0]
+    node_output.location = [2200, 0]
 
-    node_geom_to_instance = node_group.nodes.new("GeometryNodeInstanceOnPoints")
-    node_geom_to_instance.location = [675, 0]
-
-    node_get_imageid = node_group.nodes.new("GeometryNodeInputNamedAttribute")
-    node_get_imageid.location = [0, 200]
-    node_get_imageid.inputs['Name'].default_value = "MOLImageId"
-    node_get_imageid.data_type = "INT"
+    link = node_group.links.new
 
     node_subtract = node_group.nodes.new("ShaderNodeMath")
-    node_subtract.location = [160, 200]
+    node_subtract.location = [200, 200]
     node_subtract.operation = "SUBTRACT"
     node_subtract.inputs[1].default_value = 1
     node_subtract.inputs[0].default_value = 1
+    link(node_input.outputs[2], node_subtract.inputs[0])
 
-
-    node_compare = node_group.nodes.new("FunctionNodeCompare")
-    node_compare.location = [320, 200]
-    node_compare.operation = "NOT_EQUAL"
-    node_compare.data_type = "INT"
-
-    node_object_info = node_group.nodes.new("GeometryNodeObjectInfo")
-    node_object_info.location = [200, -200]
-
+    geometry = node_input.outputs[0]
+    image_index = node_subtract.outputs[0]
+    images_per_object = obj.get('images_per_object')
+    if images_per_object:
+        # pick the object of the image from the collection, and the image within it
+        node_divide = node_group.nodes.new("ShaderNodeMath")
+        node_divide.location = [400, 400]
+        node_divide.operation = "DIVIDE"
+        node_divide.inputs[1].default_value = images_per_object
+        
+        node_floor = node_group.nodes.new("ShaderNodeMath")
+        node_floor.location = [600, 400]
+        node_floor.operation = "FLOOR"
+        
+        node_modulo = node_group.nodes.new("ShaderNodeMath")
+        node_modulo.location = [400, 200]
+        node_modulo.operation = "MODULO"
+        node_modulo.inputs[1].default_value = images_per_object
+        
+        node_collection_info = node_group.nodes.new("GeometryNodeCollectionInfo")
+        node_collection_info.location = [400, 0]
+        node_collection_info.inputs["Collection"].default_value = bpy.data.collections[obj['image_collection']]
+        node_collection_info.inputs["Separate Children"].default_value = True
+        node_collection_info.inputs["Reset Children"].default_value = True
+        
+        node_instance_index = node_group.nodes.new("GeometryNodeInputIndex")
+        node_instance_index.location = [600, 200]
+        
+        node_compare_object = node_group.nodes.new("FunctionNodeCompare")
+        node_compare_object.location = [800, 400]
+        node_compare_object.data_type = "INT"
+        node_compare_object.operation = "NOT_EQUAL"
+        
+        node_delete = node_group.nodes.new("GeometryNodeDeleteGeometry")
+        node_delete.location = [800, 0]
+        node_delete.domain = "INSTANCE"
+        
+        node_realize = node_group.nodes.new("GeometryNodeRealizeInstances")
+        node_realize.location = [1000, 0]
+        
+        link(image_index, node_divide.inputs[0])
+        link(node_divide.outputs[0], node_floor.inputs[0])
+        link(image_index, node_modulo.inputs[0])
+        link(node_instance_index.outputs[0], node_compare_object.inputs[2])
+        link(node_floor.outputs[0], node_compare_object.inputs[3])
+        link(node_collection_info.outputs[0], node_delete.inputs[0])
+        link(node_compare_object.outputs[0], node_delete.inputs[1])
+        link(node_delete.outputs[0], node_realize.inputs[0])
+        geometry = node_realize.outputs[0]
+        image_index = node_modulo.outputs[0]
+
+    # look up where the particles of the image start, and how many there are
+    image_range = []
+    for i, name in enumerate(["MOLImageStart", "MOLImageCount"]):
+        node_get_range = node_group.nodes.new("GeometryNodeInputNamedAttribute")
+        node_get_range.location = [1000, -200 - 200 * i]
+        node_get_range.data_type = "INT"
+        node_get_range.inputs['Name'].default_value = name
+        
+        node_sample_range = node_group.nodes.new("GeometryNodeSampleIndex")
+        node_sample_range.location = [1200, -200 - 200 * i]
+        node_sample_range.data_type = "INT"
+        node_sample_range.domain = "POINT"
+        
+        link(geometry, node_sample_range.inputs["Geometry"])
+        link(_enabled_socket(node_get_range.outputs, "Attribute"), _enabled_socket(node_sample_range.inputs, "Value"))
+        link(image_index, node_sample_range.inputs["Index"])
+        image_range.append(_enabled_socket(node_sample_range.outputs, "Value"))
+
+    # create the particles of the image, sampling each of them from start + index
+    node_points = node_group.nodes.new("GeometryNodePoints")
+    node_points.location = [1400, 0]
+    
+    node_point_index = node_group.nodes.new("GeometryNodeInputIndex")
+    node_point_index.location = [1200, -600]
+    
+    node_particle = node_group.nodes.new("ShaderNodeMath")
+    node_particle.location = [1400, -400]
+    node_particle.operation = "ADD"
+    
+    node_position = node_group.nodes.new("GeometryNodeInputPosition")
+    node_position.location = [1400, -600]
+    
+    node_sample_position = node_group.nodes.new("GeometryNodeSampleIndex")
+    node_sample_position.location = [1600, -400]
+    node_sample_position.data_type = "FLOAT_VECTOR"
+    node_sample_position.domain = "POINT"
+    
+    link(image_range[1], node_points.inputs["Count"])
+    link(image_range[0], node_particle.inputs[0])
+    link(node_point_index.outputs[0], node_particle.inputs[1])
+    link(geometry, node_sample_position.inputs["Geometry"])
+    link(node_position.outputs[0], _enabled_socket(node_sample_position.inputs, "Value"))
+    link(node_particle.outputs[0], node_sample_position.inputs["Index"])
+    link(_enabled_socket(node_sample_position.outputs, "Value"), node_points.inputs["Position"])
+    
+    # the columns of the particles, which are known from the object they are sampled from
+    source = obj
+    if images_per_object:
+        source = bpy.data.collections[obj['image_collection']].objects[0]
+    points = node_points.outputs[0]
+    attributes = _starfile_attributes(source)
+    for i, (name, data_type) in enumerate(attributes):
+        location = [1800 + 200 * i, 0]
+        
+        node_get_attribute = node_group.nodes.new("GeometryNodeInputNamedAttribute")
+        node_get_attribute.location = [location[0], -800]
+        node_get_attribute.data_type = data_type
+        node_get_attribute.inputs['Name'].default_value = name
+        
+        node_sample_attribute = node_group.nodes.new("GeometryNodeSampleIndex")
+        node_sample_attribute.location = [location[0], -600]
+        node_sample_attribute.data_type = data_type
+        node_sample_attribute.domain = "POINT"
+        
+        node_store = node_group.nodes.new("GeometryNodeStoreNamedAttribute")
+        node_store.location = location
+        node_store.data_type = data_type
+        node_store.domain = "POINT"
+        node_store.inputs['Name'].default_value = name
+        
+        link(geometry, node_sample_attribute.inputs["Geometry"])
+        link(_enabled_socket(node_get_attribute.outputs, "Attribute"), _enabled_socket(node_sample_attribute.inputs, "Value"))
+        link(node_particle.outputs[0], node_sample_attribute.inputs["Index"])
+        link(points, node_store.inputs["Geometry"])
+        link(_enabled_socket(node_sample_attribute.outputs, "Value"), _enabled_socket(node_store.inputs, "Value"))
+        points = node_store.outputs[0]
+    
     node_get_rotation = node_group.nodes.new("GeometryNodeInputNamedAttribute")
-    node_get_rotation.location = [450, -200]
+    node_get_rotation.location = [1800 + 200 * len(attributes), -400]
     node_get_rotation.inputs['Name'].default_value = "MOLRotation"
     node_get_rotation.data_type = "FLOAT_VECTOR"
 
+    node_geom_to_instance = node_group.nodes.new("GeometryNodeInstanceOnPoints")
+    node_geom_to_instance.location = [2000 + 200 * len(attributes), 0]
+    node_output.location = [2200 + 200 * len(attributes), 0]
+
+    node_object_info = node_group.nodes.new("GeometryNodeObjectInfo")
+    node_object_info.location = [200, -1200]
+
     node_get_id = node_group.nodes.new("GeometryNodeInputID")
-    node_get_id.location = [0, -200]
+    node_get_id.location = [0, -1200]
 
     node_statistics = node_group.nodes.new("GeometryNodeAttributeStatistic")
-    node_statistics.location = [200, -400]
+    node_statistics.location = [200, -1400]
 
     node_compare_maxid = node_group.nodes.new("FunctionNodeCompare")
-    node_compare_maxid.location = [400, -400]
+    node_compare_maxid.location = [400, -1400]
     node_compare_maxid.operation = "EQUAL"
 
     node_bool_math = node_group.nodes.new("FunctionNodeBooleanMath")
-    node_bool_math.location = [600, -400]
+    node_bool_math.location = [600, -1400]
     node_bool_math.operation = "OR"
 
     node_switch = node_group.nodes.new("GeometryNodeSwitch")
-    node_switch.location = [800, -400]
+    node_switch.location = [800, -1400]
 
     node_cone = node_group.nodes.new("GeometryNodeMeshCone")
-    node_cone.location = [1000, -400]
+    node_cone.location = [1000, -1400]
 
-    link = node_group.links.new
-
-    link(node_input.outputs[0], node_delete.inputs[0])
-    link(node_delete.outputs[0], node_geom_to_instance.inputs[0])
+    link(points, node_geom_to_instance.inputs[0])
     link(node_geom_to_instance.outputs[0], node_output.inputs[0])
 
     link(node_input.outputs[1], node_object_info.inputs[0])
-    link(node_input.outputs[2], node_subtract.inputs[0])
     link(node_input.outputs[3], node_bool_math.inputs[0])
 
-    link(node_subtract.outputs[0], node_compare.inputs[2])
-    link(node_get_imageid.outputs[4], node_compare.inputs[3])
-    link(node_compare.outputs[0], node_delete.inputs[1])
     link(node_statistics.outputs[4], node_compare_maxid.inputs[0])
     link(node_compare_maxid.outputs[0], node_bool_math.inputs[1])
     link(node_get_id.outputs[0], node_statistics.inputs[2])
@@ -281,13 +425,30 @@ def create_starting_nodes_starfile(obj):
     link(node_object_info.outputs["Geometry"], node_switch.inputs[14])
     link(node_cone.outputs[0], node_switch.inputs[15])
     link(node_switch.outputs[6],     node_geom_to_instance.inputs["Instance"])
-    link(node_get_rotation.outputs[0], node_geom_to_instance.inputs["Rotation"])
+    link(_enabled_socket(node_get_rotation.outputs, "Attribute"), node_geom_to_instance.inputs["Rotation"])
 
 
     # Need to manually set Image input to 1, otherwise it will be 0 (even though default is 1)
     node_mod['Input_3'] = 1
 
-def create_starting_nodes_density(obj, threshold = 0.8):
+def create_starting_nodes_density(obj, threshold = None, preview_levels = None):
+    """
+    Create the starting node tree for a density volume object.
+
+    Parameters
+    ----------
+    obj : bpy.types.Object
+        The volume object to create the node tree for.
+    threshold : float, optional
+        The starting density threshold of the surface. Defaults to the
+        `initial_threshold` of the object from the statistics of its map,
+        or 0.8 for objects without statistics.
+    preview_levels : list of bpy.types.Object, optional
+        Volume objects of the binned pyramid levels, from finest to coarsest.
+        The 'Preview Level' input of the modifier picks the level shown in the
+        viewport (0 for full resolution), while renders always use the full
+        resolution. Defaults to the `pyramid_objects` of the object.
+    """
     # ensure there is a geometry nodes modifier called 'MolecularNodes' that is created and applied to the object
     node_mod = obj.modifiers.get('MolecularNodes')
     if not node_mod:
@@ -301,6 +462,10 @@ def create_starting_nodes_density(obj, threshold = 0.8):
         node_mod.node_group = node_group
         return node_group
     
+    if threshold is None:
+        threshold = obj.get('initial_threshold', 0.8)
+    if preview_levels is None:
+        preview_levels = [bpy.data.objects[name] for name in obj.get('pyramid_objects', [])]
     
     # create a new GN node group, specific to this particular molecule
     node_group = gn_new_group_empty(node_name)
@@ -309,22 +474,65 @@ def create_starting_nodes_density(obj, threshold = 0.8):
     node_input = node_mod.node_group.nodes[bpy.app.translations.pgettext_data("Group Input",)]
     node_input.location = [0, 0]
     node_output = node_mod.node_group.nodes[bpy.app.translations.pgettext_data("Group Output",)]
-    node_output.location = [800, 0]
+    node_output.location = [800 + 600 * len(preview_levels), 0]
     
-    node_density = add_custom_node_group(node_mod, 'MN_density_style_surface', [400, 0])
+    node_density = add_custom_node_group(node_mod, 'MN_density_style_surface', [400 + 600 * len(preview_levels), 0])
     node_density.inputs['Material'].default_value = MN_base_material()
     node_density.inputs['Density Threshold'].default_value = threshold
     
     
     link = node_group.links.new
+    geometry = node_input.outputs[0]
+    
+    if preview_levels:
+        node_group.inputs.new("NodeSocketInt", "Preview Level")
+        node_group.inputs["Preview Level"].min_value = 0
+        node_group.inputs["Preview Level"].max_value = len(preview_levels)
+        node_is_viewport = node_group.nodes.new("GeometryNodeIsViewport")
+        node_is_viewport.location = [0, -200]
+    
+    # in the viewport, switch to the pyramid level that matches the preview level
+    for i, level in enumerate(preview_levels):
+        x = 200 + 600 * i
+        node_object_info = node_group.nodes.new("GeometryNodeObjectInfo")
+        node_object_info.location = [x, -400]
+        node_object_info.inputs[0].default_value = level
+        
+        node_compare = node_group.nodes.new("FunctionNodeCompare")
+        node_compare.location = [x, -200]
+        node_compare.data_type = "INT"
+        node_compare.operation = "EQUAL"
+        node_compare.inputs[3].default_value = i + 1
+        
+        node_bool_math = node_group.nodes.new("FunctionNodeBooleanMath")
+        node_bool_math.location = [x + 200, -200]
+        node_bool_math.operation = "AND"
+        
+        node_switch = node_group.nodes.new("GeometryNodeSwitch")
+        node_switch.location = [x + 400, 0]
+        
+        link(node_input.outputs["Preview Level"], node_compare.inputs[2])
+        link(node_compare.outputs[0], node_bool_math.inputs[0])
+        link(node_is_viewport.outputs[0], node_bool_math.inputs[1])
+        link(node_bool_math.outputs[0], node_switch.inputs[1])
+        link(geometry, node_switch.inputs[14])
+        link(node_object_info.outputs["Geometry"], node_switch.inputs[15])
+        geometry = node_switch.outputs[6]
+    
     link(
-        node_input.outputs[0], 
+        geometry, 
         node_density.inputs[0]
     )
     link(
         node_density.outputs[0], 
         node_output.inputs[0]
     )
+    
+    if preview_levels:
+        # preview with the coarsest level by default
+        node_mod[node_group.inputs["Preview Level"].identifier] = len(preview_levels)
+    
+    return node_group
 
 
 def create_starting_node_tree(obj, coll_frames = None, starting_style = "atoms", name = None, set_color = True):
@@ -50,6 +50,50 @@ def create_object(name: str, collection: bpy.types.Collection, locations, bonds=
     return MN_object
 
 
+def create_mesh_object(name: str, collection: bpy.types.Collection, vertices: np.ndarray, faces: np.ndarray) -> bpy.types.Object:
+    """
+    Create a mesh object from arrays of vertices and faces.
+
+    The arrays are written with `foreach_set`, avoiding the per-element Python
+    loops of `from_pydata`, so large meshes such as isosurfaces are fast to create.
+
+    Parameters
+    ----------
+    name : str
+        The name of the mesh object to be created.
+    collection : bpy.types.Collection
+        The collection to which the mesh object will be added.
+    vertices : np.ndarray
+        The (n, 3) array of vertex locations.
+    faces : np.ndarray
+        The (m, k) array of vertex indices of each face, with k vertices per face.
+
+    Returns
+    -------
+    bpy.types.Object
+        The newly created mesh object.
+    """
+    vertices = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)
+    faces = np.asarray(faces, dtype=np.int32)
+    n_sides = faces.shape[1] if faces.ndim == 2 else 3
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(vertices))
+    mesh.vertices.foreach_set('co', vertices.reshape(-1))
+    mesh.loops.add(faces.size)
+    mesh.loops.foreach_set('vertex_index', faces.reshape(-1))
+    mesh.polygons.add(len(faces))
+    mesh.polygons.foreach_set('loop_start', np.arange(0, faces.size, n_sides, dtype=np.int32))
+    # the number of loops of each polygon is derived from the loop starts in newer versions
+    if not mesh.polygons.bl_rna.properties['loop_total'].is_readonly:
+        mesh.polygons.foreach_set('loop_total', np.full(len(faces), n_sides, dtype=np.int32))
+    mesh.update(calc_edges=True)
+
+    mesh_object = bpy.data.objects.new(name, mesh)
+    collection.objects.link(mesh_object)
+    return mesh_object
+
+
 def add_attribute(object: bpy.types.Object, name: str, data, type="FLOAT", domain="POINT", overwrite: bool = False):
     """
     Add an attribute to the given object's geometry on the given domain.
@@ -1,9 +1,11 @@
 import bpy
 import numpy as np
+import warnings
 from . import coll
 from . import nodes
 from .obj import create_object
 from .obj import add_attribute
+from .utils import rotation_attributes
 
 
 
@@ -15,6 +17,42 @@ bpy.types.Scene.MN_import_star_file_path = bpy.props.StringProperty(
     subtype = 'FILE_PATH', 
     maxlen = 0
     )
+bpy.types.Scene.MN_import_star_stream = bpy.props.BoolProperty(
+    name = 'MN_import_star_stream', 
+    description = 'Read the file in chunks of rows, using much less memory for large particle stacks.', 
+    default = False
+    )
+bpy.types.Scene.MN_import_star_images_per_object = bpy.props.IntProperty(
+    name = 'MN_import_star_images_per_object', 
+    description = 'Split the particles into objects of this many images each, so switching images only touches one object. 0 keeps every particle in one object.', 
+    default = 0,
+    min = 0
+    )
+bpy.types.Scene.MN_import_star_minimal = bpy.props.BoolProperty(
+    name = 'MN_import_star_minimal', 
+    description = 'Only keep the positions, rotations and image ids, for fast previews of large files.', 
+    default = False
+    )
+bpy.types.Scene.MN_import_star_include = bpy.props.StringProperty(
+    name = 'MN_import_star_include', 
+    description = 'Comma separated columns to add as attributes. Leave empty to add every column.', 
+    default = ''
+    )
+bpy.types.Scene.MN_import_star_exclude = bpy.props.StringProperty(
+    name = 'MN_import_star_exclude', 
+    description = 'Comma separated columns to leave out of the attributes.', 
+    default = ''
+    )
+bpy.types.Scene.MN_import_star_rotations = bpy.props.EnumProperty(
+    name = 'MN_import_star_rotations', 
+    description = 'Rotation attributes to add next to the Euler angles of MOLRotation.', 
+    items = (
+        ('quaternion', 'Quaternion', 'Add MOLRotationQuaternion as a (w, x, y, z) color attribute'),
+        ('matrix', 'Matrix', 'Add the rotated axes as MOLRotationAxisX, MOLRotationAxisY and MOLRotationAxisZ'),
+    ),
+    options = {'ENUM_FLAG'},
+    default = set()
+    )
 bpy.types.Scene.MN_import_star_file_name = bpy.props.StringProperty(
     name = 'star_file_name', 
     description = 'Name of the created object.', 
@@ -27,95 +65,490 @@ bpy.types.Scene.MN_import_star_file_name = bpy.props.StringProperty(
 
 
 
-def load_star_file(
-    file_path, 
-    obj_name = 'NewStarInstances', 
-    node_tree = True,
-    world_scale =  0.01 
-    ):
+# the columns needed for the positions, rotations and image ids of each type of STAR file
+required_columns = {
+    'relion': [
+        'rlnCoordinateX', 'rlnCoordinateY', 'rlnCoordinateZ',
+        'rlnOriginXAngst', 'rlnOriginYAngst', 'rlnOriginZAngst',
+        'rlnAngleRot', 'rlnAngleTilt', 'rlnAnglePsi',
+        'rlnMicrographName', 'rlnOpticsGroup', 'rlnImagePixelSize',
+    ],
+    'cistem': [
+        'cisTEMOriginalXPosition', 'cisTEMOriginalYPosition',
+        'cisTEMDefocus1', 'cisTEMDefocus2',
+        'cisTEMAnglePhi', 'cisTEMAngleTheta', 'cisTEMAnglePsi',
+        'cisTEMOriginalImageFilename',
+    ],
+}
+
+
+# named selections of the columns to add as attributes, 'minimal' only keeps
+# the positions, rotations and image ids that every STAR object has
+column_presets = {
+    'all': None,
+    'minimal': [],
+}
+
+
+def select_columns(names, columns=None, exclude=None) -> list:
+    """
+    The columns to add as attributes, in the order of the file.
+
+    Parameters
+    ----------
+    names : list of str
+        The columns of the file.
+    columns : list of str or str, optional
+        The columns to include, or the name of one of the `column_presets`.
+        Defaults to every column.
+    exclude : list of str, optional
+        The columns to leave out, even if they are included.
+
+    Returns
+    -------
+    list of str
+        The selected columns that are in the file.
+    """
+    if isinstance(columns, str):
+        if columns not in column_presets:
+            raise ValueError(f"Unknown column preset '{columns}', choose from {list(column_presets)}.")
+        columns = column_presets[columns]
+    exclude = set(exclude or [])
+    return [
+        name for name in names
+        if (columns is None or name in columns) and name not in exclude
+    ]
+
+
+def attribute_type(values: np.ndarray, categorical: bool = False) -> str:
+    """
+    The attribute type that keeps the type of a column, INT for category
+    codes and integers that fit in 32 bits, otherwise FLOAT.
+    """
+    if categorical:
+        return 'INT'
+    if np.issubdtype(values.dtype, np.integer):
+        info = np.iinfo(np.int32)
+        if len(values) == 0 or (info.min <= values.min() and values.max() <= info.max):
+            return 'INT'
+    return 'FLOAT'
+
+
+def star_blocks(file_path) -> dict:
+    """
+    Find the loops of a STAR file without reading their values.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the STAR file.
+
+    Returns
+    -------
+    dict
+        For the loop of each data block, by the name of the block without the
+        `data_` prefix, the names of its `columns`, the byte `offset` of its
+        first row and its number of rows as `n_rows`.
+    """
+    blocks = {}
+    name, columns, offset, n_rows = None, None, 0, 0
+    in_rows = False
+    with open(file_path, 'rb') as f:
+        for line in f:
+            stripped = line.strip()
+            if in_rows:
+                if stripped and not stripped.startswith((b'data_', b'loop_', b'_')):
+                    if not stripped.startswith(b'#'):
+                        n_rows += 1
+                    continue
+                blocks[name] = {"columns": columns, "offset": offset, "n_rows": n_rows}
+                in_rows, columns = False, None
+            if stripped.startswith(b'data_'):
+                name = stripped[5:].decode()
+            elif stripped == b'loop_':
+                columns = []
+            elif columns is not None and stripped.startswith(b'_'):
+                columns.append(stripped.split()[0][1:].decode())
+            elif columns and stripped and not stripped.startswith(b'#'):
+                in_rows = True
+                offset = f.tell() - len(line)
+                n_rows = 1
+        if in_rows:
+            blocks[name] = {"columns": columns, "offset": offset, "n_rows": n_rows}
+    return blocks
+
+
+def read_star_loop(file_path, block: dict, columns=None, chunk_size: int = 100_000):
+    """
+    Read the columns of a loop of a STAR file in chunks of rows.
+
+    Only the requested columns are parsed. Each chunk is copied into arrays that
+    hold the whole column, and string columns are factorized as they are read,
+    so the memory used is about the size of the arrays rather than a DataFrame
+    of Python strings.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the STAR file.
+    block : dict
+        The loop to read, from `star_blocks()`.
+    columns : list of str, optional
+        The columns to read, columns that aren't in the loop are skipped.
+        Defaults to every column.
+    chunk_size : int, optional
+        The number of rows that are parsed at once, defaulting to 100,000.
+
+    Returns
+    -------
+    tuple of (dict, dict)
+        The array of each column, and the sorted categories of each string
+        column, whose arrays hold the index of the category of each row.
+    """
+    import pandas as pd
+
+    names = block["columns"]
+    usecols = names if columns is None else [name for name in names if name in columns]
+    arrays = {}
+    lookups = {}
+    with open(file_path, 'rb') as f:
+        f.seek(block["offset"])
+        reader = pd.read_csv(
+            f, sep=r'\s+', header=None, names=names, usecols=usecols,
+            nrows=block["n_rows"], chunksize=chunk_size, comment='#'
+        )
+        start = 0
+        for chunk in reader:
+            stop = start + len(chunk)
+            for name in usecols:
+                values = chunk[name]
+                if name in lookups or (name not in arrays and not pd.api.types.is_numeric_dtype(values)):
+                    # map the codes of the chunk onto the categories of the whole column
+                    lookup = lookups.setdefault(name, {})
+                    codes, uniques = pd.factorize(values)
+                    mapping = np.array([lookup.setdefault(value, len(lookup)) for value in uniques], dtype=np.int32)
+                    values = mapping[codes]
+                else:
+                    values = values.to_numpy()
+                if name not in arrays:
+                    arrays[name] = np.empty(block["n_rows"], dtype=values.dtype)
+                elif np.result_type(arrays[name], values) != arrays[name].dtype:
+                    # integer columns become floats if a later chunk has decimals
+                    arrays[name] = arrays[name].astype(np.result_type(arrays[name], values))
+                arrays[name][start:stop] = values
+            start = stop
+
+    categories = {}
+    for name, lookup in lookups.items():
+        # sort the categories, so the codes match those of pandas categoricals
+        unsorted = np.array(list(lookup), dtype=object)
+        order = np.argsort(unsorted)
+        rank = np.empty(len(order), dtype=np.int32)
+        rank[order] = np.arange(len(order), dtype=np.int32)
+        arrays[name] = rank[arrays[name]]
+        categories[name] = list(unsorted[order])
+    return arrays, categories
+
+
+def _read_star(file_path):
+    """
+    Read every column of a STAR file with the starfile package, merging the
+    particles of RELION files with their optics groups.
+    """
     import starfile
-    from pandas import DataFrame
-    from eulerangles import ConversionMeta, convert_eulers
+    from pandas.api.types import is_numeric_dtype
     
     star = starfile.read(file_path, always_dict=True)
     
     if list(star.keys()) == [""]:
         star = star[""]
     
-    star_type = None
     # only RELION 3.1 and cisTEM STAR files are currently supported, fail gracefully
     if 'particles' in star and 'optics' in star:
         star_type = 'relion'
+        df = star['particles'].merge(star['optics'], on='rlnOpticsGroup')
     elif "cisTEMAnglePsi" in star:
         star_type = 'cistem'
+        df = star
+    else:
+        raise ValueError(
+        'File is not a valid RELION>=3.1 or cisTEM STAR file, other formats are not currently supported.'
+        )
+
+    columns = {}
+    categories = {}
+    for col in df.columns:
+        if not is_numeric_dtype(df[col]):
+            # convert to a category once, for both the codes and the names
+            cat = df[col].astype('category').cat
+            columns[col] = cat.codes.to_numpy()
+            categories[col] = list(cat.categories)
+        else:
+            columns[col] = df[col].to_numpy()
+    return star_type, columns, categories
+
+
+def _read_star_streamed(file_path, columns=None, exclude=None, chunk_size: int = 100_000):
+    """
+    Read the selected columns of a STAR file in chunks with `read_star_loop()`,
+    along with the columns needed for the positions, rotations and image ids.
+    The optics groups of RELION particles are looked up rather than merged.
+    """
+    blocks = star_blocks(file_path)
+    if 'particles' in blocks and 'optics' in blocks:
+        star_type = 'relion'
+    elif '' in blocks and "cisTEMAnglePsi" in blocks['']["columns"]:
+        star_type = 'cistem'
     else:
         raise ValueError(
         'File is not a valid RELION>=3.1 or cisTEM STAR file, other formats are not currently supported.'
         )
+    names = [name for block in blocks.values() for name in block["columns"]]
+    columns = set(select_columns(names, columns, exclude)).union(required_columns[star_type])
+
+    if star_type == 'cistem':
+        arrays, categories = read_star_loop(file_path, blocks[''], columns, chunk_size)
+        return star_type, arrays, categories
+
+    arrays, categories = read_star_loop(file_path, blocks['particles'], columns, chunk_size)
+    optics, optics_categories = read_star_loop(file_path, blocks['optics'], columns)
+    groups = optics['rlnOpticsGroup']
+    order = np.argsort(groups)
+    index = order[np.searchsorted(groups, arrays['rlnOpticsGroup'], sorter=order)]
+    for name, values in optics.items():
+        if name not in arrays:
+            arrays[name] = values[index]
+            if name in optics_categories:
+                categories[name] = optics_categories[name]
+    return star_type, arrays, categories
+
+
+def image_offsets(image_id: np.ndarray, n_images: int = None) -> np.ndarray:
+    """
+    The offsets of the particles of each image, once they are sorted by image.
+
+    Parameters
+    ----------
+    image_id : np.ndarray
+        The index of the image of each particle.
+    n_images : int, optional
+        The number of images. Defaults to one more than the largest index.
+
+    Returns
+    -------
+    np.ndarray
+        The `n_images + 1` offsets, the particles of image `i` are
+        `offsets[i]:offsets[i + 1]` of the sorted particles.
+    """
+    counts = np.bincount(image_id, minlength=n_images or 0)
+    return np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+
+def image_range_attributes(offsets: np.ndarray, n_points: int):
+    """
+    The `MOLImageStart` and `MOLImageCount` attributes, which hold the start
+    and number of particles of image `i` on point `i`, so the node tree can look
+    up the particles of an image without comparing the image of every point.
+    """
+    n_images = len(offsets) - 1
+    starts = np.zeros(n_points, dtype=np.int32)
+    counts = np.zeros(n_points, dtype=np.int32)
+    starts[:n_images] = offsets[:-1]
+    counts[:n_images] = np.diff(offsets)
+    return starts, counts
+
+
+# the node tree indexes the particles of an object with float math, which is
+# only exact for integers up to 2 ** 24
+max_points_per_object = 2 ** 24
+
+
+def split_images(counts: np.ndarray, images_per_object: int = None,
+                 max_points: int = max_points_per_object):
+    """
+    The number of images per object that keeps every object within `max_points`
+    particles, so that the node tree can index all of them.
+
+    Parameters
+    ----------
+    counts : np.ndarray
+        The number of particles of each image.
+    images_per_object : int, optional
+        The requested number of images per object, which is halved until every
+        object is small enough. Defaults to keeping the particles in one object
+        if they fit.
+    max_points : int, optional
+        The most particles an object can hold, defaulting to `max_points_per_object`.
+
+    Returns
+    -------
+    int or None
+        The number of images per object, or None to keep every particle in one object.
+    """
+    counts = np.asarray(counts)
+    if images_per_object is None and counts.sum() <= max_points:
+        return None
+    if len(counts) == 0:
+        return images_per_object
+    size = images_per_object or len(counts)
+    while np.add.reduceat(counts, np.arange(0, len(counts), size)).max() > max_points:
+        if size == 1:
+            raise ValueError(f"An image has more than {max_points:,} particles, "
+                             "which the node tree can't index.")
+        size = max(size // 2, 1)
+    if size != images_per_object:
+        warnings.warn(f"Splitting the particles into objects of {size} images, "
+                      f"so that none has more than {max_points:,} particles.")
+    return size
+
+
+def _add_star_points(name, collection, xyz, attributes, rows, offsets):
+    """
+    Create an object for a range of the sorted particles, with their attributes
+    and the ranges of the images they belong to.
+    """
+    obj = create_object(name, collection, xyz[rows])
+    for att_name, (values, att_type) in attributes.items():
+        add_attribute(obj, att_name, values[rows], att_type, 'POINT')
+    starts, counts = image_range_attributes(offsets - offsets[0], len(obj.data.vertices))
+    add_attribute(obj, 'MOLImageStart', starts, 'INT', 'POINT')
+    add_attribute(obj, 'MOLImageCount', counts, 'INT', 'POINT')
+    return obj
+
+
+def load_star_file(
+    file_path, 
+    obj_name = 'NewStarInstances', 
+    node_tree = True,
+    world_scale =  0.01,
+    stream = False,
+    chunk_size = 100_000,
+    columns = None,
+    exclude = None,
+    images_per_object = None,
+    rotation_layouts = ()
+    ):
+    """
+    Load the particles of a RELION>=3.1 or cisTEM STAR file as points, with
+    their rotations, image ids and the columns of the file as attributes.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the STAR file.
+    obj_name : str, optional
+        The name of the created object, defaulting to 'NewStarInstances'.
+    node_tree : bool, optional
+        Whether to create the starting node tree, defaulting to True.
+    world_scale : float, optional
+        The scale of the points in the world, defaulting to 0.01.
+    stream : bool, optional
+        Read the file in chunks of rows with `read_star_loop()` instead of
+        reading it whole with the starfile package, which uses much less
+        memory for particle stacks with millions of rows. Defaults to False.
+    chunk_size : int, optional
+        The number of rows that are parsed at once when streaming, defaulting to 100,000.
+    columns : list of str or str, optional
+        The columns to add as attributes, or the name of one of the
+        `column_presets`, such as 'minimal' for only the positions, rotations
+        and image ids. When streaming, other columns aren't parsed unless they
+        are needed for the positions or rotations. Defaults to every column.
+    exclude : list of str, optional
+        Columns to leave out of the attributes. Defaults to none.
+    images_per_object : int, optional
+        Split the particles into objects of this many images each, in a hidden
+        collection, and return an empty object whose node tree shows one image
+        at a time from them. Defaults to keeping every particle in one object.
+        Either way, the particles are split so that no object has more than
+        `max_points_per_object` particles, see `split_images()`.
+    rotation_layouts : iterable of str, optional
+        Extra layouts of the rotations to add next to the `MOLRotation` Euler
+        angles, 'quaternion' and / or 'matrix', see `utils.rotation_attributes()`.
+        Defaults to only the Euler angles.
+
+    Returns
+    -------
+    bpy.types.Object
+        The object with a point for every particle, sorted by image. The
+        offsets of the particles of each image are stored as `image_offsets`,
+        and on the points as the `MOLImageStart` and `MOLImageCount` attributes,
+        which the node tree uses to sample only the particles of the image it shows.
+    """
+    from scipy.spatial.transform import Rotation
+    
+    if stream:
+        star_type, data, categories = _read_star_streamed(file_path, columns, exclude, chunk_size)
+    else:
+        star_type, data, categories = _read_star(file_path)
+    n_points = len(next(iter(data.values())))
     
     # Get absolute position and orientations    
     if star_type == 'relion':
-        df = star['particles'].merge(star['optics'], on='rlnOpticsGroup')
-
-        # get necessary info from dataframes
         # Standard cryoEM starfile don't have rlnCoordinateZ. If this column is not present 
         # Set it to "0"
-        if "rlnCoordinateZ" not in df:
-            df['rlnCoordinateZ'] = 0
+        if "rlnCoordinateZ" not in data:
+            data['rlnCoordinateZ'] = np.zeros(n_points)
             
-        xyz = df[['rlnCoordinateX', 'rlnCoordinateY', 'rlnCoordinateZ']].to_numpy()
-        pixel_size = df['rlnImagePixelSize'].to_numpy().reshape((-1, 1))
+        xyz = np.column_stack([data['rlnCoordinateX'], data['rlnCoordinateY'], data['rlnCoordinateZ']])
+        pixel_size = data['rlnImagePixelSize'].reshape((-1, 1))
         xyz = xyz * pixel_size
         shift_column_names = ['rlnOriginXAngst', 'rlnOriginYAngst', 'rlnOriginZAngst']
-        if all([col in df.columns for col in shift_column_names]):
-            shifts_ang = df[shift_column_names].to_numpy()
+        if all([col in data for col in shift_column_names]):
+            shifts_ang = np.column_stack([data[col] for col in shift_column_names])
             xyz = xyz - shifts_ang 
-        euler_angles = df[['rlnAngleRot', 'rlnAngleTilt', 'rlnAnglePsi']].to_numpy()
-        image_id = df['rlnMicrographName'].astype('category').cat.codes.to_numpy()
+        euler_angles = np.column_stack([data['rlnAngleRot'], data['rlnAngleTilt'], data['rlnAnglePsi']])
+        image_id = data['rlnMicrographName']
         
     elif star_type == 'cistem':
-        if isinstance(star, DataFrame):
-            df = star
-        else:
-            df = star
-        df['cisTEMZFromDefocus'] = (df['cisTEMDefocus1'] + df['cisTEMDefocus2']) / 2
-        df['cisTEMZFromDefocus'] = df['cisTEMZFromDefocus'] - df['cisTEMZFromDefocus'].median()
-        xyz = df[['cisTEMOriginalXPosition', 'cisTEMOriginalYPosition', 'cisTEMZFromDefocus']].to_numpy()
-        euler_angles = df[['cisTEMAnglePhi', 'cisTEMAngleTheta', 'cisTEMAnglePsi']].to_numpy()
-        image_id = df['cisTEMOriginalImageFilename'].astype('category').cat.codes.to_numpy()
-
-    # coerce starfile Euler angles to Blender convention
-    
-    target_metadata = ConversionMeta(name='output', 
-                                    axes='xyz', 
-                                    intrinsic=False,
-                                    right_handed_rotation=True,
-                                    active=True)
-    eulers = np.deg2rad(convert_eulers(euler_angles, 
-                               source_meta='relion', 
-                               target_meta=target_metadata))
-
-    obj = create_object(obj_name, coll.mn(), xyz * world_scale)
-
-    # create the attribute and add the data for the rotations
-    add_attribute(obj, 'MOLRotation', eulers, 'FLOAT_VECTOR', 'POINT')
-
-    # create the attribute and add the data for the image id
-    add_attribute(obj, 'MOLIMageId', image_id, 'INT', 'POINT')
-    
-    # create attribute for every column in the STAR file
-    for col in df.columns:
-        col_type = df[col].dtype    
-        # If col_type is numeric directly add
-        if np.issubdtype(col_type, np.number):
-            add_attribute(obj, col, df[col].to_numpy().reshape(-1), 'FLOAT', 'POINT')
-        
-        # If col_type is object, convert to category and add integer values
-        elif col_type == object:
-            codes = df[col].astype('category').cat.codes.to_numpy().reshape(-1)
-            add_attribute(obj, col, codes, 'INT', 'POINT')
+        z_from_defocus = (data['cisTEMDefocus1'] + data['cisTEMDefocus2']) / 2
+        data['cisTEMZFromDefocus'] = z_from_defocus - np.median(z_from_defocus)
+        xyz = np.column_stack([
+            data['cisTEMOriginalXPosition'], data['cisTEMOriginalYPosition'], data['cisTEMZFromDefocus']
+        ])
+        euler_angles = np.column_stack([data['cisTEMAnglePhi'], data['cisTEMAngleTheta'], data['cisTEMAnglePsi']])
+        image_id = data['cisTEMOriginalImageFilename']
+
+    # the STAR Euler angles are intrinsic ZYZ rotations of the reference onto
+    # the particle image, the inverse rotates the reference into place. All of
+    # the particles are converted at once, through the rotation rather than
+    # from Euler to Euler, so there is no loss of precision near gimbal lock
+    rotation = Rotation.from_euler('ZYZ', np.deg2rad(euler_angles)).inv()
+
+    # the attributes of the points, in the order they are added to the object
+    attributes = rotation_attributes(rotation, 'MOLRotation', rotation_layouts)
+    attributes['MOLImageId'] = (image_id, 'INT')
+    # create attribute for every selected column in the STAR file
+    for col in select_columns(list(data), columns, exclude):
+        # string columns are stored as the index of their category
+        attributes[col] = (data[col], attribute_type(data[col], col in categories))
+
+    # sort the particles by image, so the particles of each image are contiguous
+    order = np.argsort(image_id, kind='stable')
+    xyz = xyz[order] * world_scale
+    attributes = {name: (values[order], att_type) for name, (values, att_type) in attributes.items()}
+    offsets = image_offsets(image_id)
+    images_per_object = split_images(np.diff(offsets), images_per_object)
+
+    if images_per_object is None:
+        obj = _add_star_points(obj_name, coll.mn(), xyz, attributes, slice(None), offsets)
+    else:
+        obj = create_object(obj_name, coll.mn(), np.zeros((0, 3)))
+        # the objects of the images are hidden, the node tree of obj shows them
+        collection = coll.frames(obj_name, parent=coll.data(), suffix="_images")
+        for i, first in enumerate(range(0, len(offsets) - 1, images_per_object)):
+            last = min(first + images_per_object, len(offsets) - 1)
+            _add_star_points(
+                f"{obj_name}_{i:05d}", collection, xyz,
+                attributes, slice(offsets[first], offsets[last]), offsets[first:last + 1]
+            )
+        obj['image_collection'] = collection.name
+        obj['images_per_object'] = images_per_object
+    obj['image_offsets'] = offsets.tolist()
+
+    for col in attributes:
+        if col in categories:
             # Add the category names as a property to the blender object
-            obj[col + '_categories'] = list(df[col].astype('category').cat.categories)
+            obj[col + '_categories'] = categories[col]
     
     if node_tree:
         nodes.create_starting_nodes_starfile(obj)
@@ -123,6 +556,11 @@ def load_star_file(
     return obj
 
 
+def _split_columns(text: str) -> list:
+    # column names typed in the panel, separated by commas or spaces
+    return [name for name in text.replace(',', ' ').split() if name]
+
+
 def panel(layout_function, scene):
     col_main = layout_function.column(heading = "", align = False)
     col_main.label(text = "Import Star File")
@@ -138,6 +576,32 @@ def panel(layout_function, scene):
         emboss = True
     )
     row_import.operator('mn.import_star_file', text = 'Load', icon = 'FILE_TICK')
+    row_options = col_main.row()
+    row_options.prop(
+        bpy.context.scene, 'MN_import_star_stream', 
+        text = 'Stream Large Files'
+    )
+    row_options.prop(
+        bpy.context.scene, 'MN_import_star_images_per_object', 
+        text = 'Images per Object'
+    )
+    col_main.prop(
+        bpy.context.scene, 'MN_import_star_minimal', 
+        text = 'Minimal (Positions, Rotations and Images Only)'
+    )
+    col_main.row().prop(
+        bpy.context.scene, 'MN_import_star_rotations'
+    )
+    row_columns = col_main.row()
+    row_columns.enabled = not bpy.context.scene.MN_import_star_minimal
+    row_columns.prop(
+        bpy.context.scene, 'MN_import_star_include', 
+        text = 'Include'
+    )
+    row_columns.prop(
+        bpy.context.scene, 'MN_import_star_exclude', 
+        text = 'Exclude'
+    )
 
 
 
@@ -152,9 +616,19 @@ class MN_OT_Import_Star_File(bpy.types.Operator):
         return True
 
     def execute(self, context):
+        scene = bpy.context.scene
+        if scene.MN_import_star_minimal:
+            columns = 'minimal'
+        else:
+            columns = _split_columns(scene.MN_import_star_include) or None
         load_star_file(
             file_path = bpy.context.scene.MN_import_star_file_path, 
             obj_name = bpy.context.scene.MN_import_star_file_name, 
-            node_tree = True
+            node_tree = True,
+            stream = bpy.context.scene.MN_import_star_stream,
+            columns = columns,
+            exclude = _split_columns(scene.MN_import_star_exclude),
+            images_per_object = bpy.context.scene.MN_import_star_images_per_object or None,
+            rotation_layouts = scene.MN_import_star_rotations
         )
         return {"FINISHED"}
\ No newline at end of file
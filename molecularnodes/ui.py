@@ -25,6 +25,9 @@ def panel_rcsb(layout_function, ):
     row_import.prop(bpy.context.scene, 'MN_pdb_code', text='PDB ID')
     row_import.operator('mn.import_protein_rcsb', text='Download', icon='IMPORT')
     col_main.prop(bpy.context.scene, 'MN_import_build_assembly')
+    row_rotations = col_main.row()
+    row_rotations.enabled = bpy.context.scene.MN_import_build_assembly
+    row_rotations.prop(bpy.context.scene, 'MN_import_assembly_rotations')
 
 def panel_local(layout_function, ):
     col_main = layout_function.column(heading = '', align = False)
@@ -274,7 +277,8 @@ class MN_OT_Assembly_Bio(bpy.types.Operator):
         transforms_array = assembly.mesh.get_transforms_from_dict(obj['biological_assemblies'])
         data_object = assembly.mesh.create_data_object(
             transforms_array = transforms_array, 
-            name = f"data_assembly_{obj.name}"
+            name = f"data_assembly_{obj.name}",
+            rotation_layouts = context.scene.MN_import_assembly_rotations
         )
         
         node_assembly = nodes.create_assembly_node_tree(
@@ -1,6 +1,7 @@
 import bpy
 import traceback
 import os
+import warnings
 import zipfile
 from .pref import ADDON_DIR
 from bpy.app.translations import pgettext_tip as tip_
@@ -45,6 +46,58 @@ def lerp(a: np.ndarray, b: np.ndarray, t: float = 0.5) -> np.ndarray:
     return np.add(a, np.multiply(np.subtract(b, a), t))
 
 
+# the extra attribute layouts of rotations, next to the XYZ Euler angles
+rotation_layouts = ('quaternion', 'matrix')
+
+
+def rotation_attributes(rotation, name: str = 'MOLRotation', layouts=()) -> dict:
+    """
+    The attributes of a batch of rotations, converted in one vectorized call
+    for each layout.
+
+    Parameters
+    ----------
+    rotation : scipy.spatial.transform.Rotation
+        The rotations of every point.
+    name : str, optional
+        The name of the Euler attribute, and the prefix of the other layouts.
+        Default is 'MOLRotation'.
+    layouts : iterable of str, optional
+        The extra layouts from `rotation_layouts` to add. 'quaternion' adds
+        `<name>Quaternion` as a FLOAT_COLOR in Blender's (w, x, y, z) order,
+        'matrix' adds the columns of the 3x3 matrix, the rotated axes, as the
+        FLOAT_VECTOR attributes `<name>AxisX`, `<name>AxisY` and `<name>AxisZ`.
+        Default is only the Euler angles.
+
+    Returns
+    -------
+    dict
+        The values and types of the attributes, by name.
+
+    Notes
+    -----
+    The Euler angles are Blender's XYZ convention and lose precision close to
+    gimbal lock, the quaternions and matrices don't, so node trees can use them
+    directly instead of converting the Euler angles back.
+    """
+    unknown = set(layouts) - set(rotation_layouts)
+    if unknown:
+        raise ValueError(f"Unknown rotation layouts {sorted(unknown)}, choose from {rotation_layouts}.")
+
+    # scipy warns about gimbal lock, the other layouts are there for those rotations
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        attributes = {name: (rotation.as_euler('xyz'), 'FLOAT_VECTOR')}
+    if 'quaternion' in layouts:
+        # scipy's quaternions are scalar last (x, y, z, w)
+        attributes[name + 'Quaternion'] = (np.roll(rotation.as_quat(), 1, axis=-1), 'FLOAT_COLOR')
+    if 'matrix' in layouts:
+        matrices = rotation.as_matrix()
+        for i, axis in enumerate('XYZ'):
+            attributes[name + 'Axis' + axis] = (np.ascontiguousarray(matrices[:, :, i]), 'FLOAT_VECTOR')
+    return attributes
+
+
 def _module_filesystem_remove(path_base, module_name):
     # taken from the bpy.ops.preferences.app_template_install() operator source code
     # Remove all Python modules with `module_name` in `base_path`.
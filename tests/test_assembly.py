@@ -8,6 +8,7 @@ import biotite.structure.io.mmtf as biotite_mmtf
 import molecularnodes.assembly.pdb as pdb
 import molecularnodes.assembly.cif as cif
 import molecularnodes.assembly.mmtf as mmtf
+import molecularnodes.assembly.mesh as mesh
 
 
 DATA_DIR = join(dirname(realpath(__file__)), "data")
@@ -80,6 +81,26 @@ def test_get_transformations_cif(assembly_id):
     check_transformations(test_transformations, atoms, ref_assembly)
 
 
+def test_transforms_from_assemblies():
+    from scipy.spatial.transform import Rotation
+
+    cif_file = biotite_cif.PDBxFile.read(join(DATA_DIR, "1f2n.cif"))
+    transformations = cif.CIFAssemblyParser(cif_file).get_transformations("1")
+    transforms = mesh.transforms_from_assemblies(transformations, index = 1)
+
+    # the rotations of every assembly are converted in one batch
+    rotations = np.concatenate([
+        np.repeat(np.array(rotation)[np.newaxis], len(chain_ids), axis=0)
+        for chain_ids, rotation, translation in transformations
+    ])
+    chain_ids = np.concatenate([chain_ids for chain_ids, rotation, translation in transformations])
+    assert np.all(transforms['assembly_id'] == 1)
+    assert np.all(transforms['chain_id'] == chain_ids)
+    assert np.allclose(Rotation.from_euler('xyz', transforms['rotation']).as_matrix(), rotations, atol=1e-6)
+    # the matrices are kept for the rotation layouts, without going through the Euler angles
+    assert np.allclose(transforms['matrix'], rotations)
+
+
 def check_transformations(transformations, atoms, ref_assembly):
     """
     Check if the given transformations applied on the given atoms
@@ -0,0 +1,344 @@
+import os
+import numpy as np
+import pytest
+import mrcfile
+import molecularnodes as mn
+
+
+@pytest.fixture
+def density_file(tmp_path):
+    rng = np.random.default_rng(6)
+    data = rng.uniform(0, 1, size=(12, 8, 10)).astype(np.float32)
+    file = str(tmp_path / "test.mrc")
+    with mrcfile.new(file) as mrc:
+        mrc.set_data(data)
+        mrc.voxel_size = 2.0
+    return file
+
+
+def test_map_chunks(density_file):
+    with mrcfile.mmap(density_file, mode='r') as mrc:
+        # each section is 8 * 10 float32 values
+        chunk_mb = 3 * 8 * 10 * 4 / 1024 ** 2
+        chunks = list(mn.density.map_chunks(mrc.data, chunk_mb=chunk_mb))
+        assert [start for start, _ in chunks] == [0, 3, 6, 9]
+        assert (np.concatenate([chunk for _, chunk in chunks]) == mrc.data).all()
+
+
+@pytest.mark.parametrize("invert", [False, True])
+def test_map_to_grid_chunked(density_file, invert):
+    grid = mn.density.map_to_grid(density_file, invert=invert, chunk_mb=1e-4)
+    data = mrcfile.read(density_file)
+    if invert:
+        data = data.max() - data
+
+    array = np.zeros(data.shape, dtype=np.float32)
+    grid.copyToArray(array)
+    assert np.allclose(array, data)
+
+
+@pytest.mark.parametrize("auto_threshold", [False, True])
+def test_mrc_to_grids_passes(density_file, monkeypatch, auto_threshold):
+    # the maximum to invert from comes from the header or the background pass
+    passes = []
+    map_chunks = mn.map_convert.map_chunks
+
+    def counted_chunks(data, chunk_mb, **kwargs):
+        passes.append(chunk_mb)
+        return map_chunks(data, chunk_mb, **kwargs)
+
+    monkeypatch.setattr(mn.map_convert, "map_chunks", counted_chunks)
+    with mrcfile.mmap(density_file, mode='r') as mrc:
+        grids = mn.density.mrc_to_grids(mrc, invert=True, chunk_mb=1e-4, auto_threshold=auto_threshold)
+        data = mrc.data.max() - mrc.data
+    assert len(passes) == (2 if auto_threshold else 1)
+
+    array = np.zeros(data.shape, dtype=np.float32)
+    grids[1].copyToArray(array)
+    if not auto_threshold:
+        assert np.allclose(array, data)
+
+
+def test_map_to_vdb_cache(density_file, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    vdb_file = mn.density.map_to_vdb(density_file, cache_dir=cache_dir)
+    assert os.path.dirname(vdb_file) == cache_dir
+    mtime = os.path.getmtime(vdb_file)
+
+    # unchanged parameters reuse the cached file
+    assert mn.density.map_to_vdb(density_file, cache_dir=cache_dir) == vdb_file
+    assert os.path.getmtime(vdb_file) == mtime
+
+    # the world scale is applied to the object, so it doesn't change the file
+    assert mn.density.map_to_vdb(density_file, world_scale=0.1, cache_dir=cache_dir) == vdb_file
+
+    # changed parameters are converted again
+    assert mn.density.map_to_vdb(density_file, invert=True, cache_dir=cache_dir) != vdb_file
+    assert len(mn.density.VDBCache(cache_dir).entries) == 2
+
+    # without a size limit, conversions never remove other files of the cache
+    os.utime(density_file)
+    mn.density.map_to_vdb(density_file, cache_dir=cache_dir)
+    assert os.path.exists(vdb_file)
+
+
+def test_vdb_cache_get(tmp_path):
+    cache = mn.density.VDBCache(str(tmp_path))
+    source = tmp_path / "source.mrc"
+    source.write_bytes(b"0")
+    file = tmp_path / "cached.vdb"
+    file.write_bytes(b"0")
+    cache.put("key", [str(file)], source=str(source))
+    mtime = os.stat(cache.path).st_mtime_ns
+
+    # using an entry only marks it in memory, until the manifest is flushed
+    last_used = cache.entries["key"]["last_used"]
+    assert cache.get("key") is not None
+    assert os.stat(cache.path).st_mtime_ns == mtime
+    cache.flush()
+    assert mn.density.VDBCache(str(tmp_path)).entries["key"]["last_used"] >= last_used
+    assert not cache.modified
+
+
+def test_vdb_cache_prune(tmp_path):
+    cache = mn.density.VDBCache(str(tmp_path))
+    for i in range(3):
+        source = tmp_path / f"source_{i}.mrc"
+        source.write_bytes(b"0")
+        file = tmp_path / f"cached_{i}.vdb"
+        file.write_bytes(b"0" * 1024 ** 2)
+        cache.put(f"key_{i}", [str(file)], source=str(source))
+        cache.entries[f"key_{i}"]["last_used"] = i
+
+    # a modified source makes the entry stale
+    (tmp_path / "source_2.mrc").write_bytes(b"00")
+    assert cache.prune() == 1024 ** 2
+    assert set(cache.entries) == {"key_0", "key_1"}
+
+    # the least recently used entry is removed first
+    assert cache.prune(max_mb=1) == 1024 ** 2
+    assert set(mn.density.VDBCache(str(tmp_path)).entries) == {"key_1"}
+    assert not (tmp_path / "cached_0.vdb").exists()
+
+
+@pytest.fixture
+def sparse_density_file(tmp_path):
+    rng = np.random.default_rng(6)
+    data = rng.normal(0, 0.01, size=(20, 20, 20)).astype(np.float32)
+    data[5:10, 5:10, 5:10] += 1
+    file = str(tmp_path / "sparse.mrc")
+    with mrcfile.new(file) as mrc:
+        mrc.set_data(data)
+    return file
+
+
+def test_auto_background(sparse_density_file):
+    with mrcfile.mmap(sparse_density_file, mode='r') as mrc:
+        background, tolerance = mn.density.auto_background(mrc.data, chunk_mb=1e-3)
+        assert abs(background) < 0.05
+        assert 0.01 < tolerance < 1
+
+        background, _ = mn.density.auto_background(mrc.data, invert=True)
+        assert abs(background - mrc.data.max()) < 0.05
+
+
+@pytest.mark.parametrize("background, tolerance, expected", [
+    (0, 0.5, (0, 0)),
+    (0.5, 0.5, (0, 1)),
+    (10, 2.7, (10, 2)),
+    (1.2, 0.1, (1, 0)),
+    (-3.5, 1.5, (-4, 2)),
+])
+def test_integer_threshold(background, tolerance, expected):
+    assert mn.density.integer_threshold(background, tolerance) == expected
+    # every integer within the tolerance stays inactive
+    lowest, highest = np.ceil(background - tolerance), np.floor(background + tolerance)
+    background, tolerance = expected
+    assert background - tolerance <= lowest and highest <= background + tolerance
+
+
+def test_map_to_vdb_sparse(sparse_density_file, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    dense_file = mn.density.map_to_vdb(sparse_density_file, cache_dir=cache_dir)
+    sparse_file = mn.density.map_to_vdb(sparse_density_file, cache_dir=cache_dir, auto_threshold=True)
+
+    cache = mn.density.VDBCache(cache_dir)
+    dense, sparse = cache.find(dense_file), cache.find(sparse_file)
+    assert dense["active_voxels"] == dense["dense_voxels"] == 20 ** 3
+    assert sparse["active_voxels"] == 5 ** 3
+    assert sparse["nbytes"] < dense["nbytes"]
+    assert "125 of 8,000" in mn.density.conversion_report(sparse)
+
+
+def test_block_mean():
+    volume = np.arange(5 * 4 * 6, dtype=np.float32).reshape(5, 4, 6)
+    binned = mn.density.block_mean(volume, 2)
+    assert binned.shape == (3, 2, 3)
+    assert binned[0, 0, 0] == volume[:2, :2, :2].mean()
+    # edge blocks are averaged over the voxels they contain
+    assert binned[2, 1, 2] == volume[4:, 2:, 4:].mean()
+
+
+def test_map_to_vdb_pyramid(density_file, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    vdb_file = mn.density.map_to_vdb(density_file, cache_dir=cache_dir, pyramid=(2, 4))
+    entry = mn.density.VDBCache(cache_dir).find(vdb_file)
+    assert len(entry["files"]) == 3
+    assert os.path.exists(mn.density.pyramid_path(vdb_file, 4))
+
+    with mrcfile.mmap(density_file, mode='r') as mrc:
+        grids = mn.density.mrc_to_grids(mrc, chunk_mb=1e-4, pyramid=(2,))
+        expected = mn.density.block_mean(mrc.data, 2)
+    array = np.zeros(expected.shape, dtype=np.float32)
+    grids[2].copyToArray(array)
+    assert np.allclose(array, expected)
+
+
+def test_marching_tetrahedra_sphere():
+    n = 30
+    centre = (n - 1) / 2
+    volume = 8 - np.linalg.norm(np.indices((n, n, n)) - centre, axis=0)
+    vertices, faces = mn.density.marching_tetrahedra(volume, 0, chunk_mb=0.02)
+
+    radii = np.linalg.norm(vertices - centre, axis=1)
+    assert np.allclose(radii, 8, atol=0.1)
+
+    # the surface is closed, with every edge shared by two triangles
+    edges = np.sort(np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]]), axis=1)
+    _, counts = np.unique(edges, axis=0, return_counts=True)
+    assert (counts == 2).all()
+
+    # and the normals point outwards
+    triangles = vertices[faces]
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    assert ((normals * (triangles.mean(axis=1) - centre)).sum(axis=1) > 0).all()
+
+
+def test_map_to_mesh_cache(sparse_density_file, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    mesh_file = mn.density.map_to_mesh(sparse_density_file, 0.5, cache_dir=cache_dir)
+    assert mn.density.map_to_mesh(sparse_density_file, 0.5, cache_dir=cache_dir) == mesh_file
+    binned_file = mn.density.map_to_mesh(sparse_density_file, 0.5, resolution=2, cache_dir=cache_dir)
+    assert binned_file != mesh_file
+
+    with np.load(mesh_file) as mesh:
+        assert len(mesh["faces"]) > 0
+        # the cube of density spans voxels 5 to 9, rotated like the .vdb grid
+        assert np.allclose(mesh["vertices"].min(axis=0), [4.5, 4.5, -9.5], atol=0.1)
+
+
+def test_convert_maps(density_file, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    other_file = str(tmp_path / "other.mrc")
+    with mrcfile.new(other_file) as mrc:
+        mrc.set_data(np.ones((4, 5, 6), dtype=np.float32))
+    assert mn.density.find_maps(str(tmp_path)) == sorted([density_file, other_file])
+    assert mn.density.find_maps(str(tmp_path / "oth*.mrc")) == [other_file]
+
+    progress = []
+    vdb_files = mn.density.convert_maps(
+        str(tmp_path), max_workers=2, cache_dir=cache_dir,
+        progress=lambda file, done, total: progress.append((done, total))
+    )
+    assert sorted(vdb_files) == sorted([density_file, other_file])
+    assert sorted(progress) == [(1, 2), (2, 2)]
+    assert all(os.path.exists(file) for file in vdb_files.values())
+
+    # the batch shares the cache with single conversions
+    cache = mn.density.VDBCache(cache_dir)
+    assert cache.find(vdb_files[other_file])["active_voxels"] == 4 * 5 * 6
+    assert mn.density.map_to_vdb(density_file, cache_dir=cache_dir) == vdb_files[density_file]
+
+    # cached maps aren't submitted again
+    conversion = mn.density.MapConversion(str(tmp_path), cache_dir=cache_dir)
+    assert conversion.done == conversion.total == 2
+    assert conversion.wait() == vdb_files
+
+
+def test_convert_maps_cancel(density_file, tmp_path):
+    vdb_files = mn.density.convert_maps(density_file, cache_dir=str(tmp_path), cancel=lambda: True)
+    assert vdb_files == {}
+    assert mn.density.VDBCache(str(tmp_path)).entries == {}
+
+
+def test_map_series(tmp_path):
+    for i in [1, 2, 10]:
+        with mrcfile.new(str(tmp_path / f"frame_{i}.mrc")) as mrc:
+            mrc.set_data(np.full((4, 5, 6), i, dtype=np.float32))
+    series = mn.density.MapSeries(str(tmp_path / "frame_*.mrc"), window=1, max_workers=1)
+    # numbered frames are in order of their number
+    assert [os.path.basename(file) for file in series.files] == ["frame_1.mrc", "frame_2.mrc", "frame_10.mrc"]
+
+    # frames are converted when they are asked for, and clamped to the series
+    assert series.frame_file(0, wait=False) is None
+    last = series.frame_file(5)
+    assert last == series.frame_file(2)
+    assert mn.density.VDBCache(str(tmp_path)).find(last)["source"] == os.path.abspath(series.files[2])
+    series.close()
+
+
+def test_map_series_cache_mb(tmp_path):
+    for i in range(4):
+        with mrcfile.new(str(tmp_path / f"frame_{i}.mrc")) as mrc:
+            mrc.set_data(np.full((4, 5, 6), i, dtype=np.float32))
+    series = mn.density.MapSeries(str(tmp_path / "frame_*.mrc"), window=1, max_workers=1, cache_mb=1e-6)
+    # the batch of a series never finishes, the limit is kept as frames are converted
+    files = [series.frame_file(i) for i in range(4)]
+    assert [os.path.exists(file) for file in files] == [False, False, False, True]
+    assert list(series.conversion.results) == [series.files[3]]
+    # frames that were removed are converted again
+    assert os.path.exists(series.frame_file(0))
+    series.close()
+
+
+def test_sample_map(tmp_path):
+    # a map that is linear in x, y and z is interpolated exactly
+    z, y, x = np.mgrid[0:6, 0:7, 0:8].astype(np.float32)
+    file = str(tmp_path / "linear.mrc")
+    with mrcfile.new(file) as mrc:
+        mrc.set_data(x + 10 * y + 100 * z)
+        mrc.voxel_size = 2.0
+        mrc.header.origin = (10, 20, 30)
+
+    rng = np.random.default_rng(3)
+    index = rng.uniform(0, 1, size=(100, 3)) * [7, 6, 5]
+    positions = np.concatenate([index * 2 + [10, 20, 30], [[0, 0, 0], [24, 32, 40]]])
+    with mrcfile.mmap(file, mode='r') as mrc:
+        origin, voxel_size = mn.density.map_origin(mrc)
+        values = mn.density.sample_map(mrc.data, positions, origin, voxel_size, fill=-1, chunk_size=16)
+
+    expected = index[:, 0] + 10 * index[:, 1] + 100 * index[:, 2]
+    assert np.allclose(values[:100], expected, atol=1e-3)
+    # outside of the map, and the corner voxel at the edge of the map
+    assert values[100] == -1
+    assert values[101] == pytest.approx(7 + 60 + 500)
+
+
+def test_map_statistics(sparse_density_file):
+    with mrcfile.mmap(sparse_density_file, mode='r') as mrc:
+        data = np.array(mrc.data, dtype=np.float64)
+        statistics = mn.density.map_statistics(
+            mrc.data, chunk_mb=1e-3, value_range=mn.density.header_range(mrc), voxel_volume=8
+        )
+        # without a range from the header, the bins widen to cover every slab
+        streamed = mn.density.map_statistics(mrc.data, chunk_mb=1e-3)
+        assert sum(streamed["counts"]) == data.size
+        assert streamed["edges"][0] <= data.min() and streamed["edges"][-1] >= data.max()
+        assert streamed["edges"][-1] - streamed["edges"][0] <= 2 * (data.max() - data.min())
+        assert streamed["std"] == pytest.approx(data.std())
+        inverted = mn.density.map_statistics(mrc.data, invert=True, value_range=mn.density.header_range(mrc))
+
+    assert statistics["min"] == pytest.approx(data.min())
+    assert statistics["max"] == pytest.approx(data.max())
+    assert statistics["mean"] == pytest.approx(data.mean())
+    assert statistics["std"] == pytest.approx(data.std())
+    assert sum(statistics["counts"]) == data.size
+    assert statistics["enclosed_volume"][0] == data.size * 8
+    assert inverted["mean"] == pytest.approx(data.max() - data.mean())
+    assert inverted["counts"] == statistics["counts"][::-1]
+
+    # the cube of 5 ** 3 voxels stands out from the noise
+    threshold = mn.density.initial_threshold(statistics, sigma=3)
+    assert 0.05 < threshold < 0.95
+    threshold = mn.density.initial_threshold(statistics, enclosed_volume=5 ** 3 * 8)
+    assert 0.05 < threshold < 0.95
@@ -1,5 +1,6 @@
 import bpy
 import os
+import json
 import pytest
 import molecularnodes as mn
 from . import utils
@@ -216,6 +217,257 @@ class TestMDA:
 
         assert verts_frame_0 != verts_frame_1
 
+    def test_manifest_without_topology(self, mda_session):
+        # universes built in memory have no file to open again
+        universe = mda.Universe.empty(10, trajectory=True)
+        assert mda_session._universe_manifest(universe)["topology"] is None
+
+    def test_manifest_memory_changed(self, mda_session):
+        import gc
+        universe = mda.Universe.empty(10, trajectory=True)
+        first = mda_session._universe_manifest(universe)["memory"]
+        # unchanged coordinates aren't written again
+        assert mda_session._universe_manifest(universe)["memory"] == first
+        universe.atoms.positions = np.ones((10, 3))
+        second = mda_session._universe_manifest(universe)["memory"]
+        assert second != first
+        assert (np.load(second)[0] == 1).all()
+
+        # the files of universes that were garbage collected aren't reused
+        n_files = len(mda_session._memory_files)
+        del universe
+        gc.collect()
+        assert len(mda_session._memory_files) == n_files - 1
+
+    def test_manifest_updating_base_group(self, mda_session, universe):
+        remove_all_molecule_objects(mda_session)
+        base = universe.atoms[:200]
+        updating_ag = base.select_atoms("around 5 resid 1", updating=True)
+        mol = mda_session.show(updating_ag, name="updating")
+
+        mda_session._dump()
+        session = mn.mda.MDAnalysisSession._from_manifest(mda_session._manifest_path())
+        session._load_rep(mol.name)
+        ag = session.atom_reps[mol.name].ag
+        assert np.array_equal(ag._base_group.ix, base.ix)
+        universe.trajectory[0]
+        assert np.array_equal(ag.ix, updating_ag.ix)
+
+    def test_updating_atoms_gathered_attributes(self, universe):
+        updating_ag = universe.select_atoms("around 5 resid 1", updating=True)
+        ag_rep = mn.mda.AtomGroupInBlender(updating_ag)
+        assert ag_rep.is_updating
+
+        for frame in range(3):
+            universe.trajectory[frame]
+            gathered = ag_rep._gather_attributes(updating_ag.ix)
+            for att_name in ["res_id", "atomic_number", "vdw_radii", "is_backbone", "is_solvent"]:
+                assert np.array_equal(
+                    gathered[att_name]["value"],
+                    ag_rep._attributes_2_blender[att_name]["value"]
+                )
+        universe.trajectory[0]
+
+    def test_updating_atoms_mesh(self, mda_session):
+        from MDAnalysis.coordinates.memory import MemoryReader
+
+        remove_all_molecule_objects(mda_session)
+        universe = mda.Universe(test_data_directory / "md_ppr/box.gro")
+        first, last = [0, 1, 2], list(universe.atoms.ix[-3:])
+        members = [first, first, last, [3] + last]
+        coordinates = np.full((len(members), universe.atoms.n_atoms, 3), 10, dtype=np.float32)
+        for frame, ix in enumerate(members):
+            coordinates[frame, ix, 0] = -1 - frame
+        universe.load_new(coordinates, format=MemoryReader)
+        mol = mda_session.show(universe.select_atoms("prop x < 0", updating=True), name="updating")
+
+        def update(frame):
+            bpy.context.scene.frame_set(frame)
+            universe.trajectory[frame]
+            ix = members[frame]
+            assert np.allclose(
+                mn.obj.get_attribute(mol, "position"),
+                universe.atoms[ix].positions * mda_session.world_scale
+            )
+            assert (mn.obj.get_attribute(mol, "res_id") == universe.atoms[ix].resnums).all()
+
+        # geometry is only rebuilt when the number of atoms changes, which
+        # clears attributes that aren't gathered, like the marker
+        update(0)
+        mn.obj.add_attribute(mol, "marker", np.ones(3))
+        # the same atoms only move
+        update(1)
+        assert "marker" in mol.data.attributes
+        # other atoms, with their attributes gathered into the same mesh
+        update(2)
+        assert "marker" in mol.data.attributes
+        # a different number of atoms resizes the mesh
+        update(3)
+        assert len(mol.data.vertices) == 4
+        assert "marker" not in mol.data.attributes
+        bpy.context.scene.frame_set(0)
+
+    def test_show_packed(self, mda_session, universe):
+        remove_all_molecule_objects(mda_session)
+        n_collections = len(bpy.data.collections)
+        mol = mda_session.show(universe, in_memory=True, packed=True)
+
+        # no collection or objects are created for the frames
+        assert len(bpy.data.collections) == n_collections
+        assert mda_session.universe_reps[mol.name]["bake"].n_frames == universe.trajectory.n_frames
+
+        bpy.context.scene.frame_set(2)
+        universe.trajectory[2]
+        verts = mn.obj.get_attribute(mol, 'position')
+        assert np.isclose(verts, universe.atoms.positions * mda_session.world_scale).all()
+
+    def test_update_timings(self, mda_session, universe, tmp_path):
+        remove_all_molecule_objects(mda_session)
+        mda_session.timings.clear()
+        mda_session.show(universe, subframes=1)
+
+        trace = str(tmp_path / "trace.csv")
+        mda_session.timings.start_trace(trace)
+        for frame in range(4):
+            bpy.context.scene.frame_set(frame)
+        assert mda_session.timings.stop_trace() == trace
+
+        summary = mda_session.timings.summary()
+        assert set(summary["atoms"].keys()) == set(mn.mda.UpdateTimings.stages)
+        for timing in summary["atoms"].values():
+            assert timing["p50"] <= timing["p95"] <= timing["max"]
+        with open(trace) as f:
+            assert len(f.readlines()) == 5
+
+    def test_packed_update_timings(self, mda_session, universe):
+        # the frame updates of a packed representation never seek the trajectory
+        remove_all_molecule_objects(mda_session)
+        streamed = mda_session.show(universe, name="streamed", subframes=1)
+        packed = mda_session.show(universe, name="packed", in_memory=True, packed=True, subframes=1)
+        mda_session.timings.clear()
+        for frame in range(1, 6):
+            bpy.context.scene.frame_set(frame)
+
+        summary = mda_session.timings.summary()
+        assert summary[packed.name]["seek"]["max"] == 0
+        assert summary[streamed.name]["seek"]["max"] > 0
+
+    @pytest.mark.parametrize("quantize", [False, True])
+    def test_bake_playback(self, mda_session, universe, quantize):
+        remove_all_molecule_objects(mda_session)
+        mol = mda_session.show(universe)
+        bpy.context.scene.frame_set(3)
+        verts_a = mn.obj.get_attribute(mol, 'position')
+
+        bakes = mda_session.bake(start=1, quantize=quantize)
+        bake = bakes["atoms"]
+        assert 0 not in bake
+        assert 4 in bake
+
+        bpy.context.scene.frame_set(0)
+        bpy.context.scene.frame_set(3)
+        verts_b = mn.obj.get_attribute(mol, 'position')
+        tolerance = bake.max_error * mda_session.world_scale + 1e-6
+        assert np.abs(verts_a - verts_b).max() <= tolerance
+
+    def test_show_frame_window(self, mda_session, universe):
+        remove_all_molecule_objects(mda_session)
+        mol = mda_session.show(universe, start=np.int64(1), step=2, subframes=1)
+        frame_index = mda_session.universe_reps[mol.name]["frame_index"]
+        assert (frame_index["frame_a"] == [1, 1, 3, 3]).all()
+        # the window is written to the session manifest
+        assert json.dumps(mda_session.universe_reps[mol.name]["frame_window"]) == "[1, null, 2]"
+
+        bpy.context.scene.frame_set(2)
+        verts = mn.obj.get_attribute(mol, 'position')
+        universe.trajectory[3]
+        assert np.allclose(verts, universe.atoms.positions * mda_session.world_scale, atol=1e-5)
+
+    def test_frame_attributes(self, mda_session, universe):
+        remove_all_molecule_objects(mda_session)
+        calls = []
+
+        def height(ag):
+            calls.append(ag.universe.trajectory.ts.frame)
+            return ag.positions[:, 2]
+
+        mn.mda.register_frame_attribute("height", height)
+        mol = mda_session.show(universe, frame_attributes=["height", "velocities"])
+        bpy.context.scene.frame_set(2)
+        universe.trajectory[2]
+        heights = mn.obj.get_attribute(mol, "height")
+        assert np.allclose(heights, universe.atoms.positions[:, 2], atol=1e-3)
+        # the trajectory has no velocities, so they are left out
+        assert "velocities" not in mol.data.attributes
+
+        # the values are cached with the positions of the frame
+        n_calls = len(calls)
+        bpy.context.scene.frame_set(3)
+        bpy.context.scene.frame_set(2)
+        assert len(calls) == n_calls + 1
+        mn.mda.frame_attribute_readers.pop("height")
+
+    def test_bake_frame_attributes(self, mda_session, universe):
+        remove_all_molecule_objects(mda_session)
+        calls = []
+
+        def height(ag):
+            calls.append(ag.universe.trajectory.ts.frame)
+            return ag.positions[:, 2]
+
+        mn.mda.register_frame_attribute("height", height)
+        mol = mda_session.show(universe, frame_attributes=["height", "velocities"])
+        bake = mda_session.bake(quantize=False)["atoms"]
+        assert bake.attribute_names == ["height", "velocities"]
+        assert list(bake.attributes) == ["height"]
+
+        # baked frames don't call the reader or seek the trajectory
+        n_calls = len(calls)
+        universe.trajectory[0]
+        bpy.context.scene.frame_set(3)
+        assert len(calls) == n_calls
+        assert universe.trajectory.ts.frame == 0
+        universe.trajectory[3]
+        heights = mn.obj.get_attribute(mol, "height")
+        assert np.allclose(heights, universe.atoms.positions[:, 2], atol=1e-3)
+        mn.mda.frame_attribute_readers.pop("height")
+
+    def test_frame_attribute_keys(self, mda_session, universe):
+        remove_all_molecule_objects(mda_session)
+        # readers registered under different names can write the same attribute
+        mn.mda.register_frame_attribute("value:x", lambda ag: ag.positions[:, 0], attribute="value")
+        mn.mda.register_frame_attribute("value:y", lambda ag: ag.positions[:, 1], attribute="value")
+        mol_x = mda_session.show(universe, name="x", frame_attributes=["value:x"])
+        mol_y = mda_session.show(universe, name="y", frame_attributes=["value:y"])
+        bpy.context.scene.frame_set(2)
+        universe.trajectory[2]
+        assert np.allclose(mn.obj.get_attribute(mol_x, "value"), universe.atoms.positions[:, 0], atol=1e-3)
+        assert np.allclose(mn.obj.get_attribute(mol_y, "value"), universe.atoms.positions[:, 1], atol=1e-3)
+        assert "value:x" not in mol_x.data.attributes
+        for key in ["value:x", "value:y"]:
+            mn.mda.frame_attribute_readers.pop(key)
+            mn.mda.frame_attribute_names.pop(key)
+
+    def test_bake_point_cache(self, mda_session, universe, tmp_path):
+        remove_all_molecule_objects(mda_session)
+        mol = mda_session.show(universe, subframes=1)
+        bpy.context.scene.frame_set(3)
+        verts_a = mn.obj.get_attribute(mol, 'position')
+
+        paths = mda_session.bake_point_cache(directory=str(tmp_path), chunk_size=3)
+        assert mol.modifiers[0].name == "MN_point_cache"
+        cache = mn.mda.read_point_cache(paths["atoms"])
+        assert cache.shape == (universe.trajectory.n_frames * 2, len(universe.atoms), 3)
+        assert np.allclose(cache[3], verts_a)
+
+        # the handler leaves the point cached object alone
+        mda_session.timings.clear()
+        bpy.context.scene.frame_set(4)
+        assert mda_session.timings.summary() == {}
+
+        mda_session.free_point_cache()
+        assert "MN_point_cache" not in mol.modifiers
+
     @pytest.mark.parametrize("in_memory", [False, True])
     def test_update_deleted_objects(self, snapshot, in_memory, mda_session, universe):
         remove_all_molecule_objects(mda_session)
@@ -242,7 +494,7 @@ class TestMDA:
         # save
         bpy.ops.wm.save_as_mainfile(filepath=str(tmp_path / "test.blend"))
 
-        assert os.path.exists(f"{mda_session.session_tmp_dir}/{mda_session.uuid}.pkl")
+        assert os.path.exists(f"{mda_session.session_tmp_dir}/{mda_session.uuid}.json")
 
         # reload
         remove_all_molecule_objects(mda_session)
@@ -357,6 +609,119 @@ class TestMDA_FrameMapping:
         assert not np.isclose(verts_b, verts_c).all()
         assert np.isclose(verts_c, mn.utils.lerp(verts_a, verts_b, 0.5)).all()
 
+    def test_subframes_frame_cache(self, mda_session, universe):
+        remove_all_molecule_objects(mda_session)
+        mda_session.frame_cache.clear()
+        mda_session.show(universe, subframes=3)
+
+        for frame in range(4):
+            bpy.context.scene.frame_set(frame)
+        # every subframe between the first two frames shares the same pair
+        assert len(mda_session.frame_cache) == 2
+        assert ("atoms", 0) in mda_session.frame_cache
+        assert ("atoms", 1) in mda_session.frame_cache
+
+
+def test_frame_cache_eviction():
+    positions = np.zeros((1024, 3), dtype=np.float32)
+    cache = mn.mda.FrameCache(max_mb=positions.nbytes * 2 / 1024 ** 2)
+    cache.put(("atoms", 0), positions)
+    cache.put(("atoms", 1), positions)
+    # access frame 0 so frame 1 is the least recently used
+    assert cache.get(("atoms", 0)) is positions
+    cache.put(("atoms", 2), positions)
+
+    assert len(cache) == 2
+    assert ("atoms", 1) not in cache
+    assert cache.nbytes <= cache.max_bytes
+
+    cache.discard("atoms")
+    assert len(cache) == 0
+    assert cache.nbytes == 0
+
+@pytest.mark.skipif(not HAS_mda, reason="MDAnalysis is not installed")
+@pytest.mark.parametrize("topology", [
+    "md_ppr/box.gro", "md_ppr/md.tpr", "martini/pent/prot_ion.tpr", "martini/pent/TOPOL2.pdb"
+])
+def test_flags_match_selections(topology):
+    universe = mda.Universe(test_data_directory / topology)
+    selections = {
+        "is_nucleic": "nucleic",
+        "is_peptide": "protein or (name BB SC*)",
+        "is_backbone": "backbone or nucleicbackbone or name BB",
+        "is_alpha_carbon": "name CA or name BB",
+        "is_solvent": "name OW or name HW1 or name HW2 or resname W or resname PW",
+    }
+    ag_rep = mn.mda.AtomGroupInBlender(universe.atoms)
+    flags = ag_rep._flags()
+    for flag, selection in selections.items():
+        assert np.array_equal(
+            flags[flag],
+            mn.mda.AtomGroupInBlender.bool_selection(universe.atoms, selection)
+        )
+
+@pytest.mark.skipif(not HAS_mda, reason="MDAnalysis is not installed")
+def test_guess_elements():
+    names = ["BB", "SC1", "SC2", "GL1", "D2A", "CA", "OW", "BB"]
+    elements = mn.mda.guess_elements(names)
+    assert elements.tolist() == ["BB", "SC", "SC", "GL", "CD", "C", "O", "BB"]
+
+    mn.mda.register_element_rule("OW", "X")
+    try:
+        assert mn.mda.guess_elements(names)[6] == "X"
+    finally:
+        mn.mda.element_rules.clear()
+
+def test_quantize_positions_error_bound():
+    rng = np.random.default_rng(6)
+    positions = rng.uniform(-500, 500, size=(10000, 3)).astype(np.float32)
+    quantized, lower, step = mn.mda.quantize_positions(positions)
+    restored = mn.mda.dequantize_positions(quantized, lower, step)
+
+    assert quantized.dtype == np.int16
+    # half a quantization step, plus the float32 precision of the result
+    bound = step / 2 + np.abs(positions).max() * np.finfo(np.float32).eps
+    assert (np.abs(restored - positions) <= bound).all()
+
+def test_write_point_cache_chunks(tmp_path):
+    rng = np.random.default_rng(6)
+    frames = rng.uniform(-1, 1, size=(7, 20, 3)).astype(np.float32)
+    path = mn.mda.write_point_cache(
+        str(tmp_path / "test.pc2"), iter(frames), n_points=20, n_samples=7, chunk_size=3
+    )
+    assert (mn.mda.read_point_cache(path) == frames).all()
+
+    with pytest.raises(ValueError):
+        mn.mda.write_point_cache(
+            str(tmp_path / "short.pc2"), iter(frames), n_points=20, n_samples=8
+        )
+
+def test_frame_index_table():
+    table = mn.mda.frame_index_table(n_frames=3, subframes=1)
+    assert len(table) == 6
+    assert (table['frame_a'] == [0, 0, 1, 1, 2, 2]).all()
+    # the last frame has nothing to interpolate towards
+    assert (table['frame_b'] == [1, 1, 2, 2, 2, 2]).all()
+    assert np.isclose(table['fraction'], [0, 0.5, 0, 0.5, 0, 0.5]).all()
+
+    table = mn.mda.frame_index_table(n_frames=3, frame_mapping=[0, 0, 1, 5])
+    assert (table['frame_a'] == [0, 0, 1, -1]).all()
+    assert (table['frame_b'] == [0, 1, 1, -1]).all()
+
+    # every subframe of a mapped frame interpolates towards the next mapped frame
+    table = mn.mda.frame_index_table(n_frames=3, frame_mapping=[0, 1, 2], subframes=2)
+    assert (table['frame_b'] == [1, 1, 1, 2, 2, 2, 2, 2, 2]).all()
+    # and an identity mapping is the same as no mapping
+    assert (table == mn.mda.frame_index_table(n_frames=3, subframes=2)).all()
+
+    # the frame mapping indexes into the window of frames
+    table = mn.mda.frame_index_table(n_frames=10, frame_mapping=[0, 2, 1, 3], start=2, step=3)
+    assert (table['frame_a'] == [2, 8, 5, -1]).all()
+
+    table = mn.mda.frame_index_table(n_frames=10, subframes=1, start=2, stop=9, step=3)
+    assert (table['frame_a'] == [2, 2, 5, 5, 8, 8]).all()
+    assert (table['frame_b'] == [5, 5, 8, 8, 8, 8]).all()
+
 @pytest.mark.parametrize("toplogy", ["pent/prot_ion.tpr", "pent/TOPOL2.pdb"])
 def test_martini(snapshot, toplogy):
     session = mn.mda.MDAnalysisSession()
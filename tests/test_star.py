@@ -0,0 +1,162 @@
+import bpy
+import numpy as np
+import pandas as pd
+import pytest
+import starfile
+import molecularnodes as mn
+from .constants import test_data_directory
+
+
+@pytest.fixture
+def relion_file(tmp_path):
+    rng = np.random.default_rng(4)
+    n = 250
+    particles = pd.DataFrame({
+        "rlnCoordinateX": rng.uniform(0, 4000, n),
+        "rlnCoordinateY": rng.uniform(0, 4000, n),
+        "rlnAngleRot": rng.uniform(-180, 180, n),
+        "rlnAngleTilt": rng.uniform(0, 180, n),
+        "rlnAnglePsi": rng.uniform(-180, 180, n),
+        "rlnOriginXAngst": rng.normal(0, 2, n),
+        "rlnOriginYAngst": rng.normal(0, 2, n),
+        "rlnOriginZAngst": np.zeros(n),
+        "rlnClassNumber": rng.integers(1, 4, n),
+        "rlnMicrographName": [f"mics/mic_{i:03d}.mrc" for i in rng.integers(0, 12, n)],
+        "rlnOpticsGroup": rng.integers(1, 3, n),
+    })
+    optics = pd.DataFrame({
+        "rlnOpticsGroup": [2, 1],
+        "rlnOpticsGroupName": ["opticsGroup2", "opticsGroup1"],
+        "rlnImagePixelSize": [1.5, 1.1],
+    })
+    file = tmp_path / "particles.star"
+    starfile.write({"optics": optics, "particles": particles}, file)
+    return file
+
+
+def test_star_blocks(relion_file):
+    blocks = mn.star.star_blocks(relion_file)
+    assert blocks["particles"]["n_rows"] == 250
+    assert blocks["optics"]["n_rows"] == 2
+    assert blocks["optics"]["columns"] == ["rlnOpticsGroup", "rlnOpticsGroupName", "rlnImagePixelSize"]
+
+    blocks = mn.star.star_blocks(test_data_directory / "cistem.star")
+    assert list(blocks) == [""]
+    assert len(blocks[""]["columns"]) == 19
+
+
+@pytest.mark.parametrize("name", ["relion", "cistem"])
+def test_read_star_streamed(relion_file, name):
+    file = relion_file if name == "relion" else test_data_directory / "cistem.star"
+    star_type, data, categories = mn.star._read_star(file)
+    streamed_type, streamed, streamed_categories = mn.star._read_star_streamed(file, chunk_size=7)
+
+    assert star_type == streamed_type == name
+    assert set(streamed) == set(data)
+    assert streamed_categories == categories
+    assert len(categories) > 0
+    for column, values in data.items():
+        assert np.array_equal(streamed[column], values), column
+
+
+def test_read_star_columns(relion_file):
+    _, data, categories = mn.star._read_star_streamed(relion_file, columns=["rlnClassNumber"])
+    # only the requested columns and those needed for the points are parsed
+    assert "rlnClassNumber" in data
+    assert "rlnOpticsGroupName" not in data
+    assert "rlnMicrographName" in categories
+
+
+def test_select_columns(relion_file):
+    names = mn.star.star_blocks(relion_file)["particles"]["columns"]
+    assert mn.star.select_columns(names) == names
+    assert mn.star.select_columns(names, "minimal") == []
+    assert mn.star.select_columns(names, ["rlnClassNumber", "rlnAngleRot", "missing"]) == ["rlnAngleRot", "rlnClassNumber"]
+    assert mn.star.select_columns(names, exclude=["rlnClassNumber"]) == [name for name in names if name != "rlnClassNumber"]
+    with pytest.raises(ValueError):
+        mn.star.select_columns(names, "unknown")
+
+    # the minimal preset only parses the columns needed for the points
+    _, data, _ = mn.star._read_star_streamed(relion_file, columns="minimal")
+    assert set(data) <= set(mn.star.required_columns["relion"])
+    assert "rlnClassNumber" not in data
+
+
+def test_attribute_type(relion_file):
+    _, data, categories = mn.star._read_star_streamed(relion_file)
+    assert mn.star.attribute_type(data["rlnClassNumber"]) == 'INT'
+    assert mn.star.attribute_type(data["rlnAngleRot"]) == 'FLOAT'
+    assert mn.star.attribute_type(data["rlnMicrographName"], "rlnMicrographName" in categories) == 'INT'
+    assert mn.star.attribute_type(np.array([2**40])) == 'FLOAT'
+
+
+def test_image_offsets():
+    image_id = np.array([2, 0, 2, 2, 0, 3])
+    offsets = mn.star.image_offsets(image_id)
+    assert offsets.tolist() == [0, 2, 2, 5, 6]
+    sorted_id = image_id[np.argsort(image_id, kind='stable')]
+    for i in range(4):
+        assert (sorted_id[offsets[i]:offsets[i + 1]] == i).all()
+
+    starts, counts = mn.star.image_range_attributes(offsets, len(image_id))
+    assert starts.tolist() == [0, 2, 2, 5, 0, 0]
+    assert counts.tolist() == [2, 0, 3, 1, 0, 0]
+
+
+@pytest.mark.parametrize("images_per_object", [None, 5])
+def test_load_star_file_images(relion_file, images_per_object):
+    obj = mn.star.load_star_file(relion_file, images_per_object=images_per_object)
+    offsets = np.array(obj["image_offsets"])
+    assert offsets[-1] == 250
+
+    if images_per_object is None:
+        parts = [obj]
+    else:
+        parts = sorted(bpy.data.collections[obj["image_collection"]].objects, key=lambda part: part.name)
+        assert len(parts) == 3
+        assert len(obj.data.vertices) == 0
+    image_id = np.concatenate([mn.obj.get_attribute(part, "MOLImageId") for part in parts])
+    assert (np.diff(image_id) >= 0).all()
+    assert (np.bincount(image_id) == np.diff(offsets)).all()
+
+    # only the particles of the image are created, sampling their columns from the original points
+    node_group = obj.modifiers["MolecularNodes"].node_group
+    assert any(node.bl_idname == "GeometryNodePoints" for node in node_group.nodes)
+    assert not any(node.bl_idname == "GeometryNodeDeleteGeometry" and node.domain == "POINT" for node in node_group.nodes)
+    stored = [
+        node.inputs["Name"].default_value for node in node_group.nodes
+        if node.bl_idname == "GeometryNodeStoreNamedAttribute"
+    ]
+    assert "rlnClassNumber" in stored
+    assert "MOLRotation" in stored
+    assert all("rlnClassNumber" in part.data.attributes for part in parts)
+
+
+def test_split_images():
+    counts = np.array([3, 1, 4, 1, 5])
+    assert mn.star.split_images(counts, max_points=14) is None
+    assert mn.star.split_images(counts, images_per_object=2, max_points=14) == 2
+    # objects are split until none has more than max_points particles
+    with pytest.warns(UserWarning):
+        assert mn.star.split_images(counts, max_points=6) == 2
+    with pytest.raises(ValueError):
+        mn.star.split_images(counts, images_per_object=1, max_points=4)
+
+
+def test_load_star_file_rotations(relion_file):
+    from eulerangles import euler2matrix
+    from scipy.spatial.transform import Rotation
+
+    obj = mn.star.load_star_file(relion_file, rotation_layouts=("quaternion", "matrix"))
+    _, data, _ = mn.star._read_star(relion_file)
+    order = np.argsort(data["rlnMicrographName"], kind="stable")
+    angles = np.column_stack([data[col] for col in ["rlnAngleRot", "rlnAngleTilt", "rlnAnglePsi"]])[order]
+    # the inverse of the RELION rotation, which is its transpose
+    expected = np.swapaxes(euler2matrix(angles, axes="zyz", intrinsic=True, right_handed_rotation=True), -1, -2)
+
+    eulers = mn.obj.get_attribute(obj, "MOLRotation")
+    assert np.allclose(Rotation.from_euler("xyz", eulers).as_matrix(), expected, atol=1e-5)
+    quaternions = mn.obj.get_attribute(obj, "MOLRotationQuaternion")
+    assert np.allclose(Rotation.from_quat(np.roll(quaternions, -1, axis=1)).as_matrix(), expected, atol=1e-5)
+    axes = np.stack([mn.obj.get_attribute(obj, f"MOLRotationAxis{axis}") for axis in "XYZ"], axis=-1)
+    assert np.allclose(axes, expected, atol=1e-5)